@@ -19,68 +19,78 @@ except:
     raise Exception(msg)
 
 
-from .constants import * 
+# private, so that they are not exported
+from .lazy_loading import install_lazy_module as _install_lazy_module
+from .lazy_loading import lazy_loading_enabled as _lazy_loading_enabled
 
-from .augmented_reality_utils import *
-from .bag_info import *
-from .bag_logs import *
-from .bag_reading import *
-from .bag_visualization import *
-from .bag_writing import *
-from .caching import *
-# from .cli import *
-from .col_logging import *
-from .constants import *
-from .contracts_ import *
-from .dates import *
-from .detect_environment import *
-from .disk_hierarchy import *
-from .download import *
-from .exceptions import *
-from .exception_utils import *
-from .expand_variables import *
-from .file_utils import *
-from .friendly_path_imp import *
-from .fuzzy import *
-from .image_composition import *
-from .image_conversions import *
-from .image_jpg_create import *
-from .image_rescaling import *
-from .image_timestamps import *
-from .image_writing import *
-from .image_operations import *
+if _lazy_loading_enabled():
+    # the submodules are imported when their names are used (see lazy_loading)
+    _install_lazy_module(__name__)
+else:
+    from .constants import * 
 
-from .instantiate_utils import *
-from .ipython_utils import *
-from .jpg import *
-from .locate_files_impl import *
-from .logging_logger import *
-from .memoization import *
-from .mkdirs import *
-from .networking import *
-from .parameters import *
-from .path_utils import *
-from .read_package_xml import *
-from .safe_pickling import *
-from .system_cmd_imp import *
-from .test_hash import *
-from .text_utils import *
-from .timeit import *
-from .type_checks import *
-from .wildcards import *
-from .wrap_main import *
-from .yaml_pretty import *
-from .yaml_wrap import *
-
-# Make sure that all variables look like they are 
-# in the duckietown_utils module, not duckietown_utils
-__all__ = []
-for c in list(locals()):
-    v = eval(c)
-    if hasattr(v, '__module__'):
-        if v.__module__.startswith('duckietown_utils'):
-            v.__module__ = 'duckietown_utils'
-            __all__.append(c)
-            
+    from .augmented_reality_utils import *
+    from .bag_info import *
+    from .bag_logs import *
+    from .bag_reading import *
+    from .bag_streaming import *
+    from .bag_visualization import *
+    from .bag_writing import *
+    from .bounded_queue import *
+    from .caching import *
+    # from .cli import *
+    from .col_logging import *
+    from .constants import *
+    from .contracts_ import *
+    from .dates import *
+    from .detect_environment import *
+    from .disk_hierarchy import *
+    from .download import *
+    from .exceptions import *
+    from .exception_utils import *
+    from .expand_variables import *
+    from .file_utils import *
+    from .friendly_path_imp import *
+    from .fuzzy import *
+    from .image_composition import *
+    from .image_conversions import *
+    from .image_jpg_create import *
+    from .image_rescaling import *
+    from .image_timestamps import *
+    from .image_writing import *
+    from .image_operations import *
 
+    from .instantiate_utils import *
+    from .ipython_utils import *
+    from .jpg import *
+    from .locate_files_impl import *
+    from .logging_logger import *
+    from .memoization import *
+    from .mkdirs import *
+    from .networking import *
+    from .parameters import *
+    from .path_utils import *
+    from .read_package_xml import *
+    from .safe_pickling import *
+    from .system_cmd_imp import *
+    from .test_hash import *
+    from .text_utils import *
+    from .timeit import *
+    from .type_checks import *
+    from .wildcards import *
+    from .worker_pool import *
+    from .wrap_main import *
+    from .yaml_pretty import *
+    from .yaml_wrap import *
 
+    # Make sure that all variables look like they are 
+    # in the duckietown_utils module, not duckietown_utils
+    __all__ = []
+    for c in list(locals()):
+        if c.startswith('_'):
+            continue
+        v = eval(c)
+        if hasattr(v, '__module__'):
+            if v.__module__.startswith('duckietown_utils'):
+                v.__module__ = 'duckietown_utils'
+                __all__.append(c)
@@ -1,20 +1,93 @@
+import multiprocessing
 import os
 import subprocess
+import traceback
 
-from .caching import get_cached
+from . import logger
+from .caching import get_cache_store, get_cached, get_fingerprint_of_files
 from .yaml_pretty import yaml_load
 
 
-__all__ = ['rosbag_info', 'rosbag_info_cached']
+__all__ = ['rosbag_info', 'rosbag_info_cached', 'rosbag_info_cached_many']
+
+def _rosbag_info_cache_key(filename):
+    basename = os.path.basename(filename)
+    cache_name = 'rosbag_info/' + basename
+    # recomputed only if the bag changes
+    fingerprint = get_fingerprint_of_files([filename])
+    return cache_name, fingerprint
 
 def rosbag_info_cached(filename):
     def f():
         return rosbag_info(filename)
-    basename = os.path.basename(filename)
-    cache_name = 'rosbag_info/' + basename
-    return get_cached(cache_name, f, quiet=True)
+    cache_name, fingerprint = _rosbag_info_cache_key(filename)
+    return get_cached(cache_name, f, quiet=True, fingerprint=fingerprint)
+
+def rosbag_info_cached_many(filenames, nprocesses=None):
+    """
+        Same as rosbag_info_cached() for many bags. Returns a dict
+        filename -> info.
+
+        Only the bags that are new or that changed since they were
+        last indexed are read, in parallel using nprocesses processes
+        (by default, one per CPU).
+    """
+    store = get_cache_store()
+    results = {}
+    todo = []
+    for filename in filenames:
+        cache_name, fingerprint = _rosbag_info_cache_key(filename)
+        found, info = store.get(cache_name, fingerprint)
+        if found:
+            results[filename] = info
+        else:
+            todo.append((filename, cache_name, fingerprint))
+
+    if not todo:
+        return results
+
+    if nprocesses is None:
+        nprocesses = multiprocessing.cpu_count()
+    nprocesses = min(nprocesses, len(todo))
+    logger.info('Indexing %d new or changed bags using %d processes.' % (len(todo), nprocesses))
+    todo_filenames = [filename for filename, _, _ in todo]
+    if nprocesses > 1:
+        pool = multiprocessing.Pool(nprocesses)
+        try:
+            infos = pool.map(rosbag_info, todo_filenames, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        infos = map(rosbag_info, todo_filenames)
+
+    for (filename, cache_name, fingerprint), info in zip(todo, infos):
+        store.put(cache_name, fingerprint, info)
+        results[filename] = info
+    return results
 
 def rosbag_info(bag): 
+    """ 
+        Returns the same dictionary as "rosbag info --yaml", or None
+        if the bag cannot be read. 
+    """
+    try:
+        import rosbag  # @UnresolvedImport
+        # this only reads the header, the connections, and the index 
+        b = rosbag.Bag(bag)
+        try:
+            stdout = b._get_yaml_info()
+        finally:
+            b.close()
+    except ImportError:
+        return rosbag_info_subprocess(bag)
+    except Exception:
+        msg = 'Cannot read bag %s:\n%s' % (bag, traceback.format_exc())
+        logger.error(msg)
+        return None
+    return yaml_load(stdout)
+
+def rosbag_info_subprocess(bag): 
     stdout = subprocess.Popen(['rosbag', 'info', '--yaml', bag],
                               stdout=subprocess.PIPE).communicate()[0]
 #     try:
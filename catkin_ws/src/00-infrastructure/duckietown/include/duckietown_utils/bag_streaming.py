@@ -0,0 +1,144 @@
+from collections import namedtuple
+import threading
+import traceback
+
+import numpy as np
+
+from .bag_info import get_image_topic
+from .bounded_queue import BoundedQueue, QueueEnd
+from .exceptions import DTBadData
+from .image_conversions import rgb_from_ros
+
+__all__ = [
+    'BagImage',
+    'BagImageStream',
+]
+
+BagImage = namedtuple('BagImage', ['index', 'timestamp', 'rgb'])
+
+
+class BagImageStream():
+    """
+        Reads the images of one topic of a bag lazily.
+
+        The constructor builds the index of the timestamps of the topic,
+        using only the index records of the bag. Then read() yields the
+        decoded images of any time window, optionally one every "stride".
+
+        A background thread reads and decodes the next images while the
+        caller is processing the current one; at most "read_ahead" decoded
+        images are kept waiting, so the memory used does not depend
+        on the length of the log. With read_ahead = 0, the images are
+        decoded in the caller's thread.
+
+            stream = BagImageStream(rosbag.Bag(filename))
+            for image in stream.read(t0=10, t1=20, stride=5):
+                print image.timestamp, image.rgb.shape
+
+        Only one read() at a time should be active on the same bag.
+    """
+
+    def __init__(self, bag, topic=None, read_ahead=4):
+        if topic is None:
+            topic = get_image_topic(bag)
+        self.bag = bag
+        self.topic = topic
+        self.read_ahead = read_ahead
+        # the exact times, in nanoseconds, and the same as float seconds
+        self.stamps_ns = self._build_index()
+        self.timestamps = self.stamps_ns / 1e9
+        self.bag_t0 = bag.get_start_time()
+
+    def _build_index(self):
+        """ Returns the sorted int64 array of the times of the topic (ns). """
+        bag = self.bag
+        try:
+            # rosbag keeps the index in memory after opening the bag
+            connections = list(bag._get_connections([self.topic]))
+            times = [entry.time.to_nsec() for entry in bag._get_entries(connections)]
+        except AttributeError:
+            # not a rosbag.Bag (e.g. a BagReadProxy): read without deserializing
+            times = [t.to_nsec() for _, _, t in bag.read_messages(topics=[self.topic], raw=True)]
+        return np.array(times, dtype='int64')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def select(self, t0=None, t1=None, stride=1):
+        """
+            Returns the indices of the images in the interval [t0, t1],
+            taking one every "stride". As for BagReadProxy, t0 and t1
+            are relative to the start of the bag, and None means unbounded.
+        """
+        if stride < 1:
+            msg = 'Invalid stride %r.' % stride
+            raise ValueError(msg)
+        first = 0
+        last = len(self.timestamps)
+        if t0 is not None:
+            first = np.searchsorted(self.timestamps, self.bag_t0 + t0, side='left')
+        if t1 is not None:
+            last = np.searchsorted(self.timestamps, self.bag_t0 + t1, side='right')
+        return np.arange(first, last, stride)
+
+    def read(self, t0=None, t1=None, stride=1):
+        """ Yields a BagImage for each image selected by select(t0, t1, stride). """
+        indices = self.select(t0, t1, stride)
+        if len(indices) == 0:
+            return iter([])
+        if self.read_ahead == 0:
+            return self._read_decode(indices)
+        return self._read_ahead(indices)
+
+    def _read_decode(self, indices):
+        import rospy  # @UnresolvedImport
+        first = indices[0]
+        start_time = rospy.Time(0, int(self.stamps_ns[first]))
+        end_time = rospy.Time(0, int(self.stamps_ns[indices[-1]]))
+        wanted = set(indices.tolist())
+        # messages with the same timestamp as the first one come before it
+        i = int(np.searchsorted(self.stamps_ns, self.stamps_ns[first], side='left'))
+        # raw, so that only the selected messages are deserialized
+        for _, raw, _ in self.bag.read_messages(topics=[self.topic], raw=True,
+                                                start_time=start_time, end_time=end_time):
+            if i in wanted:
+                _datatype, data, _md5sum, _position, pytype = raw
+                msg = pytype()
+                msg.deserialize(data)
+                yield BagImage(i, self.timestamps[i], rgb_from_ros(msg))
+                if i == indices[-1]:
+                    break
+            i += 1
+
+    def _read_ahead(self, indices):
+        queue = BoundedQueue(self.read_ahead)
+
+        def produce():
+            try:
+                for image in self._read_decode(indices):
+                    if not queue.put(image):
+                        # the consumer went away
+                        return
+            except Exception:
+                queue.put_end(traceback.format_exc())
+            else:
+                queue.put_end()
+
+        t = threading.Thread(target=produce, name='BagImageStream(%s)' % self.topic)
+        t.setDaemon(True)
+        t.start()
+
+        try:
+            while True:
+                item = queue.get()
+                if isinstance(item, QueueEnd):
+                    if item.error is not None:
+                        msg = 'Could not read images from %s:\n%s' % (self.topic, item.error)
+                        raise DTBadData(msg)
+                    break
+                yield item
+        finally:
+            # also unblocks the producer if the caller stops early
+            queue.close()
+            t.join()
+
@@ -0,0 +1,68 @@
+from collections import deque
+import threading
+
+__all__ = [
+    'BoundedQueue',
+    'QueueEnd',
+]
+
+
+class QueueEnd():
+    """ Returned by BoundedQueue.get() after the last item. """
+
+    def __init__(self, error=None):
+        # the error given to put_end(), if the producer failed
+        self.error = error
+
+
+class BoundedQueue():
+    """
+        A queue from a producer thread to a consumer thread, whose put()
+        blocks when "maxsize" items are waiting, so that the memory used
+        does not depend on how far ahead the producer is.
+
+        The producer calls put_end() after the last item (optionally with
+        an error); the consumer calls close() if it stops reading early,
+        which discards the waiting items and unblocks the producer.
+        After the end, get() returns a QueueEnd.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = deque()
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        """ Returns False if the queue was closed. """
+        with self.condition:
+            while len(self.items) >= self.maxsize and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.condition.notify_all()
+            return True
+
+    def put_end(self, error=None):
+        # the end marker does not count towards maxsize
+        with self.condition:
+            if not self.closed:
+                self.items.append(QueueEnd(error))
+                self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while not self.items:
+                if self.closed:
+                    return QueueEnd()
+                self.condition.wait()
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.items.clear()
+            self.condition.notify_all()
@@ -1,7 +1,9 @@
+import hashlib
 import os
 
 from duckietown_utils import logger
 
+from .constants import DuckietownConstants
 from .friendly_path_imp import friendly_path
 from .path_utils import expand_all
 from .safe_pickling import safe_pickle_load, safe_pickle_dump
@@ -9,48 +11,217 @@ from .safe_pickling import safe_pickle_load, safe_pickle_dump
 
 __all__ = [
     'get_cached',
+    'get_cache_store',
+    'get_fingerprint_of_files',
+    'get_fingerprint_of_code',
+    'CacheStore',
+    'MemoryStore',
 ]
 
-def get_cached(cache_name, f, quiet='not-given'):
+SUFFIX = '.cache.pickle'
+
+
+def get_cached(cache_name, f, quiet='not-given', fingerprint=None):
     """
         Caches the result of f() in a file called
-            ${DUCKIETOWN_ROOT}/caches/![name].cache.pickle
-    """
+            ${DUCKIETOWN_ROOT}/caches/![name].![digest].cache.pickle
 
+        where digest is a hash of the fingerprint: a description of
+        everything the result depends on, for example
 
-    cache = '${DUCKIETOWN_ROOT}/caches/%s.cache.pickle' % cache_name
-    cache = expand_all(cache)
+            fingerprint = (get_fingerprint_of_files(filenames),
+                           get_fingerprint_of_code(['my_package']))
 
+        If the fingerprint changes, f() is called again and the entry
+        with the old fingerprint is removed. With fingerprint = None,
+        the entry is never invalidated.
+
+        For results that are expensive to compute as a whole, call
+        get_cached() once per part (for example, once per file, with
+        the fingerprint of that file), so that only the parts that
+        changed are recomputed.
+    """
     if quiet == 'not-given':
         should_be_quiet = False
     else:
         should_be_quiet = quiet
 
-    if os.path.exists(cache):
-
+    store = get_cache_store()
+    found, ob = store.get(cache_name, fingerprint)
+    if found:
         if not should_be_quiet:
-            logger.info('Using cache %s' % friendly_path(cache))
+            logger.info('Using cache %s' % friendly_path(store.filename_for(cache_name, fingerprint)))
+        return ob
+
+    ob = f()
+    if not should_be_quiet:
+        logger.info('Writing to cache %s' % friendly_path(store.filename_for(cache_name, fingerprint)))
+    store.put(cache_name, fingerprint, ob)
+    return ob
+
+
+def get_fingerprint_of_files(filenames):
+    """
+        Returns a fingerprint that changes if any of the files is added,
+        removed, or modified: the sorted list of (path, mtime, size).
+        Files that do not exist have mtime and size None.
+    """
+    res = []
+    for fn in sorted(set(filenames)):
+        try:
+            st = os.stat(fn)
+        except OSError:
+            res.append((fn, None, None))
+        else:
+            res.append((fn, st.st_mtime, st.st_size))
+    return res
+
+
+def get_fingerprint_of_code(module_names):
+    """
+        Returns the fingerprint of the Python sources of the given
+        modules or packages, so that a cache is invalidated when the
+        code that computes its contents changes.
+    """
+    filenames = []
+    for module_name in module_names:
+        module = __import__(module_name, fromlist=['dummy'])
+        # for packages, __path__ also includes the source directories of catkin
+        dirs = list(getattr(module, '__path__', [os.path.dirname(module.__file__)]))
+        for d in dirs:
+            for root, _, files in os.walk(d):
+                for f in files:
+                    if f.endswith('.py'):
+                        filenames.append(os.path.join(root, f))
+    return get_fingerprint_of_files(filenames)
+
+
+def get_cache_store():
+    if CacheStore._singleton is None:
+        directory = expand_all('${DUCKIETOWN_ROOT}/caches')
+        CacheStore._singleton = CacheStore(directory, DuckietownConstants.cache_max_size)
+    return CacheStore._singleton
+
 
+class CacheStore():
+    """
+        A directory of pickled results, indexed by name and fingerprint.
+
+        Entries are written atomically. When the total size of the entries
+        exceeds max_size bytes, the least recently used ones are removed;
+        only the files ending in .cache.pickle are considered, so other
+        files in the directory (e.g. downloads) are never touched.
+    """
+    _singleton = None
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        # total size of the entries, computed the first time it is needed
+        self.total_size = None
+
+    def filename_for(self, cache_name, fingerprint):
+        digest = hashlib.sha1(repr(fingerprint)).hexdigest()[:16]
+        return os.path.join(self.directory, '%s.%s%s' % (cache_name, digest, SUFFIX))
+
+    def get(self, cache_name, fingerprint):
+        """ Returns (True, value) if there is a valid entry, else (False, None). """
+        fn = self.filename_for(cache_name, fingerprint)
+        if not os.path.exists(fn):
+            return False, None
         try:
-            return safe_pickle_load(cache)
-        except:
-            msg = 'Removing cache that I cannot read: %s' % friendly_path(cache)
+            ob = safe_pickle_load(fn)
+        except Exception:
+            msg = 'Removing cache that I cannot read: %s' % friendly_path(fn)
             logger.error(msg)
-            os.unlink(cache)
+            self._remove(fn)
+            return False, None
+        # the modification time is used as the time of last use
+        try:
+            os.utime(fn, None)
+        except OSError:
+            pass
+        return True, ob
 
+    def put(self, cache_name, fingerprint, ob):
+        fn = self.filename_for(cache_name, fingerprint)
+        self._remove_other_versions(fn)
+        self._remove(fn)
+        safe_pickle_dump(ob, fn)
+        if self.total_size is not None:
+            self.total_size += os.path.getsize(fn)
+        if self.get_total_size() > self.max_size:
+            self.evict(keep=fn)
 
-    ob = f()
-    if not should_be_quiet:
-        logger.info('Writing to cache %s' % friendly_path(cache))
-    try:
-        os.makedirs(os.path.dirname(cache))
-    except:
-        pass
-
-    safe_pickle_dump(ob, cache)
-
-#         with open(cache, 'w') as f:
-#             cPickle.dump(ob, f)
-#
-#
-    return ob
+    def _remove_other_versions(self, fn):
+        """ Removes the entries with the same name and different fingerprint. """
+        dirname = os.path.dirname(fn)
+        basename = os.path.basename(fn)
+        # strip the digest and the suffix
+        prefix = basename[:-len(SUFFIX)].rsplit('.', 1)[0] + '.'
+        if not os.path.exists(dirname):
+            return
+        for f in os.listdir(dirname):
+            if f.startswith(prefix) and f.endswith(SUFFIX) and f != basename:
+                # the name must be exactly prefix + digest + suffix
+                if not '.' in f[len(prefix):-len(SUFFIX)]:
+                    self._remove(os.path.join(dirname, f))
+
+    def _remove(self, fn):
+        try:
+            size = os.path.getsize(fn)
+            os.unlink(fn)
+        except OSError:
+            return
+        if self.total_size is not None:
+            self.total_size -= size
+
+    def _list_entries(self):
+        """ Returns a list of (mtime, size, filename) for all the entries. """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for f in files:
+                if f.endswith(SUFFIX):
+                    fn = os.path.join(root, f)
+                    try:
+                        st = os.stat(fn)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, fn))
+        return entries
+
+    def get_total_size(self):
+        if self.total_size is None:
+            self.total_size = sum(size for _, size, _ in self._list_entries())
+        return self.total_size
+
+    def evict(self, keep=None):
+        """ Removes the least recently used entries until the size is below the limit. """
+        entries = sorted(self._list_entries())
+        self.total_size = sum(size for _, size, _ in entries)
+        for _, size, fn in entries:
+            if self.total_size <= self.max_size:
+                break
+            if fn == keep:
+                continue
+            logger.debug('Evicting cache %s' % friendly_path(fn))
+            self._remove(fn)
+
+
+class MemoryStore():
+    """
+        Same interface as CacheStore (get() and put()), in memory;
+        for the tests of the code that uses a store.
+    """
+
+    def __init__(self):
+        # (cache_name, repr(fingerprint)) -> ob
+        self.data = {}
+
+    def get(self, cache_name, fingerprint):
+        """ Returns (True, value) if there is an entry, else (False, None). """
+        key = (cache_name, repr(fingerprint))
+        return key in self.data, self.data.get(key, None)
+
+    def put(self, cache_name, fingerprint, ob):
+        self.data[(cache_name, repr(fingerprint))] = ob
@@ -25,6 +25,9 @@ class DuckietownConstants():
     
     use_cache_for_algos =  False
     
+    # Maximum total size of the entries in ${DUCKIETOWN_ROOT}/caches (bytes)
+    cache_max_size = 500 * 1000 * 1000
+    
     enforce_no_tabs = True
     enforce_naming_conventions = True
     
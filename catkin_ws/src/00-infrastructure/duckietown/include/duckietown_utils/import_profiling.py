@@ -0,0 +1,75 @@
+import ast
+import os
+import subprocess
+import sys
+
+from .lazy_loading import ENV_VARIABLE, SUBMODULES
+
+__all__ = [
+    'profile_imports',
+    'format_import_profile',
+]
+
+# Runs in a new interpreter: prints the time to import the module,
+# and the top-level packages (not in the standard library) that were
+# imported because of it.
+_CHILD = """
+import sys, time, os
+from distutils import sysconfig
+stdlib = os.path.realpath(sysconfig.get_python_lib(standard_lib=True))
+def third_party(name):
+    f = getattr(sys.modules.get(name), '__file__', None)
+    if f is None:
+        return False
+    f = os.path.realpath(f)
+    return not f.startswith(stdlib) or 'packages' in f
+%(before)s
+before = set(k for k, v in sys.modules.items() if v is not None)
+t0 = time.time()
+import %(module)s
+delta = time.time() - t0
+new = set(k.split('.')[0] for k, v in sys.modules.items() if v is not None and not k in before)
+new = [k for k in new if not k in before and third_party(k) and k != 'duckietown_utils']
+print(repr((delta, sorted(new))))
+"""
+
+
+def _measure(module, before, lazy):
+    env = dict(os.environ)
+    env[ENV_VARIABLE] = '1' if lazy else '0'
+    code = _CHILD % dict(module=module, before=before)
+    out = subprocess.check_output([sys.executable, '-c', code], env=env)
+    delta, new = ast.literal_eval(out.strip().split('\n')[-1])
+    return delta, new
+
+
+def profile_imports(submodules=None):
+    """
+        Measures the cost of importing duckietown_utils and each of its
+        submodules, each in a new interpreter, so that every submodule
+        is charged for all the packages that it needs.
+
+        Returns a list of (what, seconds, list of the new top-level packages).
+    """
+    if submodules is None:
+        submodules = SUBMODULES
+    rows = []
+    delta, new = _measure('duckietown_utils', '', lazy=False)
+    rows.append(('duckietown_utils (eager)', delta, new))
+    delta, new = _measure('duckietown_utils', '', lazy=True)
+    rows.append(('duckietown_utils (lazy)', delta, new))
+    for submodule in submodules:
+        # the package itself is not counted
+        delta, new = _measure('duckietown_utils.' + submodule, 'import duckietown_utils', lazy=True)
+        rows.append((submodule, delta, new))
+    return rows
+
+
+def format_import_profile(rows):
+    """ Returns a table, with the most expensive submodules first. """
+    s = '%10s  %-30s  %s\n' % ('time (ms)', 'module', 'packages imported')
+    package, submodules = rows[:2], rows[2:]
+    submodules = sorted(submodules, key=lambda _: -_[1])
+    for what, delta, new in package + submodules:
+        s += '%10.1f  %-30s  %s\n' % (1000 * delta, what, ", ".join(new))
+    return s
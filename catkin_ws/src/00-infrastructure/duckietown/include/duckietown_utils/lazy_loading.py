@@ -0,0 +1,293 @@
+"""
+    Lazy loading of the names exported by duckietown_utils.
+
+    If the environment variable DUCKIETOWN_UTILS_LAZY is set to 1,
+    "import duckietown_utils" does not import the submodules: each name
+    is imported from its submodule the first time it is used. The names
+    are the same as with the normal (eager) loading.
+
+    This module must not import anything heavy.
+"""
+import ast
+import importlib
+import os
+import sys
+import types
+
+__all__ = [
+    'lazy_loading_enabled',
+    'install_lazy_module',
+    'get_lazy_targets',
+    'SUBMODULES',
+    'SHADOWED',
+]
+
+ENV_VARIABLE = 'DUCKIETOWN_UTILS_LAZY'
+
+# The submodules exported by duckietown_utils, in the order of
+# their star imports in __init__.py (which must be kept in sync).
+SUBMODULES = [
+    'constants',
+    'augmented_reality_utils',
+    'bag_info',
+    'bag_logs',
+    'bag_reading',
+    'bag_streaming',
+    'bag_visualization',
+    'bag_writing',
+    'bounded_queue',
+    'caching',
+    'col_logging',
+    'contracts_',
+    'dates',
+    'detect_environment',
+    'disk_hierarchy',
+    'download',
+    'exceptions',
+    'exception_utils',
+    'expand_variables',
+    'file_utils',
+    'friendly_path_imp',
+    'fuzzy',
+    'image_composition',
+    'image_conversions',
+    'image_jpg_create',
+    'image_rescaling',
+    'image_timestamps',
+    'image_writing',
+    'image_operations',
+    'instantiate_utils',
+    'ipython_utils',
+    'jpg',
+    'locate_files_impl',
+    'logging_logger',
+    'memoization',
+    'mkdirs',
+    'networking',
+    'parameters',
+    'path_utils',
+    'read_package_xml',
+    'safe_pickling',
+    'system_cmd_imp',
+    'test_hash',
+    'text_utils',
+    'timeit',
+    'type_checks',
+    'wildcards',
+    'worker_pool',
+    'wrap_main',
+    'yaml_pretty',
+    'yaml_wrap',
+]
+
+# The submodules that export a function with their same name. Importing
+# the submodule sets it as an attribute of the package, and with the eager
+# loading the star import then replaces it with the function; so these
+# functions are always loaded.
+SHADOWED = [
+    'wrap_main',
+]
+
+
+def lazy_loading_enabled():
+    return os.environ.get(ENV_VARIABLE, '0') not in ['', '0']
+
+
+def install_lazy_module(module_name):
+    """ Replaces the package in sys.modules with a LazyModule. """
+    original = sys.modules[module_name]
+    module = LazyModule(module_name, original.__doc__)
+    module.__dict__.update(original.__dict__)
+    # otherwise the globals of __init__.py would be cleared
+    module._original_module = original
+    sys.modules[module_name] = module
+    for name in SHADOWED:
+        m = importlib.import_module(module_name + '.' + name)
+        module.__dict__[name] = getattr(m, name)
+        _set_module_name(module.__dict__[name])
+    return module
+
+
+class LazyModule(types.ModuleType):
+    """ A package that imports its names from the submodules when they are used. """
+
+    def __getattr__(self, name):
+        # only called for the names that are not in the module yet
+        if name == '__all__':
+            self._load_all()
+            return self.__dict__['__all__']
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        package_dir = os.path.dirname(self.__file__)
+        targets = get_lazy_targets(package_dir)
+        if name in targets:
+            submodule, attr = targets[name]
+            value = getattr(self._import(submodule), attr)
+        elif os.path.exists(os.path.join(package_dir, name + '.py')):
+            # "from duckietown_utils import submodule" asks for the attribute first
+            value = self._import(name)
+        else:
+            # something that we could not see in the sources
+            self._load_all()
+            if not name in self.__dict__:
+                msg = "'module' object has no attribute %r" % name
+                raise AttributeError(msg)
+            return self.__dict__[name]
+
+        _set_module_name(value)
+        self.__dict__[name] = value
+        return value
+
+    def _import(self, submodule):
+        return importlib.import_module(self.__name__ + '.' + submodule)
+
+    def _load_all(self):
+        """ Same as the eager loading: imports everything and computes __all__. """
+        for submodule in SUBMODULES:
+            m = self._import(submodule)
+            if hasattr(m, '__all__'):
+                names = m.__all__
+            else:
+                names = [_ for _ in dir(m) if not _.startswith('_')]
+            for name in names:
+                self.__dict__[name] = getattr(m, name)
+        names = []
+        for name, value in list(self.__dict__.items()):
+            if not name.startswith('_') and _set_module_name(value):
+                names.append(name)
+        self.__dict__['__all__'] = names
+
+
+def _set_module_name(value):
+    """ Makes the value look like it is in duckietown_utils; returns True if it is ours. """
+    if hasattr(value, '__module__') and isinstance(value.__module__, str):
+        if value.__module__.startswith('duckietown_utils'):
+            value.__module__ = 'duckietown_utils'
+            return True
+    return False
+
+
+_targets = {}
+
+
+def get_lazy_targets(package_dir):
+    """
+        Returns a dict name -> (submodule, attribute): where to find each
+        name of the package. It is computed by reading the sources of
+        the submodules (without importing them), following the star
+        imports in the order of SUBMODULES, so that a name that is
+        exported by more than one submodule has the same value as
+        with the eager loading. Names that a submodule imports from
+        another submodule are looked up in the latter, which is usually
+        lighter to import.
+    """
+    if not package_dir in _targets:
+        bindings = _Bindings(package_dir)
+        targets = {}
+        for submodule in SUBMODULES:
+            for name in bindings.exported(submodule):
+                targets[name] = bindings.resolve(submodule, name)
+        _targets[package_dir] = targets
+    return _targets[package_dir]
+
+
+class _Bindings():
+    """ The top-level names bound by each submodule, from its source. """
+
+    def __init__(self, package_dir):
+        self.package_dir = package_dir
+        # submodule -> (name -> (submodule, attribute) or None if defined there)
+        self.bound = {}
+        # submodule -> list of names in __all__, or None
+        self.all = {}
+
+    def _parse(self, submodule):
+        if submodule in self.bound:
+            return
+        self.bound[submodule] = {}
+        self.all[submodule] = None
+        fn = os.path.join(self.package_dir, submodule + '.py')
+        if not os.path.exists(fn):
+            return
+        with open(fn) as f:
+            tree = ast.parse(f.read(), fn)
+        for node in _top_level_statements(tree.body):
+            self._bind(submodule, node)
+
+    def _bind(self, submodule, node):
+        bound = self.bound[submodule]
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            bound[node.name] = None
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                for name in _assigned_names(target):
+                    bound[name] = None
+                if isinstance(target, ast.Name) and target.id == '__all__':
+                    try:
+                        self.all[submodule] = list(ast.literal_eval(node.value))
+                    except ValueError:
+                        pass
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                bound[alias.asname or alias.name.split('.')[0]] = None
+        elif isinstance(node, ast.ImportFrom):
+            other = _sibling_module(node)
+            for alias in node.names:
+                if alias.name == '*':
+                    if other is not None:
+                        for name in self.exported(other):
+                            bound[name] = (other, name)
+                elif other is not None:
+                    bound[alias.asname or alias.name] = (other, alias.name)
+                else:
+                    bound[alias.asname or alias.name] = None
+
+    def exported(self, submodule):
+        """ The names imported by "from .submodule import *". """
+        self._parse(submodule)
+        if self.all[submodule] is not None:
+            return self.all[submodule]
+        return [_ for _ in self.bound[submodule] if not _.startswith('_')]
+
+    def resolve(self, submodule, name, depth=0):
+        self._parse(submodule)
+        ref = self.bound[submodule].get(name, None)
+        if ref is None or depth > 10:
+            return submodule, name
+        return self.resolve(ref[0], ref[1], depth + 1)
+
+
+def _top_level_statements(body):
+    """ The statements of the module, also inside if/try/with blocks. """
+    for node in body:
+        yield node
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            continue
+        for field in ['body', 'orelse', 'finalbody']:
+            for x in _top_level_statements(getattr(node, field, [])):
+                yield x
+        for handler in getattr(node, 'handlers', []):
+            for x in _top_level_statements(handler.body):
+                yield x
+
+
+def _sibling_module(node):
+    """ For "from .x import" or "from duckietown_utils.x import", returns x. """
+    if node.module is None:
+        return None
+    if node.level == 1:
+        name = node.module
+    elif node.level == 0 and node.module.startswith('duckietown_utils.'):
+        name = node.module[len('duckietown_utils.'):]
+    else:
+        return None
+    return name if not '.' in name else None
+
+
+def _assigned_names(target):
+    if isinstance(target, ast.Name):
+        return [target.id]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return sum([_assigned_names(_) for _ in target.elts], [])
+    return []
@@ -0,0 +1,132 @@
+from collections import deque
+import threading
+import time
+import traceback
+
+from .logging_logger import logger
+from .exceptions import DTConfigException
+
+__all__ = [
+    'WorkerPool',
+    'OVERFLOW_DROP_OLDEST',
+    'OVERFLOW_DROP_NEWEST',
+    'OVERFLOW_LATEST_ONLY',
+    'OVERFLOW_VALUES',
+]
+
+# When the queue is full, discard the job that has waited the longest
+OVERFLOW_DROP_OLDEST = 'drop-oldest'
+# When the queue is full, discard the incoming job
+OVERFLOW_DROP_NEWEST = 'drop-newest'
+# Keep only the most recent job waiting (a queue of length 1, drop-oldest)
+OVERFLOW_LATEST_ONLY = 'latest-only'
+OVERFLOW_VALUES = [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_LATEST_ONLY]
+
+
+class WorkerPool():
+    """
+        A fixed number of worker threads that execute the jobs
+        waiting in a bounded queue.
+
+        submit(job) never blocks: if the queue is full, one job is
+        dropped according to the overflow policy, and the function
+        on_drop(job) is called for it (in the caller's thread).
+
+        The counters are available with get_counters():
+
+            submitted, started, dropped: number of jobs
+            queue_depth, max_queue_depth: jobs waiting now/at most
+            wait_avg, wait_max: time spent in the queue (seconds)
+    """
+
+    def __init__(self, name, nworkers, queue_size, overflow, on_drop=None):
+        if not overflow in OVERFLOW_VALUES:
+            msg = 'Invalid overflow policy %r not in %r.' % (overflow, OVERFLOW_VALUES)
+            raise DTConfigException(msg)
+        if overflow == OVERFLOW_LATEST_ONLY:
+            queue_size = 1
+        if nworkers < 1 or queue_size < 1:
+            msg = 'Need at least one worker and a queue of size 1 (got %r, %r).' % (nworkers, queue_size)
+            raise DTConfigException(msg)
+
+        self.name = name
+        self.overflow = overflow
+        self.queue_size = queue_size
+        self.on_drop = on_drop
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+
+        self.nsubmitted = 0
+        self.nstarted = 0
+        self.ndropped = 0
+        self.max_queue_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        self.workers = []
+        for i in range(nworkers):
+            t = threading.Thread(target=self._work, name='%s-%d' % (name, i))
+            t.setDaemon(True)
+            t.start()
+            self.workers.append(t)
+
+    def submit(self, job):
+        """ Enqueues the callable job; returns False if it was dropped. """
+        dropped = None
+        with self.condition:
+            self.nsubmitted += 1
+            if len(self.queue) >= self.queue_size:
+                self.ndropped += 1
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    dropped = job
+                else:
+                    dropped, _ = self.queue.popleft()
+
+            if dropped is not job:
+                self.queue.append((job, time.time()))
+                self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+                self.condition.notify()
+
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+        return dropped is not job
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                job, t_submitted = self.queue.popleft()
+                wait = time.time() - t_submitted
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+                self.nstarted += 1
+            try:
+                job()
+            except Exception as e:
+                # keep the worker alive
+                logger.error('%s: job raised an exception: %s' % (self.name, traceback.format_exc(e)))
+
+    def get_counters(self):
+        with self.condition:
+            if self.nstarted:
+                wait_avg = self.wait_total / self.nstarted
+            else:
+                wait_avg = 0.0
+            return dict(submitted=self.nsubmitted,
+                        started=self.nstarted,
+                        dropped=self.ndropped,
+                        queue_depth=len(self.queue),
+                        max_queue_depth=self.max_queue_depth,
+                        wait_avg=wait_avg,
+                        wait_max=self.wait_max)
+
+    def get_stats(self):
+        """ Returns a one-line summary of the counters. """
+        c = self.get_counters()
+        return ('%s: %d workers, queue %d/%d (max %d), %s, dropped %d/%d, '
+                'wait avg %.1f ms max %.1f ms' %
+                (self.name, len(self.workers), c['queue_depth'], self.queue_size,
+                 c['max_queue_depth'], self.overflow, c['dropped'], c['submitted'],
+                 1000 * c['wait_avg'], 1000 * c['wait_max']))
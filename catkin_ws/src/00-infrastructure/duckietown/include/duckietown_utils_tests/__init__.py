@@ -6,6 +6,12 @@ def jobs_comptests(context):
  
     from . import colors
     from . import fuzzy_match_test
+    from . import worker_pool_test
+    from . import bounded_queue_test
+    from . import bag_streaming_test
+    from . import caching_test
+    from . import bag_info_test
+    from . import lazy_loading_test
     
     from comptests.registrar import jobs_registrar_simple
     jobs_registrar_simple(context)
@@ -0,0 +1,58 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils import bag_info
+from duckietown_utils.bag_writing import d8n_write_to_bag_context
+from duckietown_utils.caching import CacheStore
+from duckietown_utils.disk_hierarchy import create_tmpdir
+
+
+def write_bag(filename, n):
+    import rospy  # @UnresolvedImport
+    from std_msgs.msg import Int32  # @UnresolvedImport
+    with d8n_write_to_bag_context(filename) as bag:
+        for i in range(n):
+            bag.write('/robot/counter', Int32(i), rospy.Time.from_sec(1000 + i * 0.1))
+
+
+@comptest
+def rosbag_info_incremental():
+    d = create_tmpdir()
+    filenames = [os.path.join(d, 'log%d.bag' % i) for i in range(4)]
+    for i, fn in enumerate(filenames):
+        write_bag(fn, n=10 + i)
+
+    # use a temporary cache
+    previous = CacheStore._singleton
+    CacheStore._singleton = CacheStore(os.path.join(d, 'caches'), max_size=10 * 1000 * 1000)
+    original_rosbag_info = bag_info.rosbag_info
+    indexed = []
+
+    def rosbag_info_counting(filename):
+        indexed.append(filename)
+        return original_rosbag_info(filename)
+
+    try:
+        # in parallel
+        infos = bag_info.rosbag_info_cached_many(filenames, nprocesses=2)
+        for i, fn in enumerate(filenames):
+            assert infos[fn]['messages'] == 10 + i, infos[fn]
+            assert infos[fn]['topics'][0]['topic'] == '/robot/counter'
+
+        # in-process, counting the bags that are read again
+        bag_info.rosbag_info = rosbag_info_counting
+        bag_info.rosbag_info_cached_many(filenames, nprocesses=1)
+        assert indexed == []
+
+        write_bag(filenames[2], n=30)
+        infos = bag_info.rosbag_info_cached_many(filenames, nprocesses=1)
+        assert indexed == [filenames[2]], indexed
+        assert infos[filenames[2]]['messages'] == 30
+    finally:
+        bag_info.rosbag_info = original_rosbag_info
+        CacheStore._singleton = previous
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,82 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.bag_streaming import BagImageStream
+from duckietown_utils.bag_writing import d8n_write_to_bag_context
+from duckietown_utils.disk_hierarchy import create_tmpdir
+from duckietown_utils.jpg import jpg_from_image_cv
+import numpy as np
+
+topic = '/robot/camera_node/image/compressed'
+
+
+def write_test_bag(filename, n, fps=10.0):
+    """
+        Writes n images at the given rate; the intensity of image i is i,
+        so that it is possible to tell which one was decoded.
+    """
+    import rospy  # @UnresolvedImport
+    from sensor_msgs.msg import CompressedImage  # @UnresolvedImport
+    with d8n_write_to_bag_context(filename) as bag:
+        for i in range(n):
+            image_cv = np.empty((24, 32, 3), 'uint8')
+            image_cv.fill(i)
+            msg = CompressedImage()
+            msg.format = 'jpeg'
+            msg.data = jpg_from_image_cv(image_cv)
+            t = rospy.Time.from_sec(1000 + i / fps)
+            msg.header.stamp = t
+            bag.write(topic, msg, t)
+
+
+def get_test_stream(n, read_ahead):
+    import rosbag  # @UnresolvedImport
+    filename = os.path.join(create_tmpdir(), 'stream.bag')
+    write_test_bag(filename, n)
+    return BagImageStream(rosbag.Bag(filename), read_ahead=read_ahead)
+
+
+def check_images(stream, images, expected_indices):
+    assert [image.index for image in images] == list(expected_indices)
+    for image in images:
+        assert image.timestamp == stream.timestamps[image.index]
+        # JPG is lossy, but not that much for a flat image
+        assert abs(np.mean(image.rgb) - image.index) < 2, (np.mean(image.rgb), image.index)
+
+
+@comptest
+def bag_streaming_select():
+    stream = get_test_stream(n=100, read_ahead=4)
+    assert len(stream) == 100
+    # 10 images per second
+    assert list(stream.select(t0=1.0, t1=2.0)) == list(range(10, 21))
+    assert list(stream.select(t0=9.5)) == list(range(95, 100))
+    assert list(stream.select(t1=0.25, stride=2)) == [0, 2]
+    assert len(stream.select(t0=20.0)) == 0
+
+
+@comptest
+def bag_streaming_read():
+    for read_ahead in [0, 1, 4]:
+        stream = get_test_stream(n=100, read_ahead=read_ahead)
+        check_images(stream, list(stream.read()), range(100))
+        check_images(stream, list(stream.read(t0=1.0, t1=5.0, stride=7)), range(10, 51, 7))
+        assert list(stream.read(t0=20.0)) == []
+
+
+@comptest
+def bag_streaming_stop_early():
+    stream = get_test_stream(n=100, read_ahead=2)
+    images = []
+    for image in stream.read():
+        images.append(image)
+        if len(images) == 3:
+            break
+    check_images(stream, images, range(3))
+    # the stream can be read again afterwards
+    check_images(stream, list(stream.read(t0=9.0)), range(90, 100))
+
+
+if __name__ == '__main__':
+    run_module_tests()
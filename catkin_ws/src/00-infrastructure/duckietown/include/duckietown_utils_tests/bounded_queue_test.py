@@ -0,0 +1,59 @@
+import threading
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.bounded_queue import BoundedQueue, QueueEnd
+
+
+def produce(queue, n, error=None):
+    def f():
+        for i in range(n):
+            if not queue.put(i):
+                return
+        queue.put_end(error)
+    t = threading.Thread(target=f)
+    t.setDaemon(True)
+    t.start()
+    return t
+
+
+@comptest
+def bounded_queue_order():
+    queue = BoundedQueue(3)
+    t = produce(queue, 100)
+    read = []
+    while True:
+        assert len(queue.items) <= 3 + 1  # the end marker does not count
+        item = queue.get()
+        if isinstance(item, QueueEnd):
+            assert item.error is None
+            break
+        read.append(item)
+    t.join()
+    assert read == list(range(100))
+
+
+@comptest
+def bounded_queue_error():
+    queue = BoundedQueue(3)
+    produce(queue, 2, error='failed').join(10)
+    assert queue.get() == 0
+    assert queue.get() == 1
+    assert queue.get().error == 'failed'
+
+
+@comptest
+def bounded_queue_close():
+    """ close() unblocks the producer, and get() then returns the end. """
+    queue = BoundedQueue(2)
+    t = produce(queue, 100)
+    assert queue.get() == 0
+    queue.close()
+    t.join(10)
+    assert not t.is_alive()
+    assert not queue.items
+    assert isinstance(queue.get(), QueueEnd)
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,106 @@
+import os
+import time
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.caching import CacheStore, MemoryStore, get_fingerprint_of_files, get_fingerprint_of_code
+from duckietown_utils.disk_hierarchy import create_tmpdir
+
+
+def list_entries(d):
+    return sorted(f for f in os.listdir(d) if f.endswith('.cache.pickle'))
+
+
+@comptest
+def cache_store_fingerprint():
+    d = create_tmpdir()
+    store = CacheStore(d, max_size=10 * 1000 * 1000)
+    assert store.get('db', 'v1') == (False, None)
+    store.put('db', 'v1', [1, 2, 3])
+    assert store.get('db', 'v1') == (True, [1, 2, 3])
+
+    # a different fingerprint is a miss, and replaces the old entry
+    assert store.get('db', 'v2') == (False, None)
+    store.put('db', 'v2', [4])
+    assert store.get('db', 'v2') == (True, [4])
+    assert store.get('db', 'v1') == (False, None)
+    assert len(list_entries(d)) == 1
+
+    # names with dots and subdirectories are independent
+    store.put('rosbag_info/a.bag', 'x', 'a')
+    store.put('rosbag_info/a.bag.b', 'x', 'b')
+    store.put('rosbag_info/a.bag', 'y', 'a2')
+    assert store.get('rosbag_info/a.bag.b', 'x') == (True, 'b')
+    assert len(list_entries(os.path.join(d, 'rosbag_info'))) == 2
+
+    # corrupted entries are removed
+    fn = store.filename_for('db', 'v2')
+    with open(fn, 'w') as f:
+        f.write('not a pickle')
+    assert store.get('db', 'v2') == (False, None)
+    assert not os.path.exists(fn)
+
+
+@comptest
+def memory_store():
+    store = MemoryStore()
+    assert store.get('db', 'v1') == (False, None)
+    store.put('db', 'v1', None)
+    assert store.get('db', 'v1') == (True, None)
+    # fingerprints do not need to be hashable
+    fingerprint = [('a.yaml', 1.0, 10)]
+    store.put('db', fingerprint, [1])
+    assert store.get('db', list(fingerprint)) == (True, [1])
+    assert store.get('other', fingerprint) == (False, None)
+
+
+@comptest
+def cache_store_eviction():
+    d = create_tmpdir()
+    # other files in the directory are not counted nor removed
+    other = os.path.join(d, 'download.bag')
+    with open(other, 'w') as f:
+        f.write('x' * 10000)
+
+    store = CacheStore(d, max_size=3500)
+    data = 'x' * 1000
+    for i in range(3):
+        store.put('e%d' % i, None, data)
+        # make sure the modification times are different
+        os.utime(store.filename_for('e%d' % i, None), (1000 + i, 1000 + i))
+    # using e0 makes e1 the least recently used
+    assert store.get('e0', None)[0]
+    store.put('e3', None, data)
+
+    assert store.get('e1', None) == (False, None)
+    for i in [0, 2, 3]:
+        assert store.get('e%d' % i, None) == (True, data)
+    assert store.get_total_size() <= 3500
+    assert os.path.exists(other)
+
+
+@comptest
+def fingerprint_of_files():
+    d = create_tmpdir()
+    fn = os.path.join(d, 'a.yaml')
+    with open(fn, 'w') as f:
+        f.write('a: 1')
+    f1 = get_fingerprint_of_files([fn])
+    assert get_fingerprint_of_files([fn]) == f1
+    # the size changes
+    with open(fn, 'w') as f:
+        f.write('a: 12')
+    f2 = get_fingerprint_of_files([fn])
+    assert f2 != f1
+    # the modification time changes
+    t = time.time() + 10
+    os.utime(fn, (t, t))
+    assert get_fingerprint_of_files([fn]) != f2
+    # a file is added
+    assert get_fingerprint_of_files([fn, fn + '.2']) != get_fingerprint_of_files([fn])
+
+    assert len(get_fingerprint_of_code(['duckietown_utils'])) > 0
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,66 @@
+import ast
+import importlib
+import os
+import subprocess
+import sys
+
+from comptests.registrar import comptest, run_module_tests
+import duckietown_utils
+from duckietown_utils.lazy_loading import ENV_VARIABLE, SHADOWED, SUBMODULES, get_lazy_targets
+
+
+def get_package_dir():
+    return os.path.dirname(duckietown_utils.__file__)
+
+
+@comptest
+def lazy_submodules_same_as_init():
+    fn = os.path.join(get_package_dir(), '__init__.py')
+    with open(fn) as f:
+        tree = ast.parse(f.read())
+    star_imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            if [_.name for _ in node.names] == ['*'] and not node.module in star_imports:
+                star_imports.append(node.module)
+    assert star_imports == SUBMODULES, (star_imports, SUBMODULES)
+
+
+@comptest
+def lazy_targets_same_values():
+    targets = get_lazy_targets(get_package_dir())
+    for name in duckietown_utils.__all__:
+        submodule, attr = targets[name]
+        m = importlib.import_module('duckietown_utils.' + submodule)
+        assert getattr(m, attr) is getattr(duckietown_utils, name), name
+
+
+@comptest
+def lazy_shadowed():
+    package_dir = get_package_dir()
+    targets = get_lazy_targets(package_dir)
+    shadowed = [_ for _ in targets if os.path.exists(os.path.join(package_dir, _ + '.py'))]
+    assert sorted(shadowed) == sorted(SHADOWED), shadowed
+
+
+@comptest
+def lazy_import_in_new_interpreter():
+    code = """
+import sys
+import duckietown_utils
+assert type(duckietown_utils).__name__ == 'LazyModule'
+assert not 'duckietown_utils.caching' in sys.modules
+from duckietown_utils import get_cached, DTConfigException
+assert 'duckietown_utils.caching' in sys.modules
+assert DTConfigException.__module__ == 'duckietown_utils'
+print(repr(sorted(duckietown_utils.__all__)))
+"""
+    env = dict(os.environ)
+    env[ENV_VARIABLE] = '1'
+    out = subprocess.check_output([sys.executable, '-c', code], env=env)
+    names = ast.literal_eval(out.strip().split('\n')[-1])
+    assert names == sorted(duckietown_utils.__all__)
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.worker_pool import (OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST,
+                                          OVERFLOW_LATEST_ONLY, WorkerPool)
+
+
+def run_jobs(overflow, backlog, njobs):
+    """
+        Blocks the only worker, submits njobs jobs, then releases it. 
+        Returns (list of jobs executed, list of jobs dropped, counters).
+    """
+    blocked = threading.Event()
+    started = threading.Event()
+    executed = []
+    dropped = []
+    
+    def blocker():
+        started.set()
+        blocked.wait()
+        
+    def make_job(i):
+        def job():
+            executed.append(i)
+        job.i = i
+        return job
+    
+    pool = WorkerPool('test', nworkers=1, queue_size=backlog, overflow=overflow,
+                      on_drop=lambda job: dropped.append(job.i))
+    pool.submit(blocker)
+    started.wait()
+    for i in range(njobs):
+        pool.submit(make_job(i))
+    blocked.set()
+    
+    while pool.get_counters()['queue_depth'] > 0 or len(executed) + len(dropped) < njobs:
+        time.sleep(0.01)
+    return executed, dropped, pool.get_counters()
+
+
+@comptest
+def worker_pool_drop_oldest():
+    executed, dropped, counters = run_jobs(OVERFLOW_DROP_OLDEST, 3, 5)
+    assert executed == [2, 3, 4], executed
+    assert dropped == [0, 1], dropped
+    assert counters['dropped'] == 2
+    assert counters['max_queue_depth'] == 3
+
+
+@comptest
+def worker_pool_drop_newest():
+    executed, dropped, _ = run_jobs(OVERFLOW_DROP_NEWEST, 3, 5)
+    assert executed == [0, 1, 2], executed
+    assert dropped == [3, 4], dropped
+
+
+@comptest
+def worker_pool_latest_only():
+    executed, dropped, counters = run_jobs(OVERFLOW_LATEST_ONLY, 10, 5)
+    assert executed == [4], executed
+    assert dropped == [0, 1, 2, 3], dropped
+    assert counters['submitted'] == 6
+    assert counters['started'] == 2
+
+
+@comptest
+def worker_pool_survives_exceptions():
+    done = threading.Event()
+    
+    def failing():
+        raise ValueError('expected')
+    
+    pool = WorkerPool('test', nworkers=2, queue_size=4, overflow=OVERFLOW_DROP_NEWEST)
+    pool.submit(failing)
+    pool.submit(failing)
+    pool.submit(done.set)
+    done.wait(5)
+    assert done.is_set()
+
+
+if __name__ == '__main__':
+    run_module_tests()
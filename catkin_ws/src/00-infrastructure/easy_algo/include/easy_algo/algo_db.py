@@ -6,7 +6,8 @@ from duckietown_utils import (DTConfigException,  DuckietownConstants, check_is_
                               contract, dt_check_isinstance, fuzzy_match, get_cached,
                               id_from_basename_pattern, import_name, instantiate,
                               indent, interpret_yaml_file, look_everywhere_for_config_files,
-                              get_config_sources, look_everywhere_for_config_files2)
+                              get_config_sources, look_everywhere_for_config_files2,
+                              get_fingerprint_of_code, get_fingerprint_of_files, locate_files)
 
 from .algo_structures import EasyAlgoInstance, EasyAlgoFamily
 
@@ -18,24 +19,59 @@ __all__ = [
 
 
 def get_easy_algo_db():
+    """
+        Returns the DB loaded in fast mode: the instances are validated
+        only when they are created, or when calling db.validate().
+    """
     if EasyAlgoDB._singleton is None:
         cache_algos = DuckietownConstants.use_cache_for_algos
-        EasyAlgoDB._singleton = (get_cached('EasyAlgoDB', EasyAlgoDB) 
-                                 if cache_algos else EasyAlgoDB())
+        f = lambda: EasyAlgoDB(validate=False)
+        EasyAlgoDB._singleton = (get_cached('EasyAlgoDB', f,
+                                            fingerprint=get_easy_algo_db_fingerprint()) 
+                                 if cache_algos else f())
     return EasyAlgoDB._singleton
 
+def get_easy_algo_db_fingerprint():
+    """ The cached DB is valid as long as the YAML files and the code are the same. """
+    filenames = []
+    for s in get_config_sources():
+        filenames.extend(locate_files(s, '*.yaml'))
+    return (get_fingerprint_of_files(filenames),
+            get_fingerprint_of_code(['easy_algo']))
+
 class EasyAlgoDB():
     _singleton = None 
     
     pattern = '*.easy_algo_family.yaml'
     
-    @contract(sources='None|seq(str)')
-    def __init__(self, sources=None):
+    @contract(sources='None|seq(str)', validate=bool)
+    def __init__(self, sources=None, validate=True):
+        """
+            If validate is False, only the YAML files are read: the
+            families and instances have valid = None until they are
+            used by create_instance() or validate() is called.
+        """
         if sources is None:
             sources = get_config_sources()
         self.all_yaml = look_everywhere_for_config_files('*.yaml', sources)
         
-        self.family_name2config = load_family_config(self.all_yaml)
+        self.family_name2config = load_family_config(self.all_yaml, validate=validate)
+    
+    def validate(self):
+        """ Validates all the families and instances that were not validated yet. """
+        for family_name in list(self.family_name2config):
+            family = self.validate_family(family_name)
+            for instance_name, i in list(family.instances.items()):
+                if i.valid is None:
+                    family.instances[instance_name] = check_validity_instance(family, i)
+    
+    def validate_family(self, family_name):
+        """ Returns the family, after checking its interface if not done yet. """
+        family = self.get_family(family_name)
+        if family.valid is None:
+            family = check_validity_family(family._replace(valid=True))
+            self.family_name2config[family_name] = family
+        return family
     
     def query(self, family_name, query, raise_if_no_matches=False):
         family = self.get_family(family_name)
@@ -54,7 +90,7 @@ class EasyAlgoDB():
         return stuff
     
     def create_instance(self, family_name, instance_name):
-        family = self.get_family(family_name)
+        family = self.validate_family(family_name)
         if not family.valid:
             msg = ('Cannot instantiate %r because its family %r is invalid.' %
                     (instance_name, family_name))
@@ -63,6 +99,14 @@ class EasyAlgoDB():
         check_is_in('instance', instance_name, family.instances)
         instance = family.instances[instance_name]
         
+        if instance.valid is None:
+            # not validated yet: validate it by creating it
+            res, error = instantiate_and_check(family, instance)
+            instance = instance._replace(valid=error is None, error_if_invalid=error)
+            family.instances[instance_name] = instance
+            if res is not None:
+                return res
+        
         if not instance.valid:
             msg = ('Cannot instantiate because it is invalid:\n%s' % 
                    indent(instance.error_if_invalid, '> '))
@@ -79,7 +123,7 @@ class EasyAlgoDB():
         
 #         """ Instantiates an algorithm """
         
-def load_family_config(all_yaml):
+def load_family_config(all_yaml, validate=True):
     """
         # now, for each family, we look for tests, which have name
         #  
@@ -90,6 +134,9 @@ def load_family_config(all_yaml):
         #     ![ID].![family_name].yaml
         #
         #   
+        
+        If validate is False, the families and instances are not
+        checked (valid = None), and nothing is imported.
     """
     if not isinstance(all_yaml, dict):
         msg = 'Expected a dict, got %s' % type(all_yaml).__name__
@@ -99,6 +146,8 @@ def load_family_config(all_yaml):
     configs = look_everywhere_for_config_files2(EasyAlgoDB.pattern, all_yaml)
     configs.update(look_everywhere_for_config_files2("*.family.yaml", all_yaml))
     
+    family_name2files = index_by_family(all_yaml)
+    
     for filename, contents in configs.items():
         c = interpret_yaml_file(filename, contents, interpret_easy_algo_config)
 
@@ -133,13 +182,18 @@ def load_family_config(all_yaml):
             return EasyAlgoInstance(family_name=c.family_name, instance_name=instance_name,
                                     description=description, filename=filename,
                                     constructor=constructor, parameters=parameters,
-                                    valid=True, error_if_invalid=None)
+                                    valid=None, error_if_invalid=None)
              
-        
-        c = check_validity_family(c)
+        if validate:
+            c = check_validity_family(c)
+        else:
+            c = c._replace(valid=None)
          
         instances = {}
-        _ = look_everywhere_for_config_files2(c.instances_pattern, all_yaml)
+        if '.' in c.family_name:
+            _ = look_everywhere_for_config_files2(c.instances_pattern, all_yaml)
+        else:
+            _ = family_name2files.get(c.family_name, {})
         for filename, contents in _.items():
             i = interpret_yaml_file(filename, contents, interpret_instance_spec, plain_yaml=True)
             if i.instance_name in instances:
@@ -148,7 +202,8 @@ def load_family_config(all_yaml):
                 msg = 'Repeated filename:\n%s\n%s' % (one, two)
                 raise DTConfigException(msg)
             
-            i = check_validity_instance(c, i)
+            if validate:
+                i = check_validity_instance(c, i)
             instances[i.instance_name] = i
         
         c = c._replace(instances=instances)
@@ -158,25 +213,47 @@ def load_family_config(all_yaml):
         
     return family_name2config
 
+def index_by_family(all_yaml):
+    """
+        Returns a dict family_name -> (filename -> contents) for the files 
+        called ![ID].![family_name].yaml, in one pass over all_yaml, instead 
+        of matching all the files with the pattern of each family.
+    """
+    family_name2files = {}
+    for filename, contents in all_yaml.items():
+        tokens = os.path.basename(filename).split('.')
+        if len(tokens) >= 3 and tokens[-1] == 'yaml':
+            if not tokens[-2] in family_name2files:
+                family_name2files[tokens[-2]] = OrderedDict()
+            family_name2files[tokens[-2]][filename] = contents
+    return family_name2files
+
 @contract(f=EasyAlgoFamily, i=EasyAlgoInstance, returns=EasyAlgoInstance)
 def check_validity_instance(f, i):
     if not f.valid:
         msg = 'Instance not valid because family not valid.'
         return i._replace(valid=False, error_if_invalid=msg)
-     
+    
+    _, error = instantiate_and_check(f, i)
+    if error is not None:
+        return i._replace(valid=False, error_if_invalid=error)
+    return i._replace(valid=True, error_if_invalid=None)
+
+def instantiate_and_check(f, i):
+    """ Creates the instance; returns (instance, None) or (None, error). """
     try:
         res = instantiate(i.constructor, i.parameters)
     except Exception as e:
         msg = str(e)
-        return i._replace(valid=False, error_if_invalid=msg)
+        return None, msg
     
     interface = import_name(f.interface)
 #     print('interface: %s' % interface)
     if not isinstance(res, interface):
         msg = ('Expected a %s but it is a %s.' % 
                (interface.__name__, type(res).__name__))
-        return i._replace(valid=False, error_if_invalid=msg)
-    return i
+        return None, msg
+    return res, None
 
 
 
@@ -1 +1,2 @@
-from .summary_imp import *
\ No newline at end of file
+from .summary_imp import *# @UnusedImport
+from .validate_imp import *# @UnusedImport
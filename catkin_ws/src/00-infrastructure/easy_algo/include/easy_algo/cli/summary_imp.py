@@ -18,6 +18,7 @@ class Summary(D8App):
     def go(self):
         args = self.options.get_extra()
         db = get_easy_algo_db()
+        db.validate()
         colorize = True
         verbose = self.options.verbose
         if len(args) == 0:
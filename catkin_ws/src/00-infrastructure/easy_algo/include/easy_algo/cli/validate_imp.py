@@ -0,0 +1,43 @@
+from duckietown_utils import DTUserError, indent, logger
+from duckietown_utils.cli import D8App, d8app_run
+from easy_algo.algo_db import get_easy_algo_db
+
+
+__all__ = ['Validate']
+
+
+class Validate(D8App):
+    """ Creates all the instances of the families, and reports the invalid ones. """
+
+    def define_program_options(self, params):
+        params.accept_extra()
+
+    def go(self):
+        families = self.options.get_extra()
+        db = get_easy_algo_db()
+        db.validate()
+        if not families:
+            families = sorted(db.family_name2config)
+
+        errors = []
+        n = 0
+        for family_name in families:
+            family = db.get_family(family_name)
+            if not family.valid:
+                errors.append('Family %s: %s' % (family_name, family.error_if_invalid))
+            for instance_name, i in sorted(family.instances.items()):
+                n += 1
+                if not i.valid:
+                    errors.append('Family %s / instance %r:\n%s' %
+                                  (family_name, instance_name, indent(i.error_if_invalid, '> ')))
+
+        if errors:
+            msg = 'Found %d invalid families/instances:\n\n' % len(errors)
+            msg += '\n'.join(errors)
+            raise DTUserError(msg)
+
+        logger.info('All %d instances of %d families are valid.' % (n, len(families)))
+
+
+if __name__ == '__main__':
+    d8app_run(Validate)
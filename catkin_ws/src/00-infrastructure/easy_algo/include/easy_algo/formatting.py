@@ -33,21 +33,25 @@ def format_families(families, colorize=True, verbose=True):
             if not family.instances:
                 row.append('\n(none)')
             else:
-                n_valid = len([_ for _ in family.instances.values() if _.valid])
-                n_invalid = len(family.instances) - n_valid
+                n_invalid = len([_ for _ in family.instances.values() if _.valid is False])
+                n_unknown = len([_ for _ in family.instances.values() if _.valid is None])
                 ss = '%s' % len(family.instances)
                 if n_invalid:
                     ss += make_red(' (%d invalid)' % n_invalid)
+                if n_unknown:
+                    ss += ' (%d not validated)' % n_unknown
                 row.append(ss)
 
-            if family.valid:
+            if family.valid is None:
+                ss = 'not validated'
+            elif family.valid:
                 ss = 'yes'
             else:
                 ss = 'no: ' + family.error_if_invalid
             row.append(ss)
             row.append(friendly_path(family.filename))
 
-            if (not family.valid) and colorize:
+            if (family.valid is False) and colorize:
                 row = make_row_red(row)
 
             row.append(family.description.strip())
@@ -77,7 +81,7 @@ def format_instances(family, colorize, verbose=False):
         for _ in family.instances.values():
             row = []
             name = _.instance_name
-            if (not _.valid) and colorize:
+            if (_.valid is False) and colorize:
                 name = make_red(name)
 
             row.append(name)
@@ -96,7 +100,7 @@ def format_instances(family, colorize, verbose=False):
         s += indent(format_table_plus(table, colspacing=4), '| ')
 
         for _ in family.instances.values():
-            if not _.valid:
+            if _.valid is False:
                 msg = _.error_if_invalid
                 s += make_red('\n' + indent(msg, '', _.instance_name + ': '))
 
@@ -3,6 +3,7 @@ def jobs_comptests(context):
     from . import summary 
     from . import validity 
     from . import cli 
+    from . import lazy_validation
     
     from comptests.registrar import jobs_registrar_simple
     jobs_registrar_simple(context)
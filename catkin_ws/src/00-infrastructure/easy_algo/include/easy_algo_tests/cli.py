@@ -16,4 +16,12 @@ def test_cli2():
     system_cmd_result(cwd, cmd,
                       display_stdout=True,
                       display_stderr=True,
-                      raise_on_error=True)
\ No newline at end of file
+                      raise_on_error=True)
+@comptest
+def test_cli_validate():
+    cwd = '.'
+    cmd = ['rosrun', 'easy_algo', 'validate']
+    system_cmd_result(cwd, cmd,
+                      display_stdout=True,
+                      display_stderr=True,
+                      raise_on_error=True)
@@ -0,0 +1,113 @@
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.disk_hierarchy import dir_from_data
+from easy_algo.algo_db import EasyAlgoDB
+from easy_algo.formatting import format_db
+
+
+class MyCounterInterface(object):
+    pass
+
+class Counted(MyCounterInterface):
+    ncreated = 0
+    
+    def __init__(self):
+        Counted.ncreated += 1
+
+class NotSub(object):
+    pass
+
+data = """
+"counter.easy_algo_family.yaml": | 
+    description: desc
+    interface: easy_algo_tests.lazy_validation.MyCounterInterface
+
+"one.counter.yaml": |
+    description: desc
+    constructor: easy_algo_tests.lazy_validation.Counted
+    parameters:
+
+"two.counter.yaml": |
+    description: desc
+    constructor: easy_algo_tests.lazy_validation.Counted
+    parameters:
+
+"not_sub.counter.yaml": |
+    description: desc
+    constructor: easy_algo_tests.lazy_validation.NotSub
+    parameters:
+
+"bad.easy_algo_family.yaml": | 
+    description: desc
+    interface: does.not_exist
+    
+"one.bad.yaml": |
+    description: desc
+    constructor: easy_algo_tests.lazy_validation.Counted
+    parameters:
+"""
+
+@comptest
+def test_lazy_create():
+    d = dir_from_data(data)
+    Counted.ncreated = 0
+    db = EasyAlgoDB([d], validate=False)
+    assert Counted.ncreated == 0
+    
+    family = db.get_family('counter')
+    assert family.valid is None
+    assert sorted(family.instances) == ['not_sub', 'one', 'two']
+    assert all(_.valid is None for _ in family.instances.values())
+    
+    format_db(db)
+    
+    one = db.create_instance('counter', 'one')
+    assert type(one).__name__ == 'Counted'
+    # created once, and only that one
+    assert Counted.ncreated == 1
+    family = db.get_family('counter')
+    assert family.valid == True
+    assert family.instances['one'].valid == True
+    assert family.instances['two'].valid is None
+    
+    db.create_instance('counter', 'one')
+    assert Counted.ncreated == 2
+    
+    try:
+        db.create_instance('counter', 'not_sub')
+        raise Exception()
+    except Exception as e:
+        assert 'MyCounterInterface' in str(e), e
+    assert db.get_family('counter').instances['not_sub'].valid == False
+    
+    try:
+        db.create_instance('bad', 'one')
+        raise Exception()
+    except Exception as e:
+        assert 'invalid' in str(e), e
+    
+@comptest
+def test_lazy_validate():
+    d = dir_from_data(data)
+    Counted.ncreated = 0
+    db = EasyAlgoDB([d], validate=False)
+    db.validate()
+    assert Counted.ncreated == 2
+    counter = db.get_family('counter')
+    assert counter.valid == True
+    valid = dict((k, v.valid) for k, v in counter.instances.items())
+    assert valid == {'one': True, 'two': True, 'not_sub': False}, valid
+    bad = db.get_family('bad')
+    assert bad.valid == False
+    assert bad.instances['one'].valid == False
+    
+    # same as validating when loading
+    db2 = EasyAlgoDB([d], validate=True)
+    for family_name, f in db2.family_name2config.items():
+        assert f.valid == db.get_family(family_name).valid
+        for instance_name, i in f.instances.items():
+            assert i.valid == db.get_family(family_name).instances[instance_name].valid
+    
+    
+if __name__ == '__main__':
+    run_module_tests()
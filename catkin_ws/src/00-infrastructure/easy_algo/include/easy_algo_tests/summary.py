@@ -8,6 +8,7 @@ from easy_algo.formatting import format_db
 @comptest
 def call_summary():
     db = get_easy_algo_db()
+    db.validate()
     s = format_db(db)
     logger.info(s)
     
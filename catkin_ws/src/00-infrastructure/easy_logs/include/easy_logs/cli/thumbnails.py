@@ -1,7 +1,6 @@
 from collections import OrderedDict
 from duckietown_utils.bag_info import d8n_get_all_images_topic_bag
-from duckietown_utils.bag_logs import d8n_read_all_images_from_bag
-from duckietown_utils.bag_reading import BagReadProxy
+from duckietown_utils.bag_streaming import BagImageStream
 from duckietown_utils.cli import D8AppWithLogs
 from duckietown_utils.exceptions import DTUserError
 from duckietown_utils.image_composition import make_images_grid
@@ -11,6 +10,7 @@ from duckietown_utils.logging_logger import logger
 import os
 
 from quickapp import QuickApp
+import numpy as np
 
 from easy_logs.cli.easy_logs_summary_imp import format_logs
 
@@ -73,12 +73,6 @@ def work(log, outd, max_images):
     bag.close()
     
     for topic in topics:
-        bag = rosbag.Bag(filename)
-        topics = [_ for _, __ in d8n_get_all_images_topic_bag(bag)]
-        bag_proxy = BagReadProxy(bag, t0, t1)
-        res = d8n_read_all_images_from_bag(bag_proxy, topic, max_images=max_images)
-        bag.close()
-        
         if len(topics) == 1:
             d0 = outd
         else:
@@ -86,17 +80,27 @@ def work(log, outd, max_images):
             if d.startswith('_'):
                 d = d[1:]
             d0 = os.path.join(outd, d)
-        
-        for i in range(len(res)):
-            rgb = res[i]['rgb']
-            filename = os.path.join(d0, ('image-%05d' % i) +'.jpg')
-#             logger.info(filename)
-            write_image_as_jpg(bgr_from_rgb(rgb), filename)
-    
-        images = [_['rgb'] for _ in res]
+
+        # only the images that are used are decoded
+        bag = rosbag.Bag(filename)
+        stream = BagImageStream(bag, topic)
+        nfound = len(stream.select(t0, t1))
+        stride = max(1, int(np.ceil(nfound / float(max_images))))
+        logger.info('Found %d images for %s; stride = %d' % (nfound, topic, stride))
+
+        images = []
+        for i, image in enumerate(stream.read(t0, t1, stride)):
+            fn = os.path.join(d0, ('image-%05d' % i) +'.jpg')
+#             logger.info(fn)
+            write_image_as_jpg(bgr_from_rgb(image.rgb), fn)
+            images.append(image.rgb)
+        bag.close()
+
+        if not images:
+            raise ValueError('no data found')
         grid = make_images_grid(images)
-        filename = os.path.join(d0, 'grid.jpg')
-        write_image_as_jpg(bgr_from_rgb(grid), filename)
+        fn = os.path.join(d0, 'grid.jpg')
+        write_image_as_jpg(bgr_from_rgb(grid), fn)
             
 #         logger.info('done')
         
@@ -5,6 +5,8 @@ import os
 from duckietown_utils import (
     format_time_as_YYYY_MM_DD,
     friendly_path, fuzzy_match, filters0, get_cached, rosbag_info_cached,
+    rosbag_info_cached_many,
+    get_fingerprint_of_code, get_fingerprint_of_files,
     get_duckietown_root, logger,
     look_everywhere_for_bag_files, yaml_load_file, yaml_write_to_file)
 from duckietown_utils import check_isinstance
@@ -20,7 +22,8 @@ def get_easy_logs_db():
 def get_easy_logs_db_cached_if_possible():
     if EasyLogsDB._singleton is None:
         f = EasyLogsDB
-        EasyLogsDB._singleton = get_cached('EasyLogsDB', f)
+        EasyLogsDB._singleton = get_cached('EasyLogsDB', f,
+                                           fingerprint=get_easy_logs_db_fingerprint())
 
         fn = os.path.join(get_duckietown_root(),'caches','candidate_cloud.yaml')
 
@@ -33,6 +36,12 @@ def get_easy_logs_db_cached_if_possible():
 
     return EasyLogsDB._singleton
 
+def get_easy_logs_db_fingerprint():
+    """ The cached DB is valid as long as the bag files and the code are the same. """
+    basename2filename = look_everywhere_for_bag_files()
+    return (get_fingerprint_of_files(basename2filename.values()),
+            get_fingerprint_of_code(['easy_logs']))
+
 def get_easy_logs_db_fresh():
     if EasyLogsDB._singleton is None:
         f = EasyLogsDB
@@ -82,10 +91,12 @@ class EasyLogsDB():
                              raise_if_no_matches=raise_if_no_matches)
         return result
 
-def read_stats(pl):
+def read_stats(pl, info='not-given'):
+    """ info is the result of rosbag_info(); if not given, it is computed. """
     assert isinstance(pl, PhysicalLog)
 
-    info = rosbag_info_cached(pl.filename)
+    if info == 'not-given':
+        info = rosbag_info_cached(pl.filename)
     if info is None:
         return pl._replace(valid=False, error_if_invalid='Not indexed')
 
@@ -131,15 +142,21 @@ def is_valid_name(basename):
 def load_all_logs(which='*'):
     pattern = which + '.bag'
     basename2filename = look_everywhere_for_bag_files(pattern=pattern)
-    logs = OrderedDict()
+    valid = OrderedDict()
     for basename, filename in basename2filename.items():
-        log_name = basename
-
         if not is_valid_name(basename):
             msg = 'Ignoring Bag file with invalid file name "%r".' % (basename)
             msg += '\n Full path: %s' % filename
             logger.warn(msg)
             continue
+        valid[basename] = filename
+
+    # only the new or changed bags are read, in parallel
+    filename2info = rosbag_info_cached_many(valid.values())
+
+    logs = OrderedDict()
+    for basename, filename in valid.items():
+        log_name = basename
 
         date = None
         size =  os.stat(filename).st_size
@@ -157,7 +174,7 @@ def load_all_logs(which='*'):
                         bag_info=None,
                         valid=True,
                         error_if_invalid=None)
-        l = read_stats(l)
+        l = read_stats(l, filename2info[filename])
         logs[l.log_name]= l
 
     return logs
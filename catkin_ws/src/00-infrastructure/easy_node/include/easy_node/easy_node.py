@@ -1,19 +1,24 @@
 from UserDict import UserDict
 from contextlib import contextmanager
+import copy
 import rospy
 import threading
+import time
 
 from duckietown_utils import DTConfigException
 from duckietown_utils import DuckietownConstants
 from duckietown_utils import indent
 from duckietown_utils import raise_wrapped
 from duckietown_utils import rospy_timeit_wall
+from duckietown_utils import WorkerPool
+from duckietown_utils import write_data_to_file
 from duckietown_utils import yaml_dump
+from duckietown_utils import yaml_load
 
-from .node_description.configuration import PROCESS_THREADED, PROCESS_SYNCHRONOUS
-from .node_description.configuration import load_configuration_package_node
+from .node_description.configuration import PROCESS_THREADED, PROCESS_SYNCHRONOUS, PROCESS_POOL
+from .node_description.configuration import load_configuration_package_node, check_parameter_values
 from .user_config.decide import get_user_configuration
-from .utils.timing import ProcessingTimingStats
+from .utils.timing import ProcessingTimingStats, merge_snapshots_by_message_type
 
 
 __all__ = [
@@ -25,6 +30,9 @@ class EasyNode():
 
     ENV = DuckietownConstants.DUCKIETOWN_CONFIG_SEQUENCE_variable
 
+    UPDATE_PARAMS_POLL = 'poll'
+    UPDATE_PARAMS_TOPIC = 'topic'
+
     def __init__(self, package_name, node_type_name):
         self.package_name = package_name
         self.node_type_name = node_type_name
@@ -43,7 +51,7 @@ class EasyNode():
 
     def error(self, msg):
         msg = self._msg(msg)
-        rospy.logerror(msg)  # @UndefinedVariable
+        rospy.logerr(msg)  # @UndefinedVariable
 
     def on_init(self):
         self.info('on_init (default)')
@@ -62,6 +70,7 @@ class EasyNode():
         self._init_publishers()
         self._init_parameters()
         self._init_subscriptions()
+        self._init_timing_stats_export()
         self.info(self._configuration)
 
     def _init_subscriptions(self):
@@ -71,14 +80,25 @@ class EasyNode():
             pass
         self.subscribers = Subscribers()
 
+        window = self.config.en_timing_stats_window
+
         class SubscriberProxy():
             def __init__(self, sub):
                 self.sub = sub
-                self.pts = ProcessingTimingStats()
+                self.pts = ProcessingTimingStats(window=window)
 
             def init_threaded(self):
                 self.thread_lock = threading.Lock()
 
+            def init_pool(self, subscription):
+                def on_drop(_job):
+                    self.pts.decided_to_skip()
+                self.pool = WorkerPool(name=subscription.name, 
+                                       nworkers=subscription.workers, 
+                                       queue_size=subscription.backlog, 
+                                       overflow=subscription.overflow,
+                                       on_drop=on_drop)
+
         class Callback():
             def __init__(self, node, subscription):
                 self.node = node
@@ -90,6 +110,7 @@ class EasyNode():
                 self.node._sub_callback(
                     self.subscription, subscriber_proxy, data)
 
+        self._subscription_names = list(subscriptions)
         for s in subscriptions.values():
             callback = Callback(node=self, subscription=s)
             S = rospy.Subscriber(s.topic, s.type, callback, # @UndefinedVariable
@@ -100,6 +121,8 @@ class EasyNode():
             self.info('Subscribed to %s' % s.topic)
             if s.process == PROCESS_THREADED:
                 sp.init_threaded()
+            if s.process == PROCESS_POOL:
+                sp.init_pool(s)
 
     def _sub_callback(self, subscription, subscriber_proxy, data):
         subscriber_proxy.pts.received_message(data)
@@ -116,6 +139,11 @@ class EasyNode():
                 thread = threading.Thread(target=target, args=args)
                 thread.setDaemon(True)
                 thread.start()
+            elif subscription.process == PROCESS_POOL:
+                def job():
+                    subscriber_proxy.pts.decided_to_process(data)
+                    self._call_callback(callback_name, subscription, data)
+                subscriber_proxy.pool.submit(job)
             else:
                 assert False, subscription.process
         else:
@@ -135,7 +163,19 @@ class EasyNode():
                     yield
 
             def get_stats(self):
-                return self.sp.pts.get_stats()
+                s = self.sp.pts.get_stats()
+                if self.subscription.process == PROCESS_POOL:
+                    s += '\n' + self.sp.pool.get_stats()
+                return s
+
+            def get_scheduler_counters(self):
+                """ 
+                    Returns the counters of the worker pool (see WorkerPool.get_counters()),
+                    or None if the subscription does not use a pool. 
+                """
+                if self.subscription.process == PROCESS_POOL:
+                    return self.sp.pool.get_counters()
+                return None
 
         context = Context(self, subscription)
         return context
@@ -160,6 +200,41 @@ class EasyNode():
         finally:
             pass
 
+    def get_timing_stats_snapshot(self):
+        """ 
+            Returns the timing statistics of all subscriptions, and the
+            throughput for each message type, as a dict that can be 
+            written as YAML. 
+        """
+        subscriptions = {}
+        for name in self._subscription_names:
+            subscriptions[name] = getattr(self.subscribers, name).pts.get_snapshot()
+        return {
+            'package_name': self.package_name,
+            'node_name': self.node_type_name,
+            'time': time.time(),
+            'subscriptions': subscriptions,
+            'message_types': merge_snapshots_by_message_type(subscriptions),
+        }
+
+    def _init_timing_stats_export(self):
+        interval = self.config.en_timing_stats_interval
+        if not interval:
+            return
+        if self.config.en_timing_stats_publish:
+            from std_msgs.msg import String  # @UnresolvedImport
+            self._timing_stats_publisher = rospy.Publisher('~timing_stats', String, # @UndefinedVariable
+                                                           queue_size=1, latch=True) 
+        duration = rospy.Duration.from_sec(interval)  # @UndefinedVariable
+        rospy.Timer(duration, self._export_timing_stats)  # @UndefinedVariable
+
+    def _export_timing_stats(self, _event):
+        s = yaml_dump(self.get_timing_stats_snapshot())
+        if self.config.en_timing_stats_file:
+            write_data_to_file(s, self.config.en_timing_stats_file)
+        if self.config.en_timing_stats_publish:
+            self._timing_stats_publisher.publish(s)
+
     def _init_publishers(self):
         publishers = self._configuration.publishers
 
@@ -185,6 +260,7 @@ class EasyNode():
                 return object.__getattr__(self, name)
             
         self.config = Config()
+        self._parameters_lock = threading.Lock()
         values = {}
 
         # load the configuration
@@ -216,9 +292,19 @@ class EasyNode():
             
         self. _on_parameters_changed(first_time=True, values=values)
 
-        duration = self.config.en_update_params_interval
-        duration = rospy.Duration.from_sec(duration)  # @UndefinedVariable
-        rospy.Timer(duration, self._update_parameters)  # @UndefinedVariable
+        mode = self.config.en_update_params_mode
+        if mode == EasyNode.UPDATE_PARAMS_POLL:
+            duration = self.config.en_update_params_interval
+            duration = rospy.Duration.from_sec(duration)  # @UndefinedVariable
+            rospy.Timer(duration, self._update_parameters)  # @UndefinedVariable
+        elif mode == EasyNode.UPDATE_PARAMS_TOPIC:
+            from std_msgs.msg import String  # @UnresolvedImport
+            rospy.Subscriber('~set_parameters', String,   # @UndefinedVariable
+                             self._on_set_parameters, queue_size=10)
+        else:
+            msg = ('Invalid value %r for en_update_params_mode; expected %r or %r.' % 
+                   (mode, EasyNode.UPDATE_PARAMS_POLL, EasyNode.UPDATE_PARAMS_TOPIC))
+            raise DTConfigException(msg)
 
     def _on_parameters_changed(self, first_time, values):
         try:
@@ -239,18 +325,23 @@ class EasyNode():
         changed = self._get_changed_parameters()
 #         self.info('Parameters changed: %s' % sorted(changed))
         if changed:
-            for k, v in changed.items():
-                setattr(self.config, k, v)
-            self._on_parameters_changed(False, changed)
+            self._apply_parameters(changed)
         else:
             pass
             # self.info('No change in parameters.')
 
     def _get_changed_parameters(self):
+        # all the private parameters, with one call to the parameter server
+        all_values = rospy.get_param('~', {})  # @UndefinedVariable
+        return self._changed_values(all_values)
+
+    def _changed_values(self, values):
         parameters = self._configuration.parameters
         changed = {}
         for p in parameters.values():
-            val = rospy.get_param('~' + p.name)  # @UndefinedVariable
+            if not p.name in values:
+                continue
+            val = values[p.name]
             current = getattr(self.config, p.name)
             s1 = current.__repr__()
             s2 = val.__repr__()
@@ -259,6 +350,39 @@ class EasyNode():
 #                 setattr(self.config, p.name, current)
         return changed
 
+    def _on_set_parameters(self, msg):
+        try:
+            values = yaml_load(msg.data)
+            values = check_parameter_values(self._configuration.parameters, values)
+        except Exception as e:
+            self.error('Ignoring the update of the parameters:\n%s\n\n%s' % (msg.data, e))
+            return
+        changed = self._changed_values(values)
+        if changed:
+            self._write_parameter_server(changed)
+            self._apply_parameters(changed)
+
+    def _write_parameter_server(self, values):
+        # keep the parameter server up to date, for transparency
+        for k, v in values.items():
+            if v is not None:
+                rospy.set_param('~' + k, v)  # @UndefinedVariable
+
+    def _apply_parameters(self, changed):
+        """ 
+            Sets all the changed values at once, by replacing self.config
+            with a new object. A callback that reads self.config once per
+            call (config = self.config) sees either the old or the new
+            values, never a mix of the two; one that reads self.config.x
+            and later self.config.y can still see both. 
+        """
+        with self._parameters_lock:
+            config = copy.copy(self.config)
+            for k, v in changed.items():
+                setattr(config, k, v)
+            self.config = config
+            self._on_parameters_changed(False, changed)
+
     def spin(self):
         rospy.on_shutdown(self.on_shutdown)  # @UndefinedVariable
         self._init()
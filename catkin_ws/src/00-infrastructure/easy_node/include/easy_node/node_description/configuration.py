@@ -4,6 +4,7 @@ from types import NoneType
 
 from duckietown_utils import DTConfigException, contract, format_table_plus, wrap_line_length,\
     indent, remove_table_field, get_ros_package_path, import_name, locate_files, raise_wrapped, yaml_load
+from duckietown_utils.worker_pool import OVERFLOW_LATEST_ONLY, OVERFLOW_VALUES
 
 
 # import yaml
@@ -14,12 +15,14 @@ __all__ = [
 
 EasyNodeConfig = namedtuple('EasyNodeConfig', 'filename package_name node_type_name description parameters subscriptions contracts publishers')
 EasyNodeParameter = namedtuple('EasyNodeParameter', 'name desc type has_default default')
-EasyNodeSubscription = namedtuple('EasyNodeSubscription', 'name desc type topic queue_size process latch timeout')
+EasyNodeSubscription = namedtuple('EasyNodeSubscription', 'name desc type topic queue_size process latch timeout workers backlog overflow')
 EasyNodePublisher = namedtuple('EasyNodePublisher', 'name desc type topic queue_size latch')
 
 PROCESS_THREADED = 'threaded'
 PROCESS_SYNCHRONOUS = 'synchronous'
-PROCESS_VALUES = [PROCESS_THREADED, PROCESS_SYNCHRONOUS]
+# A fixed pool of worker threads with a bounded queue (see WorkerPool)
+PROCESS_POOL = 'pool'
+PROCESS_VALUES = [PROCESS_THREADED, PROCESS_SYNCHRONOUS, PROCESS_POOL]
 
 
 
@@ -209,6 +212,37 @@ def load_configuration_parameter(name, data):
     return EasyNodeParameter(name=name, desc=desc, type=T,
                              has_default=has_default, default=default)
 
+def check_parameter_values(parameters, values):
+    """
+        Checks an update of some of the parameters (a dict name -> value),
+        given the dict name -> EasyNodeParameter. Returns the values
+        converted to the types of the parameters (e.g. 1 -> 1.0 for a float).
+        
+        Raises DTConfigException if any of them is not valid, so that 
+        the update can be rejected as a whole.
+    """
+    if not isinstance(values, dict):
+        msg = 'Expected a dict of values, got %s.' % type(values).__name__
+        raise DTConfigException(msg)
+    res = {}
+    for k, v in values.items():
+        if not k in parameters:
+            msg = 'Unknown parameter %r; known: %s.' % (k, sorted(parameters))
+            raise DTConfigException(msg)
+        T = parameters[k].type
+        if v is not None and T is not None:
+            numeric = isinstance(v, (int, float)) and not isinstance(v, bool)
+            if T is float and numeric:
+                v = float(v)
+            elif T is int and numeric and v == int(v):
+                v = int(v)
+            elif not isinstance(v, T):
+                msg = ('Parameter %r should be a %s, got %r.' % 
+                       (k, T.__name__, v))
+                raise DTConfigException(msg)
+        res[k] = v
+    return res
+
 def check_good_name(k):
     # TODO
     pass
@@ -251,6 +285,20 @@ def load_configuration_subscription(name, data):
         if not process in PROCESS_VALUES:
             msg = 'Invalid value of process %r not in %r.' % (process, PROCESS_VALUES)
             raise DTConfigException(msg)
+        # only used if process == PROCESS_POOL
+        workers = int(data.pop('workers', 1))
+        backlog = int(data.pop('backlog', 1))
+        overflow = data.pop('overflow', OVERFLOW_LATEST_ONLY)
+        if not overflow in OVERFLOW_VALUES:
+            msg = 'Invalid value of overflow %r not in %r.' % (overflow, OVERFLOW_VALUES)
+            raise DTConfigException(msg)
+        if process != PROCESS_POOL and (workers != 1 or backlog != 1 or 
+                                        overflow != OVERFLOW_LATEST_ONLY):
+            msg = 'The fields workers, backlog, overflow only make sense with process = %r.' % PROCESS_POOL
+            raise DTConfigException(msg)
+        if overflow == OVERFLOW_LATEST_ONLY and backlog != 1:
+            msg = 'With overflow = %r the backlog is always 1.' % OVERFLOW_LATEST_ONLY
+            raise DTConfigException(msg)
 
     except KeyError as e:
         msg = 'Could not find field %r.' % e
@@ -266,7 +314,8 @@ def load_configuration_subscription(name, data):
     T = message_class_from_string(type_)
 
     return EasyNodeSubscription(name=name, desc=desc, topic=topic, timeout=timeout,
-                                type=T, queue_size=queue_size, latch=latch, process=process)
+                                type=T, queue_size=queue_size, latch=latch, process=process,
+                                workers=workers, backlog=backlog, overflow=overflow)
 
 
 def load_configuration_publisher(name, data):
@@ -367,6 +416,10 @@ def format_enc_subscriptions(enc, descriptions):
             options.append('latch = %s ' %  p.latch)
         if p.timeout is not None:
             options.append('timeout = %s ' %  p.timeout)
+        if p.process == PROCESS_POOL:
+            options.append('workers = %s' % p.workers)
+            options.append('backlog = %s' % p.backlog)
+            options.append('overflow = %s' % p.overflow)
 
         options = '\n'.join(options)
         table.append([p.name, p.type.__name__, p.topic, options, p.process, desc])
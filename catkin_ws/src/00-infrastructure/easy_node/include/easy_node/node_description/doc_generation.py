@@ -4,7 +4,7 @@ from duckietown_utils import logger
 from duckietown_utils.constants import get_list_of_packages_in_catkin_ws
 from duckietown_utils.read_package_xml import read_package_xml_info, Person, PackageXML
 
-from .configuration import EasyNodeConfig, PROCESS_THREADED, load_configuration_for_nodes_in_package
+from .configuration import EasyNodeConfig, PROCESS_THREADED, PROCESS_POOL, load_configuration_for_nodes_in_package
 
 
 def generate_easy_node_docs():
@@ -185,6 +185,10 @@ def generate_configuration(config):
 
         if subscription.process == PROCESS_THREADED:
             md += 'Note: The data is processed *asynchronously* in a different thread.\n\n'
+        if subscription.process == PROCESS_POOL:
+            md += ('Note: The data is processed *asynchronously* by %d worker thread(s); '
+                   'at most %d message(s) wait in the queue (overflow policy: `%s`).\n\n' % 
+                   (subscription.workers, subscription.backlog, subscription.overflow))
 
     md += '### Publishers {nonumber="1"}' + S
 
@@ -1,16 +1,19 @@
 from collections import defaultdict
+import os
 
 import yaml
 
 from duckietown_utils import logger
-from duckietown_utils.caching import get_cached
-from duckietown_utils.constants import get_list_of_packages_in_catkin_ws
+from duckietown_utils.caching import get_cache_store, get_fingerprint_of_code, get_fingerprint_of_files
+from duckietown_utils.constants import get_catkin_ws_src, get_list_of_packages_in_catkin_ws
 from duckietown_utils.exceptions import DTConfigException
 from duckietown_utils.instantiate_utils import indent
 from duckietown_utils.system_cmd_imp import contract
 from duckietown_utils.text_utils import format_table_plus 
 from easy_node.node_description.configuration import load_configuration_for_nodes_in_package, EasyNodeConfig
-from easy_node.user_config.get_configuration_files import get_all_configuration_files
+from easy_node.user_config.get_configuration_files import get_all_configuration_files, search_all_configuration_files,\
+    interpret_config_file
+from duckietown_utils.locate_files_impl import locate_files
 from duckietown_utils.friendly_path_imp import friendly_path
 
 
@@ -19,27 +22,100 @@ class ValidationError(Exception):
 
 
 def get_config_db():
+    """
+        Returns the ConfigDB. Only the configuration files and the node
+        descriptions that changed since the last time are parsed again.
+    """
     if ConfigDB._singleton is None:
-        ConfigDB._singleton = get_cached('ConfigDB', ConfigDB)
+        parsed = ParsedFiles(get_cache_store(), get_fingerprint_of_code(['easy_node']))
+        
+        configs = []
+        for filename in search_all_configuration_files():
+            f = lambda: interpret_config_file(filename)
+            configs.append(parsed.get(filename, [filename], f))
+        
+        packages = get_list_of_packages_in_catkin_ws()
+        node_files = locate_files(get_catkin_ws_src(), '*.easy_node.yaml')
+        def files_in(package_name):
+            d = packages[package_name] + os.sep
+            return [_ for _ in node_files if _.startswith(d)]
+        # all nodes depend on the baseline configuration
+        baseline = files_in('easy_node') if 'easy_node' in packages else []
+        
+        package2nodes = {}
+        for p in packages:
+            f = lambda: load_configuration_for_nodes_in_package(p)
+            package2nodes[p] = parsed.get(('package', p), files_in(p) + baseline, f)
+        
+        parsed.save()
+        ConfigDB._singleton = ConfigDB(configs, package2nodes)
     return ConfigDB._singleton
 
+
+class ParsedFiles():
+    """ 
+        The results of parsing each file (or group of files), stored in 
+        one cache entry together with the stamps (path, mtime, size) of 
+        the files, and recomputed only if the stamps change. 
+    """
+    cache_name = 'ConfigDB-parsed'
+    
+    def __init__(self, store, fingerprint):
+        """ The fingerprint is the one of the code that parses the files. """
+        self.store = store
+        self.fingerprint = fingerprint
+        found, data = store.get(self.cache_name, fingerprint)
+        # key -> (stamp, result)
+        self.data = data if found else {}
+        self.used = set()
+        self.changed = False
+    
+    def get(self, key, filenames, f):
+        stamp = get_fingerprint_of_files(filenames)
+        self.used.add(key)
+        if key in self.data and self.data[key][0] == stamp:
+            return self.data[key][1]
+        logger.debug('Parsing %s' % str(key))
+        result = f()
+        self.data[key] = (stamp, result)
+        self.changed = True
+        return result
+    
+    def save(self):
+        """ Saves the results, forgetting the files that were not used. """
+        for key in list(self.data):
+            if not key in self.used:
+                del self.data[key]
+                self.changed = True
+        if self.changed:
+            self.store.put(self.cache_name, self.fingerprint, self.data)
+            self.changed = False
+
+
 class ConfigDB():
 
     _singleton = None
 
-    def __init__(self):
-        # Load all configuration
-        # filename2contents = look_everywhere_for_config_files()
+    def __init__(self, configs=None, package2nodes=None):
+        """ 
+            configs: list of ConfigInfo (by default, all the configuration files)
+            package2nodes: package name -> node name -> EasyNodeConfig 
+                (by default, the nodes of all the packages) 
+        """
+        if configs is None:
+            logger.debug('Reading configuration files...')
+            configs = get_all_configuration_files()
+        self.configs = list(configs)
         
-        logger.debug('Reading configuration files...')
-        self.configs = get_all_configuration_files()
-        self.package2nodes = {}
-
-        packages = get_list_of_packages_in_catkin_ws()
-
-        logger.debug('Reading %d packages configuration...' % len(packages))
-        for p in packages:
-            self.package2nodes[p] = load_configuration_for_nodes_in_package(p)
+        if package2nodes is None:
+            package2nodes = {}
+            packages = get_list_of_packages_in_catkin_ws()
+            logger.debug('Reading %d packages configuration...' % len(packages))
+            for p in packages:
+                package2nodes[p] = load_configuration_for_nodes_in_package(p)
+        self.package2nodes = package2nodes
+        
+        self._build_index()
 
         logger.debug('Validating configuration...')
         
@@ -52,6 +128,20 @@ class ConfigDB():
                 c = c._replace(error_if_invalid=str(e))
                 
             self.configs[i] = c 
+        
+        self._build_index()
+    
+    def _build_index(self):
+        # (package_name, node_name, config_name) -> list of ConfigInfo, by date_effective
+        self.index = {}
+        for c in self.configs:
+            key = (c.package_name, c.node_name, c.config_name)
+            self.index.setdefault(key, []).append(c)
+        for l in self.index.values():
+            l.sort(key=lambda _: _.date_effective)
+    
+    def config_exists(self, package_name, node_name, config_name):
+        return (package_name, node_name, config_name) in self.index
 
     def validate_file(self, c):
         # first, check that indeed we have a package by that name
@@ -78,17 +168,15 @@ class ConfigDB():
                 raise ValidationError(msg) 
     
     def find(self, package_name, node_name, config_name, date):
-        results = []
-        for c in self.configs:
-            match = (package_name == c.package_name) and \
-                    (node_name == c.node_name) and \
-                    (config_name == c.config_name)
-            if match:
-                results.append(c)
-        if len(results) > 1:
-            raise NotImplementedError('Sort by date')
+        """ 
+            Returns the ConfigInfo effective at the given date (the most
+            recent one if date is None), or None. 
+        """
+        results = self.index.get((package_name, node_name, config_name), [])
+        if date is not None:
+            results = [_ for _ in results if _.date_effective <= date]
         if results:
-            return results[0]
+            return results[-1]
         else:
             return None
             
@@ -9,6 +9,7 @@ from duckietown_utils import logger
 from duckietown_utils.constants import get_catkin_ws_src, get_duckiefleet_root
 from duckietown_utils.exception_utils import raise_wrapped
 from duckietown_utils.exceptions import DTConfigException
+from duckietown_utils.friendly_path_imp import friendly_path
 from duckietown_utils.instantiate_utils import indent
 from duckietown_utils.locate_files_impl import locate_files
 
@@ -83,15 +84,13 @@ def interpret_config_file(filename):
             msg = 'Too many periods/tokens (tokens=%s)' % tokens
             raise DTConfigException(msg)
         
-        if len(tokens) <= 2:
-            #  package-node.config_name
-            package_node = tokens[0]
-            if not '-' in package_node:
-                msg = 'Expected a "-" in "%s".' % package_node
-                raise DTConfigException(msg)
-            i = package_node.index('-')
-            package_name = package_node[:i]
-            node_name  = package_node[i+1:]
+        package_node = tokens[0]
+        if not '-' in package_node:
+            msg = 'Expected a "-" in "%s".' % package_node
+            raise DTConfigException(msg)
+        i = package_node.index('-')
+        package_name = package_node[:i]
+        node_name  = package_node[i+1:]
         
         config_name = tokens[1]
         
@@ -1,12 +1,17 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import contextmanager
 import rospy
+import threading
 import time
 
 from duckietown_utils.text_utils import seconds_as_ms
 
 
-__all__ = ['ProcessingTimingStats']
+__all__ = [
+    'ProcessingTimingStats',
+    'SingleStat',
+    'merge_snapshots_by_message_type',
+]
 
 class ProcessingTimingStats():
     """
@@ -49,9 +54,15 @@ class ProcessingTimingStats():
                 ...
                 
         A call to reset() resets all counters.
+        
+        The memory used is fixed: the percentiles are computed on the
+        last `window` samples of each statistic.
     """
     
-    def __init__(self):
+    def __init__(self, window=1000, get_time=None):
+        """ get_time: function returning the current time (default: rospy.get_time) """
+        self.window = window
+        self.get_time = get_time or rospy.get_time  # @UndefinedVariable
         self.num_resets = 0
         self.reset()
         
@@ -59,12 +70,15 @@ class ProcessingTimingStats():
         self.events = []
         self.last_msg_received = None
         self.last_msg_being_processed = None
-        self.stats = defaultdict(lambda: SingleStat())
+        self.message_type = None
+        self.stats = defaultdict(lambda: SingleStat(self.window, self.get_time))
         self.phase_names = []
         
     def received_message(self, msg):
         self.stats['received'].sample()
         self.last_msg_received= msg.header.stamp.to_sec()
+        if self.message_type is None:
+            self.message_type = getattr(msg, '_type', type(msg).__name__)
     
     def decided_to_process(self, msg):
         self.last_msg_being_processed = msg.header.stamp.to_sec()
@@ -78,14 +92,14 @@ class ProcessingTimingStats():
         if not phase_name in self.phase_names:
             self.phase_names.append(phase_name)
             
-        t1 = rospy.get_time()   # @UndefinedVariable
+        t1 = self.get_time()
         c1 = time.clock() 
                     
         try:
             yield
         finally:
             c2 = time.clock()
-            t2 = rospy.get_time()   # @UndefinedVariable
+            t2 = self.get_time()
             delta_clock = c2 - c1
             delta_wall = t2 - t1
             latency_from_acquisition = t2 - self.last_msg_being_processed
@@ -121,8 +135,37 @@ class ProcessingTimingStats():
             delta_clock = seconds_as_ms(stats_clock.last_value())
             msg = ('%20s | total latency %10s | delta wall %10s | delta clock %10s' %
                    (phase_name, total_latency, delta_wall, delta_clock))
+            p = stats_wall.percentiles([50, 90, 99])
+            msg += (' | wall p50 %10s p90 %10s p99 %10s max %10s' % 
+                    (seconds_as_ms(p[0]), seconds_as_ms(p[1]), seconds_as_ms(p[2]), 
+                     seconds_as_ms(stats_wall.max_value())))
             s += '\n' + msg
         return s
+    
+    def get_snapshot(self):
+        """ 
+            Returns the statistics as a dictionary of plain values,
+            that can be written as YAML:
+            
+                message_type: ...
+                received/processed/skipped: 
+                    num, fps, fps_recent
+                phases:
+                    phase name:
+                        wall/clock/latency:
+                            num, last, p50, p90, p99, max
+        """
+        res = {}
+        res['message_type'] = self.message_type
+        for k in ['received', 'processed', 'skipped']:
+            res[k] = self.stats[k].get_summary(values=False)
+        res['phases'] = {}
+        for phase_name in self.phase_names:
+            res['phases'][phase_name] = {}
+            for what in ['wall', 'clock', 'latency']:
+                stat = self.stats[(phase_name, what)]
+                res['phases'][phase_name][what] = stat.get_summary(rates=False)
+        return res
 #                 acquired | total latency 49737091899.9ms | delta wall     None clock     None
 #                 decoded | total latency 49737091904.6ms | delta wall    4.7ms clock    4.8ms
 #                 resized | total latency 49737091904.9ms | delta wall    0.3ms clock    0.3ms
@@ -135,25 +178,77 @@ class ProcessingTimingStats():
 #    pub_edge/pub_segment | total latency 49737091910.8ms | delta wall    1.1ms clock    1.1ms
    
 class SingleStat():
+    """ 
+        Statistics of a series of samples, in fixed memory: the number
+        of samples, the time of the first one, the last value and the
+        maximum are kept for all of them; the times and the values
+        only for the last `window` ones. 
+    """
     
-    def __init__(self):
-        self.times = []
-        self.values = []
+    def __init__(self, window=1000, get_time=None):
+        self.get_time = get_time or rospy.get_time  # @UndefinedVariable
+        self.times = deque(maxlen=window)
+        self.values = deque(maxlen=window)
+        self.n = 0
+        self.first_time = None
+        self.last = None
+        self.max = None
+        self.lock = threading.Lock()
     
     def sample(self, v=None):
-        t = rospy.get_time()  # @UndefinedVariable
-        self.times.append(t)
-        self.values.append(v)
+        t = self.get_time()
+        with self.lock:
+            if self.first_time is None:
+                self.first_time = t
+            self.n += 1
+            self.times.append(t)
+            self.last = v
+            if v is not None:
+                self.values.append(v)
+                if self.max is None or v > self.max:
+                    self.max = v
 
     def last_value(self):
-        if self.values:
-            return self.values[-1]
-        else:
-            return None
+        return self.last
+    
+    def max_value(self):
+        """ Returns the maximum of all the values, or None. """
+        return self.max
+    
+    def percentiles(self, ps):
+        """ 
+            Returns the given percentiles (0-100) of the last values
+            (None if there are none). 
+        """
+        with self.lock:
+            values = sorted(self.values)
+        if not values:
+            return [None for _ in ps]
+        n = len(values)
+        # nearest rank
+        return [values[min(n - 1, int(p / 100.0 * n))] for p in ps]
     
     def num(self):
         """ Returns the number of samples. """
-        return len(self.times)
+        return self.n
+    
+    def rate(self):
+        """ Returns the number of samples per second since the first one. """
+        duration = self.duration()
+        if self.n == 0 or duration <= 0:
+            return 0.0
+        return self.n / duration
+    
+    def rate_recent(self):
+        """ Returns the number of samples per second among the last ones. """
+        with self.lock:
+            if len(self.times) < 2:
+                return 0.0
+            duration = self.times[-1] - self.times[0]
+            n = len(self.times) - 1
+        if duration <= 0:
+            return 0.0
+        return n / duration
     
     def fps(self):
         """ Returns the frames per second as a string. """
@@ -161,13 +256,42 @@ class SingleStat():
         if n == 0:
             return '0 fps'
         else:
-            duration = self.duration()
-            f = n / duration
-            return '%.1f fps' % f
+            return '%.1f fps' % self.rate()
              
     def duration(self):
-        delta = rospy.get_time()  # @UndefinedVariable
-        return delta - self.times[0]
+        if self.first_time is None:
+            return 0.0
+        delta = self.get_time()
+        return delta - self.first_time
+    
+    def get_summary(self, values=True, rates=True):
+        res = {'num': self.num()}
+        if rates:
+            res['fps'] = self.rate()
+            res['fps_recent'] = self.rate_recent()
+        if values:
+            p50, p90, p99 = self.percentiles([50, 90, 99])
+            res.update(last=self.last_value(), p50=p50, p90=p90, p99=p99,
+                       max=self.max_value())
+        return res
+
+
+def merge_snapshots_by_message_type(snapshots):
+    """ 
+        Given a dict name -> ProcessingTimingStats.get_snapshot(),
+        returns the total throughput for each message type, as a dict
+        message_type -> dict(received=fps, processed=fps, skipped=fps).
+    """
+    res = {}
+    for snapshot in snapshots.values():
+        message_type = snapshot['message_type']
+        if message_type is None:
+            continue
+        if not message_type in res:
+            res[message_type] = dict(received=0.0, processed=0.0, skipped=0.0)
+        for k in ['received', 'processed', 'skipped']:
+            res[message_type][k] += snapshot[k]['fps_recent']
+    return res
     
 def get_percentage(i, n):
     if n == 0: 
@@ -3,6 +3,9 @@
 def jobs_comptests(context):  
     from . import summary 
     from . import test_configuration 
+    from . import config_db
+    from . import timing_stats
+    from . import param_updates
     
 
     from comptests.registrar import jobs_registrar_simple
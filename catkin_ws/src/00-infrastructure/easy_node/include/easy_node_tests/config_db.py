@@ -0,0 +1,129 @@
+from datetime import datetime
+import os
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils.caching import MemoryStore
+from duckietown_utils.disk_hierarchy import dir_from_data
+from duckietown_utils.locate_files_impl import locate_files
+from easy_node.node_description.configuration import load_configuration
+from easy_node.user_config.db import ConfigDB, ParsedFiles
+from easy_node.user_config.get_configuration_files import interpret_config_file
+
+
+node_description = """
+description: A node.
+subscriptions: {}
+publishers: {}
+contracts: {}
+parameters:
+    a:
+        desc: a
+        type: int
+        default: 1
+    b:
+        desc: b
+        type: int
+        default: 2
+"""
+
+data = """
+"pkg-node.baseline.config.yaml": |
+    description: baseline
+    values:
+        a: 10
+
+"pkg-node.baseline.20180301.config.yaml": |
+    description: baseline since March 2018
+    values:
+        a: 11
+
+"pkg-node.fast.config.yaml": |
+    description: fast
+    extends: [baseline]
+    values:
+        b: 20
+
+"pkg-node.unknown.config.yaml": |
+    description: unknown parameter
+    values:
+        c: 1
+
+"pkg-node.missing.config.yaml": |
+    description: extends something that does not exist
+    extends: [not_there]
+    values: {}
+"""
+
+
+def get_test_db(d):
+    filenames = locate_files(d, '*.config.yaml')
+    configs = [interpret_config_file(_) for _ in filenames]
+    node = load_configuration('node.easy_node.yaml', node_description)
+    package2nodes = {'pkg': {'node': node}}
+    return ConfigDB(configs, package2nodes)
+
+
+@comptest
+def test_config_db_index():
+    db = get_test_db(dir_from_data(data))
+
+    valid = dict((c.config_name, c.valid) for c in db.configs)
+    assert valid == {'baseline': True, 'fast': True, 'unknown': False, 'missing': False}, valid
+
+    assert db.config_exists('pkg', 'node', 'fast')
+    assert not db.config_exists('pkg', 'node', 'slow')
+    assert db.find('pkg', 'other', 'fast', date=None) is None
+
+    # the most recent one, unless asked for a date
+    assert db.find('pkg', 'node', 'baseline', date=None).values['a'] == 11
+    c = db.find('pkg', 'node', 'baseline', date=datetime(2018, 1, 1))
+    assert c.values['a'] == 10
+
+    qr = db.resolve('pkg', 'node', ['defaults', 'baseline', 'fast'])
+    assert qr.values == {'a': 11, 'b': 20}, qr.values
+    assert qr.origin == {'a': 'baseline', 'b': 'fast'}, qr.origin
+    assert qr.is_complete()
+
+
+@comptest
+def test_config_db_incremental():
+    d = dir_from_data(data)
+    filenames = sorted(locate_files(d, '*.config.yaml'))
+    store = MemoryStore()
+    parsed_files = []
+
+    def load():
+        parsed = ParsedFiles(store, fingerprint='code')
+        configs = []
+        for fn in filenames:
+            def f():
+                parsed_files.append(fn)
+                return interpret_config_file(fn)
+            configs.append(parsed.get(fn, [fn], f))
+        parsed.save()
+        return configs
+
+    load()
+    assert sorted(parsed_files) == filenames
+    del parsed_files[:]
+
+    configs = load()
+    assert parsed_files == []
+
+    changed = filenames[0]
+    with open(changed, 'a') as f:
+        f.write('\n# changed\n')
+    configs2 = load()
+    assert parsed_files == [changed]
+    assert configs2[1:] == configs[1:]
+
+    # files that disappear are forgotten
+    os.unlink(changed)
+    del filenames[0]
+    load()
+    assert not changed in store.get(ParsedFiles.cache_name, 'code')[1]
+
+
+if __name__ == '__main__':
+    run_module_tests()
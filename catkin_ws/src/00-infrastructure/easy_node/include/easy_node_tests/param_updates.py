@@ -0,0 +1,129 @@
+import threading
+
+from comptests.registrar import comptest, run_module_tests
+
+from duckietown_utils import DTConfigException
+from easy_node.easy_node import EasyNode
+from easy_node.node_description.configuration import load_configuration, check_parameter_values
+
+
+node_description = """
+description: A node.
+subscriptions: {}
+publishers: {}
+contracts: {}
+parameters:
+    gain:
+        type: float
+        default: 1.0
+    n:
+        type: int
+        default: 3
+    verbose:
+        type: bool
+        default: false
+    anything:
+        type: any
+        default: 
+"""
+
+
+def expect_rejected(parameters, values):
+    try:
+        check_parameter_values(parameters, values)
+    except DTConfigException:
+        pass
+    else:
+        raise Exception('Expected %r to be rejected.' % values)
+
+
+@comptest
+def test_check_parameter_values():
+    c = load_configuration('node.easy_node.yaml', node_description)
+    parameters = c.parameters
+
+    values = check_parameter_values(parameters, {'gain': 2, 'n': 4.0, 'verbose': True})
+    assert values == {'gain': 2.0, 'n': 4, 'verbose': True}, values
+    assert isinstance(values['gain'], float)
+    assert isinstance(values['n'], int)
+
+    values = check_parameter_values(parameters, {'anything': [1, 2], 'gain': None})
+    assert values == {'anything': [1, 2], 'gain': None}, values
+
+    expect_rejected(parameters, {'not_a_parameter': 1})
+    expect_rejected(parameters, {'gain': 'fast'})
+    expect_rejected(parameters, {'n': 1.5})
+    expect_rejected(parameters, {'verbose': 1})
+    expect_rejected(parameters, [1, 2])
+
+
+class Config():
+    pass
+
+
+class Message():
+    """ Same as the std_msgs/String received on ~set_parameters. """
+
+    def __init__(self, data):
+        self.data = data
+
+
+class RecordingNode(EasyNode):
+    """ An EasyNode that is not connected to ROS, and records the updates. """
+
+    def __init__(self):
+        # not EasyNode.__init__, which calls rospy.init_node()
+        self._configuration = load_configuration('node.easy_node.yaml', node_description)
+        self.config = Config()
+        for p in self._configuration.parameters.values():
+            setattr(self.config, p.name, p.default)
+        self._parameters_lock = threading.Lock()
+        self.changes = []
+        self.errors = []
+        self.written = []
+
+    def on_parameters_changed(self, first_time, changed):
+        self.changes.append((first_time, dict(changed)))
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+    def _write_parameter_server(self, values):
+        self.written.append(values)
+
+
+@comptest
+def test_set_parameters_topic():
+    node = RecordingNode()
+    config0 = node.config
+
+    # one invalid value: nothing changes
+    node._on_set_parameters(Message('{gain: 2.0, n: many}'))
+    assert node.config is config0
+    assert node.config.gain == 1.0 and node.config.n == 3
+    assert len(node.errors) == 1
+    assert node.changes == [] and node.written == []
+
+    # not valid YAML
+    node._on_set_parameters(Message('{gain: ['))
+    assert node.config is config0
+    assert len(node.errors) == 2
+
+    # n is the same as before, so only gain changed
+    node._on_set_parameters(Message('{gain: 2, n: 3}'))
+    assert node.config is not config0
+    assert node.config.gain == 2.0 and node.config.n == 3
+    # the old object is not modified
+    assert config0.gain == 1.0
+    assert node.changes == [(False, {'gain': 2.0})], node.changes
+    assert node.written == [{'gain': 2.0}]
+
+    # no change: no callback
+    config1 = node.config
+    node._on_set_parameters(Message('{gain: 2.0}'))
+    assert node.config is config1
+    assert len(node.changes) == 1
+
+
+if __name__ == '__main__':
+    run_module_tests()
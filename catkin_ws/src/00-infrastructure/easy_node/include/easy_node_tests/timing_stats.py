@@ -0,0 +1,85 @@
+from comptests.registrar import comptest, run_module_tests
+
+from easy_node.utils.timing import ProcessingTimingStats, SingleStat, merge_snapshots_by_message_type
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+class Stamp(object):
+    def __init__(self, t):
+        self.t = t
+
+    def to_sec(self):
+        return self.t
+
+
+class Header(object):
+    def __init__(self, t):
+        self.stamp = Stamp(t)
+
+
+class FakeImage(object):
+    _type = 'sensor_msgs/CompressedImage'
+
+    def __init__(self, t):
+        self.header = Header(t)
+
+
+@comptest
+def test_single_stat_bounded():
+    clock = FakeClock()
+    s = SingleStat(window=100, get_time=clock)
+    for i in range(10000):
+        clock.t += 0.1
+        s.sample(float(i % 1000))
+    assert s.num() == 10000
+    assert len(s.values) == 100 and len(s.times) == 100
+    assert s.max_value() == 999.0
+    assert s.last_value() == 999.0
+    # the last 100 values are 900..999
+    p50, p90, p99 = s.percentiles([50, 90, 99])
+    assert (p50, p90, p99) == (950.0, 990.0, 999.0), (p50, p90, p99)
+    assert abs(s.rate_recent() - 10.0) < 1e-6
+    assert SingleStat(get_time=clock).percentiles([50]) == [None]
+
+
+@comptest
+def test_processing_snapshot():
+    clock = FakeClock()
+    pts = ProcessingTimingStats(window=10, get_time=clock)
+    for i in range(50):
+        clock.t += 0.5
+        msg = FakeImage(clock.t)
+        pts.received_message(msg)
+        if i % 2 == 0:
+            pts.decided_to_skip()
+            continue
+        pts.decided_to_process(msg)
+        with pts.phase('detect'):
+            clock.t += 0.01 * (i % 10)
+
+    snapshot = pts.get_snapshot()
+    assert snapshot['message_type'] == 'sensor_msgs/CompressedImage'
+    assert snapshot['received']['num'] == 50
+    assert snapshot['processed']['num'] == 25
+    assert snapshot['skipped']['num'] == 25
+    wall = snapshot['phases']['detect']['wall']
+    assert wall['num'] == 25
+    assert abs(wall['max'] - 0.09) < 1e-6
+    assert wall['p50'] <= wall['p90'] <= wall['p99'] <= wall['max']
+    # the text report still works
+    assert 'detect' in pts.get_stats()
+
+    merged = merge_snapshots_by_message_type({'a': snapshot, 'b': snapshot})
+    fps = merged['sensor_msgs/CompressedImage']['received']
+    assert abs(fps - 2 * snapshot['received']['fps_recent']) < 1e-6
+
+
+if __name__ == '__main__':
+    run_module_tests()
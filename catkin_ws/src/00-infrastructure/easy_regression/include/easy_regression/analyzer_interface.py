@@ -9,12 +9,29 @@ class AnalyzerInterface(object):
         """ 
             bag_in:  
             dict_out: a dict-like structure where you can store stuff. 
+            
+            The log is read once for all the analyzers, so bag_in.read_messages()
+            can be called only once, and the messages must not be modified.
         """
         
+    def get_topics(self):
+        """ 
+            Returns the list of the topics read by analyze_log(),
+            or None if it reads all of them. 
+        """
+        return None
+        
     @abstractmethod
     def reduce(self, dict_one, dict_two, result):
         """ 
-             
+            Merges the results of two sets of logs (dict_one and
+            dict_two, in this order) into result.
+
+            The results of the logs are merged as a balanced tree
+            (see merge_n() and jobs_merge()), so reduce() must be
+            associative: merging (a, b) and then c must give the same
+            as merging a with the merge of (b, c). The order of the
+            arguments is kept, so it does not need to be commutative.
         """
         
     def summarize_as_text(self, res):
@@ -1,5 +1,7 @@
 from collections import OrderedDict
 import os
+import threading
+import traceback
 
 from duckietown_utils import logger
 from duckietown_utils.file_utils import write_data_to_file
@@ -11,6 +13,8 @@ from easy_algo.algo_db import get_easy_algo_db
 from easy_regression.analyzer_interface import AnalyzerInterface
 import rosbag  # @UnresolvedImport
 
+from .bag_pipe import bag_pipe
+
 
 @contract(analyzers='list(str)')
 def print_results(analyzers, results_all, out):
@@ -54,17 +58,54 @@ def job_merge(results, analyzer):
 
     total = merge_n(analyzer_instance, results)
     return total
+
+def job_reduce(a, b, analyzer):
+    easy_algo_db = get_easy_algo_db()
+    analyzer_instance = easy_algo_db.create_instance('analyzer', analyzer)
+    r = OrderedDict()
+    analyzer_instance.reduce(a, b, r)
+    return r
+
+def jobs_merge(context, results, analyzer):
+    """
+        Same as job_merge, but each reduce() is a separate job, so that
+        the log2(n) levels of the tree are computed in parallel.
+        This requires reduce() to be associative.
+        
+        results: log name -> results dict (or promise)
+    """
+    results = list(results.values())
+    level = 0
+    while len(results) > 1:
+        merged = []
+        for i in range(0, len(results) - 1, 2):
+            job_id = 'merge-%s-%d-%d' % (analyzer, level, i // 2)
+            merged.append(context.comp(job_reduce, results[i], results[i + 1], 
+                                       analyzer, job_id=job_id))
+        if len(results) % 2 == 1:
+            merged.append(results[-1])
+        results = merged
+        level += 1
+    return results[0]
      
 @contract(analyzer=AnalyzerInterface)
 def merge_n(analyzer, results):
-    if len(results) == 1:
-        return results[0]
-    else:
-        first=results[0]
-        rest = merge_n(analyzer, results[1:])
-        r = OrderedDict()
-        analyzer.reduce(first, rest, r)
-        return r 
+    """ 
+        Reduces the list of results by pairs of neighbours, 
+        as a balanced tree of depth log2(n). 
+        
+        This requires analyzer.reduce() to be associative.
+    """
+    while len(results) > 1:
+        merged = []
+        for i in range(0, len(results) - 1, 2):
+            r = OrderedDict()
+            analyzer.reduce(results[i], results[i + 1], r)
+            merged.append(r)
+        if len(results) % 2 == 1:
+            merged.append(results[-1])
+        results = merged
+    return results[0]
     
 @contract(analyzer=str)
 def job_analyze(log, analyzer):
@@ -75,4 +116,92 @@ def job_analyze(log, analyzer):
     logger.info('Running %s on %s' % (analyzer, log))
     analyzer_instance.analyze_log(in_bag, results)
     in_bag.close()
-    return results
\ No newline at end of file
+    return results
+
+@contract(analyzers='list(str)')
+def job_analyze_all(log, analyzers):
+    """ Runs all the analyzers on the log, reading it only once. """
+    easy_algo_db = get_easy_algo_db()
+    instances = OrderedDict()
+    for a in analyzers:
+        instances[a] = easy_algo_db.create_instance('analyzer', a)
+    in_bag = rosbag.Bag(log)
+    logger.info('Running %s on %s' % (", ".join(analyzers), log))
+    try:
+        return analyze_log_all(in_bag, instances)
+    finally:
+        in_bag.close()
+
+def job_select(results, analyzer):
+    return results[analyzer]
+
+def analyze_log_all(bag, analyzers):
+    """
+        analyzers: name -> AnalyzerInterface
+        
+        Reads the bag once and gives each message to the analyzers that 
+        need its topic (see AnalyzerInterface.get_topics()). Each analyzer 
+        runs in its own thread and reads the messages from a bag_pipe(). 
+        
+        Returns an OrderedDict name -> results.
+    """
+    names = list(analyzers)
+    results = OrderedDict((name, OrderedDict()) for name in names)
+    if len(names) == 1:
+        analyzers[names[0]].analyze_log(bag, results[names[0]])
+        return results
+    
+    topics = OrderedDict((name, analyzers[name].get_topics()) for name in names)
+    if any(t is None for t in topics.values()):
+        read_topics = None
+    else:
+        read_topics = sorted(set(sum(map(list, topics.values()), [])))
+    
+    readers = OrderedDict()
+    writers = OrderedDict()
+    for name in names:
+        readers[name], writers[name] = bag_pipe(metadata=bag)
+    errors = OrderedDict()
+    
+    def run(name):
+        try:
+            analyzers[name].analyze_log(readers[name], results[name])
+        except Exception:
+            errors[name] = traceback.format_exc()
+        finally:
+            # the messages for this analyzer are discarded from now on
+            readers[name].close()
+    
+    threads = []
+    for name in names:
+        t = threading.Thread(target=run, args=(name,), name='analyze-%s' % name)
+        t.setDaemon(True)
+        t.start()
+        threads.append(t)
+    
+    # topic -> the writers of the analyzers that need it
+    fan_out = {}
+    try:
+        for topic, msg, t in bag.read_messages(topics=read_topics):
+            if not topic in fan_out:
+                fan_out[topic] = [writers[name] for name in names
+                                  if topics[name] is None or topic in topics[name]]
+            for writer in fan_out[topic]:
+                writer.write(topic, msg, t)
+    except Exception:
+        for writer in writers.values():
+            writer.abort('Could not read the log.')
+        raise
+    else:
+        for writer in writers.values():
+            writer.close()
+    finally:
+        for t in threads:
+            t.join()
+    
+    if errors:
+        msg = 'Some analyzers failed:'
+        for name, error in errors.items():
+            msg += '\n\n%s:\n%s' % (name, indent(error, '  '))
+        raise Exception(msg)
+    return results
@@ -0,0 +1,175 @@
+import os
+import shutil
+import time
+
+from duckietown_utils.bounded_queue import BoundedQueue, QueueEnd
+from duckietown_utils.disk_hierarchy import create_tmpdir
+
+__all__ = [
+    'bag_pipe',
+    'BagPipeError',
+]
+
+
+class BagPipeError(Exception):
+    pass
+
+
+def bag_pipe(maxsize=64, metadata=None):
+    """
+        Returns a pair (reader, writer) that can be used as the
+        bag_in of a processor and the bag_out of the previous one,
+        so that the messages are passed in memory, without being
+        serialized to a temporary bag.
+
+        The writer has the interface of a rosbag.Bag opened for writing
+        (write(), close()); the reader has the reading interface used
+        by the processors (read_messages(), get_start_time(), etc.).
+
+        The two sides must run in different threads: write() blocks when
+        "maxsize" messages are waiting to be read, so the memory used
+        does not depend on the length of the log.
+
+        The reader can stream the messages only once. If the processor
+        asks for the metadata (start/end time, topics, message count)
+        before reading, all the remaining messages are first written
+        to a temporary bag on disk, which is then used for the metadata
+        and for reading, any number of times; this is as slow as
+        chaining the processors through temporary bags, but the memory
+        used is still bounded. If "metadata" is given, it is a bag whose
+        metadata is returned instead, for example the bag that the
+        messages come from.
+
+        The messages are read in the order in which they were written,
+        which must be by time, as a rosbag returns them: write() raises
+        BagPipeError if a timestamp is before the previous one.
+
+        The messages are passed by reference: a processor must not
+        modify a message after writing it or after reading it.
+    """
+    queue = BoundedQueue(maxsize)
+    return _PipeReader(queue, metadata), _PipeWriter(queue)
+
+
+class _PipeWriter():
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.last_t = None
+
+    def write(self, topic, msg, t=None):
+        if t is None:
+            # same as rosbag
+            import rospy  # @UnresolvedImport
+            t = rospy.Time.from_sec(time.time())
+        # a rosbag would sort them; the pipe cannot
+        if self.last_t is not None and t < self.last_t:
+            error = ('Message on %s at %s written after one at %s: the messages '
+                     'must be written in time order.' % (topic, t, self.last_t))
+            raise BagPipeError(error)
+        self.last_t = t
+        # if the reader is already closed, the message is discarded
+        self.queue.put((topic, msg, t))
+
+    def close(self):
+        self.queue.put_end()
+
+    def abort(self, error):
+        """ Makes the reader raise BagPipeError(error) after the last message. """
+        self.queue.put_end(error)
+
+
+class _PipeReader():
+
+    def __init__(self, queue, metadata):
+        self.queue = queue
+        self.metadata = metadata
+        # the temporary bag with all the messages, if they were spooled
+        self.spooled = None
+        self.tmpdir = None
+        # whether read_messages() already consumed the queue
+        self.streamed = False
+
+    def _stream(self):
+        if self.streamed:
+            msg = ('The messages were already read once; use the metadata functions '
+                   'before read_messages() to spool them to disk.')
+            raise BagPipeError(msg)
+        self.streamed = True
+        while True:
+            item = self.queue.get()
+            if isinstance(item, QueueEnd):
+                if item.error is not None:
+                    raise BagPipeError(item.error)
+                break
+            yield item
+
+    def _spool(self):
+        """ Writes the remaining messages to a temporary bag, and returns it. """
+        if self.spooled is None:
+            import rosbag  # @UnresolvedImport
+            self.tmpdir = create_tmpdir(prefix='bag_pipe')
+            filename = os.path.join(self.tmpdir, 'spooled.bag')
+            bag = rosbag.Bag(filename, 'w')
+            try:
+                for topic, msg, t in self._stream():
+                    bag.write(topic, msg, t)
+            finally:
+                bag.close()
+            self.spooled = rosbag.Bag(filename)
+        return self.spooled
+
+    def _spool_nonempty(self):
+        bag = self._spool()
+        if bag.get_message_count() == 0:
+            msg = 'The previous processor did not write any message.'
+            raise BagPipeError(msg)
+        return bag
+
+    def read_messages(self, topics=None, start_time=None, end_time=None):
+        if self.spooled is not None:
+            for m in self.spooled.read_messages(topics=topics, start_time=start_time,
+                                                end_time=end_time):
+                yield m
+            return
+        if isinstance(topics, str):
+            topics = [topics]
+        for topic, msg, t in self._stream():
+            if topics is not None and not topic in topics:
+                continue
+            if start_time is not None and t < start_time:
+                continue
+            if end_time is not None and t > end_time:
+                continue
+            yield topic, msg, t
+
+    def get_start_time(self):
+        if self.metadata is not None:
+            return self.metadata.get_start_time()
+        return self._spool_nonempty().get_start_time()
+
+    def get_end_time(self):
+        if self.metadata is not None:
+            return self.metadata.get_end_time()
+        return self._spool_nonempty().get_end_time()
+
+    def get_message_count(self, topic_filters=None):
+        if self.metadata is not None:
+            return self.metadata.get_message_count(topic_filters)
+        return self._spool().get_message_count(topic_filters)
+
+    def get_type_and_topic_info(self, topic_filters=None):
+        if self.metadata is not None:
+            return self.metadata.get_type_and_topic_info(topic_filters)
+        return self._spool().get_type_and_topic_info(topic_filters)
+
+    def close(self):
+        # the writer does not need to wait anymore
+        self.queue.close()
+        if self.spooled is not None:
+            self.spooled.close()
+            self.spooled = None
+        if self.tmpdir is not None:
+            shutil.rmtree(self.tmpdir)
+            self.tmpdir = None
+
@@ -1,5 +1,7 @@
 import os
 import shutil
+import threading
+import traceback
 
 from duckietown_utils import logger
 from duckietown_utils.disk_hierarchy import create_tmpdir
@@ -8,8 +10,22 @@ from easy_algo.algo_db import get_easy_algo_db
 import rosbag  # @UnresolvedImport
 from duckietown_utils.bag_reading import BagReadProxy
 
+from .bag_pipe import bag_pipe
 
-def process_one(bag_filename, t0, t1, processors, log_out):
+
+def process_one(bag_filename, t0, t1, processors, log_out, in_memory=False):
+    """
+        Runs the chain of processors on the interval [t0, t1] of the log.
+
+        With in_memory = True, the processors run at the same time, each
+        in its own thread, and pass the messages to the next one through
+        a bag_pipe(); only the output of the last one is written to disk.
+        A processor after the first one that asks for the metadata of its
+        input waits until the previous one is done, as the pipe writes
+        the messages to a temporary bag first.
+        Otherwise (the default), each processor writes a temporary bag
+        that is read by the next one.
+    """
     logger.info('job_one()')
     logger.info('   input: %s' % bag_filename)
     logger.info('   processors: %s' % processors)
@@ -17,6 +33,24 @@ def process_one(bag_filename, t0, t1, processors, log_out):
     
     d8n_make_sure_dir_exists(log_out)
     
+    easy_algo_db = get_easy_algo_db()
+    # instantiate processors
+    processors_instances = [easy_algo_db.create_instance('processor', _) 
+                            for _ in processors]
+    return process_chain(bag_filename, t0, t1, processors, processors_instances,
+                         log_out, in_memory)
+
+
+def process_chain(bag_filename, t0, t1, processors, processors_instances, log_out,
+                  in_memory=False):
+    """ 
+        Same as process_one(), with the processors already instantiated;
+        "processors" are their names. 
+    """
+    if in_memory and processors_instances:
+        return process_one_in_memory(bag_filename, t0, t1, processors,
+                                     processors_instances, log_out)
+    
     tmpdir = create_tmpdir()
     tmpfiles = []
     
@@ -25,13 +59,6 @@ def process_one(bag_filename, t0, t1, processors, log_out):
         f = os.path.join(tmpdir, 'tmp%d.bag'%i)
         tmpfiles.append(f)
         return f
-        
-    easy_algo_db = get_easy_algo_db()
-    # instantiate processors
-    processors_instances = [easy_algo_db.create_instance('processor', _) 
-                            for _ in processors]
-    
-    tmpfiles = []
     
     try:
         for i, p in enumerate(processors_instances):
@@ -54,7 +81,7 @@ def process_one(bag_filename, t0, t1, processors, log_out):
             bag_filename = next_bag_filename
                 
         logger.info('Creating output file %s' % log_out)
-        if not processors:
+        if not processors_instances:
             # just create symlink
             logger.info('(Just creating symlink, because there '
                         'was no processing done.)')
@@ -72,3 +99,59 @@ def process_one(bag_filename, t0, t1, processors, log_out):
             logger.info(' deleting %s' % f)
             os.unlink(f)
     return log_out
+
+
+def process_one_in_memory(bag_filename, t0, t1, processors, processors_instances, log_out):
+    n = len(processors_instances)
+    
+    in_bag = BagReadProxy(rosbag.Bag(bag_filename), t0, t1)
+    log_out_tmp = log_out + '.tmp'
+    out_bag = rosbag.Bag(log_out_tmp, 'w')
+    
+    # readers[i] is the input of processor i, writers[i] its output
+    readers = [in_bag]
+    writers = []
+    for _ in range(n - 1):
+        reader, writer = bag_pipe()
+        writers.append(writer)
+        readers.append(reader)
+    writers.append(out_bag)
+    
+    errors = [None] * n
+    
+    def run(i):
+        p = processors_instances[i]
+        try:
+            p.process_log(readers[i], writers[i])
+        except Exception:
+            errors[i] = traceback.format_exc()
+            if i < n - 1:
+                msg = 'Processor %s failed.' % processors[i]
+                writers[i].abort(msg)
+        else:
+            if i < n - 1:
+                writers[i].close()
+        finally:
+            # unblocks the previous processor, if it is still writing
+            readers[i].close()
+    
+    logger.info('Processing in memory:\n  in = %s\n out = %s' % (bag_filename, log_out))
+    threads = []
+    for i in range(n):
+        t = threading.Thread(target=run, args=(i,), name='process_one-%s' % processors[i])
+        t.setDaemon(True)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    
+    out_bag.close()
+    for i, error in enumerate(errors):
+        if error is not None:
+            os.unlink(log_out_tmp)
+            msg = 'Processor %s failed:\n%s' % (processors[i], error)
+            raise Exception(msg)
+    
+    os.rename(log_out_tmp, log_out)
+    logger.info('I created %s' % log_out)
+    return log_out
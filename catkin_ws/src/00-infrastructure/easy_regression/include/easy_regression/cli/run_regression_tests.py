@@ -12,7 +12,7 @@ from duckietown_utils import logger
 from duckietown_utils.cli import D8AppWithLogs
 from easy_algo.algo_db import get_easy_algo_db
 from easy_logs.cli.require import get_log_if_not_exists
-from easy_regression.cli.analysis_and_stat import job_analyze, job_merge, print_results
+from easy_regression.cli.analysis_and_stat import job_analyze_all, job_select, jobs_merge, print_results
 from easy_regression.cli.checking import compute_check_results, display_check_results, fail_if_not_expected,\
     write_to_db
 from easy_regression.cli.processing import process_one
@@ -33,6 +33,10 @@ class RunRegressionTest(D8AppWithLogs, QuickApp):
         default = RTCheck.OK
         params.add_string('expect', help=h, group=g, default=default)  
         
+        h = ('Pass the messages from one processor to the next in memory, '
+             'instead of through temporary bags.')
+        params.add_flag('in_memory', help=h, group=g)
+        
     def define_jobs_context(self, context):
         easy_algo_db = get_easy_algo_db()
         
@@ -52,10 +56,10 @@ class RunRegressionTest(D8AppWithLogs, QuickApp):
             c = context.child(rt_name)
             
             outd = os.path.join(self.options.output, 'regression_tests', rt_name)
-            jobs_rt(c, rt_name, rt, easy_logs_db, outd, expect) 
+            jobs_rt(c, rt_name, rt, easy_logs_db, outd, expect, self.options.in_memory) 
 
 @contract(rt=RegressionTest)
-def jobs_rt(context, rt_name, rt, easy_logs_db, out, expect):
+def jobs_rt(context, rt_name, rt, easy_logs_db, out, expect, in_memory=False):
     
     logs = rt.get_logs(easy_logs_db)
     
@@ -80,17 +84,21 @@ def jobs_rt(context, rt_name, rt, easy_logs_db, out, expect):
         bag_filename = c.comp(get_log_if_not_exists, easy_logs_db.logs, log_name)
         t0 = log.t0
         t1 = log.t1
-        log_out_ = c.comp(process_one, bag_filename, t0, t1, processors, log_out, job_id=log_name)
+        log_out_ = c.comp(process_one, bag_filename, t0, t1, processors, log_out,
+                          in_memory=in_memory, job_id=log_name)
         
-        for a in analyzers:
-            results_all[a][log_name] = c.comp(job_analyze, log_out_, a, job_id=a) 
+        if analyzers:
+            # read the log once for all the analyzers
+            results_log = c.comp(job_analyze_all, log_out_, analyzers, job_id='analyze')
+            for a in analyzers:
+                results_all[a][log_name] = c.comp(job_select, results_log, a, job_id=a) 
         
         for topic in rt.get_topic_videos():
             mp4 = os.path.join(out, 'videos', log_name, topic + '.mp4')
             c.comp(d8n_make_video_from_bag, log_out_, topic, mp4)
 
     for a in analyzers:
-        results_all[a][ALL_LOGS] = context.comp(job_merge, results_all[a], a)
+        results_all[a][ALL_LOGS] = jobs_merge(context.child(a), results_all[a], a)
     
     context.comp(print_results, analyzers, results_all, out)
 
@@ -6,4 +6,11 @@ class ProcessorInterface(object):
     
     @abstractmethod
     def process_log(self, bag_in, bag_out):
+        """
+            Reads the messages from bag_in and writes the results to bag_out.
+
+            The messages must be written in time order: bag_out can
+            be a bag_pipe(), which passes them to the next processor
+            in the order in which they are written.
+        """
         pass
\ No newline at end of file
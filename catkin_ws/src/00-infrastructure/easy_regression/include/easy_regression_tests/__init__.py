@@ -8,6 +8,9 @@ def jobs_comptests(context):
     from . import references
     from . import evaluation
     from . import run_all
+    from . import bag_pipe_test
+    from . import processing_test
+    from . import analyze_all_test
     
     from comptests.registrar import jobs_registrar_simple
     jobs_registrar_simple(context)
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+
+from comptests.registrar import comptest, run_module_tests
+from easy_regression.analyzer_interface import AnalyzerInterface
+from easy_regression.analyzers.count_messages import CountMessages
+from easy_regression.cli.analysis_and_stat import analyze_log_all, merge_n
+
+
+class MemoryBag():
+    """ The reading interface of a bag, counting the passes over the messages. """
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.npasses = 0
+
+    def read_messages(self, topics=None):
+        self.npasses += 1
+        for topic, msg, t in self.messages:
+            if topics is None or topic in topics:
+                yield topic, msg, t
+
+    def get_start_time(self):
+        return self.messages[0][2].to_sec()
+
+    def close(self):
+        pass
+
+
+class SumTopic(AnalyzerInterface):
+
+    def __init__(self, topic):
+        self.topic = topic
+
+    def get_topics(self):
+        return [self.topic]
+
+    def analyze_log(self, bag_in, dict_out):
+        dict_out['t0'] = bag_in.get_start_time()
+        dict_out['sum'] = sum(msg.data for _, msg, _ in bag_in.read_messages(topics=[self.topic]))
+
+    def reduce(self, a, b, a_plus_b):
+        a_plus_b['sum'] = a['sum'] + b['sum']
+
+
+class Failing(SumTopic):
+
+    def analyze_log(self, bag_in, dict_out):
+        raise ValueError('failing analyzer')
+
+
+def get_bag(n):
+    import rospy  # @UnresolvedImport
+    from std_msgs.msg import Int32  # @UnresolvedImport
+    messages = []
+    for i in range(n):
+        topic = ['/a', '/b', '/c'][i % 3]
+        messages.append((topic, Int32(i), rospy.Time(100 + i)))
+    return MemoryBag(messages)
+
+
+@comptest
+def analyze_all_same_results():
+    def get_analyzers():
+        return OrderedDict([('count', CountMessages()),
+                            ('sum_a', SumTopic('/a')),
+                            ('sum_b', SumTopic('/b'))])
+
+    expected = OrderedDict()
+    for name, analyzer in get_analyzers().items():
+        expected[name] = OrderedDict()
+        analyzer.analyze_log(get_bag(1000), expected[name])
+
+    bag = get_bag(1000)
+    results = analyze_log_all(bag, get_analyzers())
+    assert results == expected, (results, expected)
+    assert bag.npasses == 1
+
+
+@comptest
+def analyze_all_only_topics_needed():
+    bag = get_bag(300)
+    results = analyze_log_all(bag, OrderedDict([('a', SumTopic('/a')), ('b', SumTopic('/b'))]))
+    assert bag.npasses == 1
+    assert results['a']['sum'] == sum(range(0, 300, 3))
+
+
+@comptest
+def analyze_all_failure():
+    bag = get_bag(300)
+    analyzers = OrderedDict([('count', CountMessages()), ('failing', Failing('/a'))])
+    try:
+        analyze_log_all(bag, analyzers)
+    except Exception as e:
+        assert 'failing analyzer' in str(e)
+    else:
+        raise Exception('Expected an exception')
+
+
+@comptest
+def merge_n_tree():
+    analyzer = CountMessages()
+    for n in [1, 2, 3, 7, 8, 1000]:
+        results = []
+        for i in range(n):
+            results.append(OrderedDict([('num_messages', i), ('num_logs', 1),
+                                        ('average_num_messages', 1)]))
+        total = merge_n(analyzer, results)
+        assert total['num_messages'] == sum(range(n))
+        assert total['num_logs'] == n
+
+
+if __name__ == '__main__':
+    run_module_tests()
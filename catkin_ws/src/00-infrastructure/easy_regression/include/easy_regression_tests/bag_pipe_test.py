@@ -0,0 +1,182 @@
+import os
+import threading
+
+from comptests.registrar import comptest, run_module_tests
+from easy_regression.cli.bag_pipe import bag_pipe, BagPipeError
+
+
+def write_in_thread(writer, messages, error=None):
+    def write():
+        for topic, msg, t in messages:
+            writer.write(topic, msg, t)
+        if error is None:
+            writer.close()
+        else:
+            writer.abort(error)
+    t = threading.Thread(target=write)
+    t.setDaemon(True)
+    t.start()
+    return t
+
+
+def get_messages(n):
+    import rospy  # @UnresolvedImport
+    from std_msgs.msg import Int32  # @UnresolvedImport
+    messages = []
+    for i in range(n):
+        topic = '/a' if i % 2 == 0 else '/b'
+        messages.append((topic, Int32(i), rospy.Time(100 + i)))
+    return messages
+
+
+@comptest
+def bag_pipe_stream():
+    messages = get_messages(1000)
+    reader, writer = bag_pipe(maxsize=10)
+    t = write_in_thread(writer, messages)
+    read = list(reader.read_messages())
+    t.join()
+    assert read == messages
+
+    # reading twice is an error, unless the messages were spooled
+    try:
+        list(reader.read_messages())
+    except BagPipeError:
+        pass
+    else:
+        raise Exception('Expected BagPipeError')
+
+
+@comptest
+def bag_pipe_bounded():
+    messages = get_messages(100)
+    reader, writer = bag_pipe(maxsize=5)
+    t = write_in_thread(writer, messages)
+    n = 0
+    for _ in reader.read_messages():
+        assert len(reader.queue.items) <= 5
+        n += 1
+    t.join()
+    assert n == 100
+
+
+@comptest
+def bag_pipe_metadata():
+    messages = get_messages(10)
+    reader, writer = bag_pipe(maxsize=3)
+    t = write_in_thread(writer, messages)
+    # this spools all the messages to disk
+    assert reader.get_start_time() == 100
+    t.join()
+    assert reader.get_end_time() == 109
+    assert reader.get_message_count() == 10
+    assert reader.get_message_count(['/a']) == 5
+    info = reader.get_type_and_topic_info()
+    assert sorted(info[1].keys()) == ['/a', '/b']
+    assert info.topics['/a'].msg_type == 'std_msgs/Int32'
+    assert info.topics['/b'].message_count == 5
+
+    read = list(reader.read_messages(topics=['/a']))
+    assert read == [m for m in messages if m[0] == '/a']
+    assert len(list(reader.read_messages())) == 10
+
+    tmpdir = reader.tmpdir
+    assert os.path.exists(tmpdir)
+    reader.close()
+    assert not os.path.exists(tmpdir)
+
+
+class BoundedWriter():
+    """ Checks that the pipe never holds more than maxsize messages. """
+
+    def __init__(self, writer, maxsize):
+        self.writer = writer
+        self.maxsize = maxsize
+        self.max_waiting = 0
+
+    def write(self, topic, msg, t):
+        self.writer.write(topic, msg, t)
+        waiting = len(self.writer.queue.items)
+        self.max_waiting = max(self.max_waiting, waiting)
+        assert waiting <= self.maxsize, waiting
+
+    def close(self):
+        self.writer.close()
+
+
+@comptest
+def bag_pipe_metadata_bounded():
+    """
+        The second processor of a chain asks for the metadata before
+        reading, as LineDetectorProcessor does with which_robot():
+        the messages go to disk, not to memory.
+    """
+    n = 2000
+    messages = get_messages(n)
+    reader, writer = bag_pipe(maxsize=4)
+    bounded = BoundedWriter(writer, 4)
+    t = write_in_thread(bounded, messages)
+    info = reader.get_type_and_topic_info()
+    t.join()
+    assert bounded.max_waiting <= 4
+    assert info.topics['/a'].message_count == n // 2
+    assert os.path.exists(reader.spooled.filename)
+    # nothing is left in memory on the side of the pipe
+    assert len(reader.queue.items) == 0
+    read = 0
+    for _ in reader.read_messages():
+        read += 1
+    assert read == n
+    reader.close()
+
+
+@comptest
+def bag_pipe_error():
+    messages = get_messages(10)
+    reader, writer = bag_pipe()
+    t = write_in_thread(writer, messages, error='failed')
+    read = []
+    try:
+        for m in reader.read_messages():
+            read.append(m)
+    except BagPipeError as e:
+        assert 'failed' in str(e)
+    else:
+        raise Exception('Expected BagPipeError')
+    t.join()
+    assert read == messages
+
+
+@comptest
+def bag_pipe_reader_closed():
+    """ The writer does not block if the reader stops early. """
+    messages = get_messages(100)
+    reader, writer = bag_pipe(maxsize=2)
+    t = write_in_thread(writer, messages)
+    for _ in reader.read_messages():
+        break
+    reader.close()
+    t.join(10)
+    assert not t.is_alive()
+
+
+@comptest
+def bag_pipe_time_order():
+    messages = get_messages(3)
+    reader, writer = bag_pipe()
+    writer.write(*messages[1])
+    try:
+        writer.write(*messages[0])
+    except BagPipeError as e:
+        assert 'time order' in str(e)
+    else:
+        raise Exception('Expected BagPipeError')
+    # same time is fine
+    writer.write(*messages[1])
+    writer.write(*messages[2])
+    writer.close()
+    assert list(reader.read_messages()) == [messages[1], messages[1], messages[2]]
+
+
+if __name__ == '__main__':
+    run_module_tests()
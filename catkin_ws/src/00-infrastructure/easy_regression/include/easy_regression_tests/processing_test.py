@@ -0,0 +1,66 @@
+import os
+import shutil
+
+from comptests.registrar import comptest, run_module_tests
+from duckietown_utils.disk_hierarchy import create_tmpdir
+from easy_regression.cli.processing import process_chain
+from easy_regression.processor_interface import ProcessorInterface
+from easy_regression.processors.identity import IdentityProcessor
+
+
+class MetadataProcessor(ProcessorInterface):
+    """ Asks for the metadata of its input before reading it, like LineDetectorProcessor. """
+
+    def process_log(self, bag_in, bag_out):
+        info = bag_in.get_type_and_topic_info()
+        self.topics = sorted(info.topics)
+        t0 = bag_in.get_start_time()
+        for topic, msg, t in bag_in.read_messages():
+            assert t.to_sec() >= t0
+            bag_out.write(topic, msg, t)
+
+
+def write_log(filename, n):
+    import rosbag  # @UnresolvedImport
+    import rospy  # @UnresolvedImport
+    from std_msgs.msg import Int32  # @UnresolvedImport
+    bag = rosbag.Bag(filename, 'w')
+    for i in range(n):
+        topic = '/a' if i % 2 == 0 else '/b'
+        bag.write(topic, Int32(i), rospy.Time(100 + i))
+    bag.close()
+
+
+def read_log(filename):
+    import rosbag  # @UnresolvedImport
+    bag = rosbag.Bag(filename)
+    # IdentityProcessor does not keep the times of the messages
+    messages = [(topic, msg.data) for topic, msg, _ in bag.read_messages()]
+    bag.close()
+    return messages
+
+
+@comptest
+def process_chain_in_memory_same_as_bags():
+    d = create_tmpdir('process_chain')
+    try:
+        log_in = os.path.join(d, 'in.bag')
+        write_log(log_in, 200)
+        names = ['identity', 'metadata', 'identity']
+
+        outputs = []
+        for in_memory in [False, True]:
+            instances = [IdentityProcessor(), MetadataProcessor(), IdentityProcessor()]
+            log_out = os.path.join(d, 'out-%s.bag' % in_memory)
+            process_chain(log_in, None, None, names, instances, log_out, in_memory=in_memory)
+            assert instances[1].topics == ['/a', '/b'], instances[1].topics
+            outputs.append(read_log(log_out))
+
+        assert len(outputs[0]) == 200
+        assert outputs[0] == outputs[1]
+    finally:
+        shutil.rmtree(d)
+
+
+if __name__ == '__main__':
+    run_module_tests()
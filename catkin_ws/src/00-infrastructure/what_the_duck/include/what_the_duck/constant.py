@@ -10,6 +10,12 @@ class ChecksConstants(object):
     SKIP = 'skipped'# do not change
     statuses = [FAIL, ERROR, OK, SKIP]
     
+    # number of checks that run at the same time
+    # (the exclusive ones always run alone, see Entry)
+    DEFAULT_NWORKERS = 8
+    # how long the results of the installation checks are cached (seconds)
+    INSTALLED_CACHE_TTL = 24 * 60 * 60
+    
     VISUALIZE_SYMBOLS = {
         OK: u'✓'.encode('utf8'), #✔',
         FAIL: u'✗'.encode('utf8'),
@@ -21,4 +27,5 @@ class ChecksConstants(object):
 
 
 
-Result = namedtuple('Result', 'entry status out_short out_long')
+# duration: seconds taken by the check; cached: whether it was reused from a previous run
+Result = namedtuple('Result', 'entry status out_short out_long duration cached')
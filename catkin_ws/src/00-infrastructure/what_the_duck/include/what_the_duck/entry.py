@@ -2,12 +2,18 @@
 from .resolution import Suggestion
 
 class Entry(object):
-    def __init__(self, desc, check, diagnosis, resolutions, only_run_if):
+    def __init__(self, desc, check, diagnosis, resolutions, only_run_if, cache_ttl=None,
+                 exclusive=False):
         self.desc = desc
         self.check = check
         self.diagnosis = diagnosis
         self.resolutions = resolutions
         self.only_run_if = only_run_if
+        # if not None, a successful result is reused for cache_ttl seconds
+        self.cache_ttl = cache_ttl
+        # if True, no other check runs at the same time (e.g. the checks
+        # that use sudo, which might ask for the password)
+        self.exclusive = exclusive
 
     def get_test_id(self):
         return self.desc
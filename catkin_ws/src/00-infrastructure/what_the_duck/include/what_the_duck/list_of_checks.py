@@ -2,6 +2,7 @@
 from duckietown_utils import DuckietownConstants, get_list_of_packages_in_catkin_ws, on_circle, on_laptop, on_duckiebot
 
 from .checks import *  # @UnusedWildImport
+from .constant import ChecksConstants
 from .entry import Diagnosis, Entry, SeeDocs
 from .python_source_checks import add_python_package_checks
 from .suite_git import add_suite_git
@@ -12,7 +13,11 @@ class Manager(object):
     def __init__(self):
         self.entries = [] 
         
-    def add(self, only_run_if, desc, check, diagnosis, *suggestions):
+    def add(self, only_run_if, desc, check, diagnosis, *suggestions, **kwargs):
+        """ The keyword arguments are cache_ttl and exclusive (see Entry). """
+        cache_ttl = kwargs.pop('cache_ttl', None)
+        exclusive = kwargs.pop('exclusive', False)
+        assert not kwargs, kwargs
         assert isinstance(check, Check), type(check)
         if not suggestions:
             automated = check.get_suggestion()
@@ -21,7 +26,9 @@ class Manager(object):
         E = Entry(desc=desc, check=check,
           diagnosis=diagnosis,
           resolutions=suggestions,
-          only_run_if=only_run_if)
+          only_run_if=only_run_if,
+          cache_ttl=cache_ttl,
+          exclusive=exclusive)
         self.entries.append(E)
         return E
         
@@ -46,17 +53,22 @@ def get_checks():
         add(None,
             "Camera is detected",
             CommandOutputContains('sudo vcgencmd get_camera', 'detected=1'),
-            Diagnosis("The camera is not connected."))
+            Diagnosis("The camera is not connected."),
+            exclusive=True)
+
+    installed_ttl = ChecksConstants.INSTALLED_CACHE_TTL
 
     add(None,
         "Scipy is installed",
         CanImportPackages(['scipy', 'scipy.io']),
-        Diagnosis("Scipy is not installed correctly."))
+        Diagnosis("Scipy is not installed correctly."),
+        cache_ttl=installed_ttl)
 
     add(None,
         "sklearn is installed",
         CanImportPackages(['sklearn']),
-        Diagnosis("sklearn is not installed correctly."))
+        Diagnosis("sklearn is not installed correctly."),
+        cache_ttl=installed_ttl)
     
     python_packages = [
 #         'ros_node_utils',
@@ -70,7 +82,8 @@ def get_checks():
         "%s is installed" % p,
         CanImportPackages([p]),
         Diagnosis("Dependency %r is not installed correctly." % p),
-        Suggestion(" pip install --user %s" % p))
+        Suggestion(" pip install --user %s" % p),
+        cache_ttl=installed_ttl)
 
     add(None,
         "Date is set correctly",
@@ -167,7 +180,8 @@ def get_checks():
 #     suggested = ['emacs', 'zsh', 'nethogs']
 
     for p in required_packages:
-        add(None, "Installed APT package " + p, CheckPackageInstalled(p), Diagnosis('Package %r not installed.' % p))
+        add(None, "Installed APT package " + p, CheckPackageInstalled(p), Diagnosis('Package %r not installed.' % p),
+            cache_ttl=installed_ttl)
 
     forbidden_packages = [
         "python-roslaunch", 
@@ -290,7 +304,8 @@ def get_checks():
                             'Git LFS installed',
                             GitLFSInstalled(),
                             Diagnosis('You have not installed Git LFS'),
-                            SeeDocs('git-lfs'))
+                            SeeDocs('git-lfs'),
+                            cache_ttl=installed_ttl)
 
     if this_is_a_duckiebot:
         add(None,
@@ -70,6 +70,8 @@ def json_from_result(result):
     d['status'] = result.status
     d['out_short'] = result.out_short
     d['out_long'] = result.out_long
+    d['duration'] = result.duration
+    d['cached'] = result.cached
     return d
      
 def get_upload_collection():
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from duckietown_utils import DTConfigException, logger
+from duckietown_utils.caching import get_cache_store
+
+from .constant import ChecksConstants, Result
+
+
+class ResultsCache(object):
+    """
+        The results of the checks that passed, with the time at which
+        they were computed.
+
+        Only the entries added with a cache_ttl are cached, and only
+        if they passed: a check that failed is always run again, so that
+        the user sees immediately if they fixed the problem.
+    """
+    cache_name = 'what_the_duck_results'
+
+    def __init__(self, store):
+        self.store = store
+        found, data = store.get(self.cache_name, None)
+        # test id -> (timestamp, out_long, duration)
+        self.data = data if found else {}
+        self.changed = False
+        self.lock = threading.Lock()
+
+    def get(self, entry):
+        """ Returns the cached Result for the entry, or None. """
+        if entry.cache_ttl is None:
+            return None
+        with self.lock:
+            x = self.data.get(entry.get_test_id(), None)
+        if x is None:
+            return None
+        timestamp, out_long, duration = x
+        if time.time() - timestamp > entry.cache_ttl:
+            return None
+        return Result(entry=entry, status=ChecksConstants.OK, out_short='',
+                      out_long=out_long, duration=duration, cached=True)
+
+    def put(self, result):
+        if result.entry.cache_ttl is None or result.cached:
+            return
+        test_id = result.entry.get_test_id()
+        with self.lock:
+            if result.status == ChecksConstants.OK:
+                self.data[test_id] = (time.time(), result.out_long, result.duration)
+                self.changed = True
+            elif test_id in self.data:
+                del self.data[test_id]
+                self.changed = True
+
+    def save(self):
+        with self.lock:
+            if self.changed:
+                self.store.put(self.cache_name, None, self.data)
+                self.changed = False
+
+
+def get_results_cache():
+    """ Returns the ResultsCache in the cache directory, or None if there is none. """
+    try:
+        store = get_cache_store()
+    except DTConfigException as e:
+        logger.warning('Not using the cache of the results: %s' % e)
+        return None
+    return ResultsCache(store)
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
+import argparse
+from collections import defaultdict
 import getpass
+import heapq
 import socket
 import sys
+import threading
+import time
 import traceback
 
 from termcolor import colored
@@ -11,13 +16,21 @@ from duckietown_utils import indent, logger, write_data_to_file
 from .check import CheckError, CheckFailed
 from .constant import ChecksConstants, Result
 from .list_of_checks import get_checks
+from .results_cache import get_results_cache
 from .statistics import display_results, display_summary, Statistics
 from .visualize import escaped_from_html
-from .statistics import display_short_statistics
+from .statistics import display_short_statistics, display_timing
 from .mongo_suppor import upload_results
 
 
 def do_all_checks():
+    parser = argparse.ArgumentParser(prog='what-the-duck')
+    parser.add_argument('--workers', type=int, default=ChecksConstants.DEFAULT_NWORKERS,
+                        help='Number of checks that run at the same time.')
+    parser.add_argument('--no-cache', action='store_true', 
+                        help='Run again all the checks, ignoring the cached results.')
+    options = parser.parse_args(sys.argv[1:])
+    
     username = getpass.getuser()
     hostname = socket.gethostname()
     filename = 'what_the_duck-%s-%s.html' % (hostname, username)
@@ -26,7 +39,12 @@ def do_all_checks():
     
 #     logger.info("%s checks many things about the Duckiebot configuration" % WTD)
     logger.info('%s will run %s tests.' % (WTD, len(entries))) 
-    results = run_checks(entries)
+    cache = None if options.no_cache else get_results_cache()
+    t0 = time.time()
+    results = run_checks(entries, nworkers=options.workers, cache=cache)
+    wall_time = time.time() - t0
+    if cache is not None:
+        cache.save()
      
     o_complete = ""
     o_complete += display_results(results, show_successes=True) + '\n\n'
@@ -35,6 +53,7 @@ def do_all_checks():
     o_user = ""
     o_user += display_results(results, show_successes=False)
     o_user += '\n\n' + display_short_statistics(results)
+    o_user += '\n' + display_timing(results, wall_time)
     
     print(escaped_from_html(o_user))
     
@@ -53,86 +72,143 @@ def do_all_checks():
 
 
         
-def run_checks(entries):
-    """ Returns the names of the failures  """
-    results = [] 
+def run_checks(entries, nworkers=1, cache=None):
+    """ 
+        Returns the list of Result, in the same order as the entries.
+        
+        An entry runs only after the entry in its only_run_if passed;
+        the entries that do not depend on each other run at the same time, 
+        in nworkers threads (with nworkers = 1, all run in this thread).
+        The entries with exclusive = True run when no other entry is running.
+        
+        If cache is a ResultsCache, the results of the entries with 
+        a cache_ttl are reused while they are valid.
+    """
+    n = len(entries)
+    # the position of each entry (entries are compared by identity)
+    index = dict((id(e), i) for i, e in enumerate(entries))
+    results = [None] * n
+    # i -> the positions of the entries that have only_run_if = entries[i]
+    dependents = defaultdict(list)
+    # the positions of the entries that can run now; the earlier ones go first
+    ready = []
+    condition = threading.Condition()
+    running = [0]
+    exclusive_running = [False]
     
-#     entries = entries[:10]
+    def record_result(i, r):
+        results[i] = r
+        if cache is not None:
+            cache.put(r)
+        for j in dependents[i]:
+            if r.status == ChecksConstants.OK:
+                heapq.heappush(ready, j)
+            else:
+                desc = entries[i].desc
+                if r.status in [ChecksConstants.FAIL, ChecksConstants.ERROR]:
+                    msg = "Skipped because the previous test %r failed." % desc
+                else:
+                    msg = "Skipped because the previous test %r skipped." % desc
+                record_result(j, skipped_result(entries[j], msg))
     
-    def record_result(r):
-        results.append(r) 
+    for i, entry in enumerate(entries):
+        only_run_if = entry.only_run_if
+        if only_run_if is None:
+            heapq.heappush(ready, i)
+        elif id(only_run_if) in index:
+            dependents[index[id(only_run_if)]].append(i)
     
-    # raise NotRun if not previously run
-    class NotRun(Exception): pass
+    for i, entry in enumerate(entries):
+        only_run_if = entry.only_run_if
+        if only_run_if is not None and not id(only_run_if) in index:
+            logger.error('Could not find %s' % only_run_if)
+            msg = 'Dependency is not in the list of tests.'
+            r = Result(entry=entry, status=ChecksConstants.ERROR, out_short=msg, out_long='', 
+                       duration=0.0, cached=False)
+            record_result(i, r)
     
-    def get_previous_result_status(e):
-        for r in results:
-            if e == r.entry:
-                return r.status
-            
-        logger.error('Could not find %s' % e)
-        logger.error(results)
-        raise NotRun()
+    def next_ready():
+        """ The position of the entry to run now, or None if we must wait. """
+        if exclusive_running[0]:
+            return None
+        for i in sorted(ready):
+            if not entries[i].exclusive:
+                return i
+        # only exclusive entries are ready: wait until the others are done
+        if ready and running[0] == 0:
+            return ready[0]
+        return None
     
-    for entry in entries:
-        
-        # check dependencies
-        only_run_if = entry.only_run_if
-        if only_run_if is None:
-            pass
-        else:
-            try:
-                dep_status = get_previous_result_status(only_run_if)
-            
-                if dep_status in [ChecksConstants.FAIL, ChecksConstants.ERROR]:
-                    msg = "Skipped because the previous test %r failed." % (only_run_if.desc)
-                    r = Result(entry=entry, status=ChecksConstants.SKIP, out_short=msg, out_long='')
-                    record_result(r)
-                    continue
-                
-                elif dep_status in [ChecksConstants.SKIP]:
-                    msg = "Skipped because the previous test %r skipped." % (only_run_if.desc)
-                    r = Result(entry=entry, status=ChecksConstants.SKIP, out_short=msg, out_long='')
-                    record_result(r)
-                    continue
-
-            except NotRun:
-                msg = 'Dependency did not run yet.'
-                r = Result(entry=entry, status=ChecksConstants.ERROR, out_short=msg, out_long='', )
-                record_result(r)
-                continue
-        
-        # at this point, either it's None or passed
-        assert only_run_if is None or (get_previous_result_status(only_run_if) == ChecksConstants.OK)
+    def work():
+        while True:
+            with condition:
+                while True:
+                    if not ready and running[0] == 0:
+                        # nothing is running and nothing else can run
+                        condition.notify_all()
+                        return
+                    i = next_ready()
+                    if i is not None:
+                        break
+                    condition.wait()
+                ready.remove(i)
+                heapq.heapify(ready)
+                running[0] += 1
+                exclusive = entries[i].exclusive
+                if exclusive:
+                    exclusive_running[0] = True
+            r = run_check(entries[i], cache)
+            with condition:
+                running[0] -= 1
+                if exclusive:
+                    exclusive_running[0] = False
+                record_result(i, r)
+                condition.notify_all()
+    
+    nworkers = max(1, min(nworkers, n))
+    if nworkers == 1:
+        work()
+    else:
+        threads = []
+        for k in range(nworkers):
+            t = threading.Thread(target=work, name='what_the_duck-%d' % k)
+            t.setDaemon(True)
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
     
-        try:
-            res = entry.check.check() or ''
-            r = Result(entry=entry, status=ChecksConstants.OK, out_short='', out_long=res)
-            record_result(r)
-            
-        except CheckError as e:
-            r = Result(entry=entry, status=ChecksConstants.ERROR, 
-                       out_short='Could not run test.',
-                       out_long=e.long_explanation)
-            record_result(r)
-            
-        except CheckFailed as e:
-            r = Result(entry=entry, status=ChecksConstants.FAIL, 
-                       out_short=e.compact,
-                       out_long=e.long_explanation)
-            record_result(r)
-            
-        except Exception as e:
-            msg = 'Invalid test: it raised the exception %s.' % type(e).__name__
-            l = 'I expect the tests to only raise CheckError or CheckFailed.'
-            l += '\n\nEntire exception:\n\n'
-            l += indent(traceback.format_exc(e), '  ')
-            r = Result(entry=entry, status=ChecksConstants.ERROR, 
-                       out_short=msg,
-                       out_long=l)
-            record_result(r)
-            
+    assert not None in results
     return results
 
+def skipped_result(entry, msg):
+    return Result(entry=entry, status=ChecksConstants.SKIP, out_short=msg, out_long='', 
+                  duration=0.0, cached=False)
+
+def run_check(entry, cache):
+    """ Runs the check of the entry (unless it is in the cache) and returns a Result. """
+    if cache is not None:
+        r = cache.get(entry)
+        if r is not None:
+            return r
     
+    t0 = time.time()
+    try:
+        res = entry.check.check() or ''
+        status, out_short, out_long = ChecksConstants.OK, '', res
+        
+    except CheckError as e:
+        status, out_short, out_long = ChecksConstants.ERROR, 'Could not run test.', e.long_explanation
+        
+    except CheckFailed as e:
+        status, out_short, out_long = ChecksConstants.FAIL, e.compact, e.long_explanation
+        
+    except Exception as e:
+        msg = 'Invalid test: it raised the exception %s.' % type(e).__name__
+        l = 'I expect the tests to only raise CheckError or CheckFailed.'
+        l += '\n\nEntire exception:\n\n'
+        l += indent(traceback.format_exc(e), '  ')
+        status, out_short, out_long = ChecksConstants.ERROR, msg, l
     
+    return Result(entry=entry, status=status, out_short=out_short, out_long=out_long, 
+                  duration=time.time() - t0, cached=False)
@@ -38,6 +38,19 @@ def display_short_statistics(results):
         
     return o
             
+def display_timing(results, wall_time, nslowest=10):
+    """ Returns a summary of the time taken by the checks, with the slowest ones. """
+    NL = '\n'
+    total = sum(r.duration for r in results if not r.cached)
+    ncached = len([r for r in results if r.cached])
+    o = 'Timing: %.1f s (%.1f s of checks); %d result(s) reused from the cache.' % (wall_time, total, ncached) + NL
+    slowest = sorted([r for r in results if not r.cached], key=lambda r: -r.duration)[:nslowest]
+    if slowest:
+        o += 'Slowest checks:' + NL
+        for r in slowest:
+            o += '  %6.2f s  %s' % (r.duration, r.entry.desc) + NL
+    return o
+            
 def display_summary(results): 
     stats = Statistics(results)
     NL = '\n'
@@ -1,5 +1,6 @@
 from . import run 
 from . import repo_age 
+from . import scheduling
  
 # 
 # def jobs_comptests(context):  
@@ -0,0 +1,147 @@
+import time
+
+from comptests import comptest, run_module_tests
+from duckietown_utils.caching import MemoryStore
+from what_the_duck.check import Check, CheckFailed
+from what_the_duck.constant import ChecksConstants
+from what_the_duck.entry import Diagnosis
+from what_the_duck.list_of_checks import Manager
+from what_the_duck.results_cache import ResultsCache
+from what_the_duck.sanity_checks import run_checks
+
+
+class Sleeps(Check):
+    """ Sleeps, and remembers the order in which the checks finished. """
+
+    def __init__(self, name, seconds, finished, fails=False):
+        self.name = name
+        self.seconds = seconds
+        self.finished = finished
+        self.fails = fails
+        self.ncalls = 0
+
+    def check(self):
+        self.ncalls += 1
+        time.sleep(self.seconds)
+        self.finished.append(self.name)
+        if self.fails:
+            raise CheckFailed('%s failed' % self.name)
+
+
+class Interval(Check):
+    """ Sleeps, and remembers when it started and finished. """
+
+    def __init__(self, name, seconds, intervals):
+        self.name = name
+        self.seconds = seconds
+        self.intervals = intervals
+
+    def check(self):
+        t0 = time.time()
+        time.sleep(self.seconds)
+        self.intervals.append((self.name, t0, time.time()))
+
+
+def max_concurrent(intervals):
+    """ The largest number of the (name, start, end) intervals that overlap. """
+    events = []
+    for _, start, end in intervals:
+        events.append((start, 1))
+        events.append((end, -1))
+    # at the same time, the ends come before the starts
+    events.sort()
+    n = 0
+    res = 0
+    for _, delta in events:
+        n += delta
+        res = max(res, n)
+    return res
+
+
+@comptest
+def test_dependencies():
+    finished = []
+    m = Manager()
+    a = m.add(None, "a", Sleeps('a', 0.1, finished), Diagnosis(""))
+    b = m.add(a, "b", Sleeps('b', 0, finished), Diagnosis(""))
+    c = m.add(None, "c", Sleeps('c', 0, finished, fails=True), Diagnosis(""))
+    d = m.add(c, "d", Sleeps('d', 0, finished), Diagnosis(""))
+    m.add(d, "e", Sleeps('e', 0, finished), Diagnosis(""))
+    m.add(b, "f", Sleeps('f', 0, finished), Diagnosis(""))
+
+    for nworkers in [1, 4]:
+        del finished[:]
+        results = run_checks(m.entries, nworkers=nworkers)
+        assert [r.entry.desc for r in results] == ['a', 'b', 'c', 'd', 'e', 'f']
+        status = [r.status for r in results]
+        OK, FAIL, SKIP = ChecksConstants.OK, ChecksConstants.FAIL, ChecksConstants.SKIP
+        assert status == [OK, OK, FAIL, SKIP, SKIP, OK], status
+        assert finished.index('a') < finished.index('b') < finished.index('f')
+        assert not 'd' in finished and not 'e' in finished
+
+
+@comptest
+def test_concurrent():
+    intervals = []
+    m = Manager()
+    for i in range(8):
+        m.add(None, "sleep %d" % i, Interval(i, 0.2, intervals), Diagnosis(""))
+
+    results = run_checks(m.entries, nworkers=4)
+    assert len(intervals) == 8
+    for r in results:
+        assert r.duration >= 0.2
+    # the checks ran at the same time, but never more than the workers
+    assert 2 <= max_concurrent(intervals) <= 4, intervals
+
+
+@comptest
+def test_exclusive():
+    intervals = []
+    m = Manager()
+    for i in range(8):
+        m.add(None, "sleep %d" % i, Interval(i, 0.1, intervals), Diagnosis(""),
+              exclusive=i in [2, 3, 6])
+
+    run_checks(m.entries, nworkers=4)
+    assert len(intervals) == 8
+    # the exclusive ones never overlap with any other check
+    for name, start, end in intervals:
+        if not m.entries[name].exclusive:
+            continue
+        for name2, start2, end2 in intervals:
+            if name2 != name:
+                assert end <= start2 or end2 <= start, (name, name2)
+    # the other 5 still run at the same time
+    others = [_ for _ in intervals if not m.entries[_[0]].exclusive]
+    assert max_concurrent(others) >= 2, others
+
+
+@comptest
+def test_cache_ttl():
+    finished = []
+    m = Manager()
+    cached = m.add(None, "cached", Sleeps('cached', 0, finished), Diagnosis(""), cache_ttl=100)
+    not_cached = m.add(None, "not cached", Sleeps('not cached', 0, finished), Diagnosis(""))
+    failing = m.add(None, "failing", Sleeps('failing', 0, finished, fails=True), Diagnosis(""), cache_ttl=100)
+
+    store = MemoryStore()
+    for _ in range(3):
+        cache = ResultsCache(store)
+        results = run_checks(m.entries, nworkers=2, cache=cache)
+        cache.save()
+    assert cached.check.ncalls == 1
+    assert not_cached.check.ncalls == 3
+    # failures are never cached
+    assert failing.check.ncalls == 3
+    assert [r.cached for r in results] == [True, False, False]
+
+    # expired
+    cached.cache_ttl = 0
+    time.sleep(0.01)
+    run_checks(m.entries, cache=ResultsCache(store))
+    assert cached.check.ncalls == 2
+
+
+if __name__ == '__main__': # pragma: no cover
+    run_module_tests()
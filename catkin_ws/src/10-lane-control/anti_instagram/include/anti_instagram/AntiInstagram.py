@@ -1,6 +1,7 @@
 from .kmeans import getparameters2, identifyColors, runKMeans
-from .scale_and_shift import scaleandshift
+from .scale_and_shift import scaleandshift, scaleandshift_lut
 from anti_instagram.kmeans import CENTERS, CENTERS2
+import cv2
 import numpy as np
 from duckietown_utils import logger
 
@@ -13,13 +14,27 @@ def calculate_transform(image):
         parameters['scale']
         parameters['shift']
     """
+    trained4, counter4,score4 = runKMeans(image, num_colors=4, init=CENTERS2)
+    trained3, counter3,score3 = runKMeans(image, num_colors=3, init=CENTERS)
+    return transform_from_clusters(trained3, counter3, score3, 
+                                   trained4, counter4, score4)
+
+def transform_from_clusters(trained3, counter3, score3, trained4, counter4, score4):
+    """
+        Derives the transform from the results of the clustering with
+        3 and 4 colors (initialized with CENTERS and CENTERS2).
+        
+        counter3/4 are the number (or fraction) of pixels in each cluster,
+        score3/4 are the negative sums of squared distances, as in
+        KMeans.score().
+        
+        Returns the same as calculate_transform().
+    """
     centers4 = CENTERS2
-    trained4, counter4,score4 = runKMeans(image, num_colors=4, init=centers4)
     trained4 = trained4[[0,2,3],:]
     counter4 = [counter4[0],counter4[2],counter4[3]]
     centers4 = centers4[[0,2,3],:]
     centers3 = CENTERS
-    trained3, counter3,score3 = runKMeans(image, num_colors=3, init=centers3)
     decision34=(score3+3e7)>score4;
     if (decision34):
         logger.info("picked 3 colors")
@@ -87,10 +102,26 @@ class AntiInstagram():
         self.scale = [1.0, 1.0, 1.0]
         self.shift = [0.0, 0.0, 0.0]
         self.health = 0
+        # lookup table for applyTransformLUT(), and the transform it was built for
+        self.lut = None
+        self.lut_key = None
     
     def applyTransform(self, image):
         corrected_image = scaleandshift(image, self.scale, self.shift)
         return corrected_image
+
+    def applyTransformLUT(self, image, out=None):
+        """ 
+            Same result as cv2.convertScaleAbs(self.applyTransform(image))
+            for a uint8 image, but with one table lookup per pixel.
+            
+            The table is rebuilt only when scale or shift change. 
+        """
+        key = (tuple(self.scale), tuple(self.shift))
+        if key != self.lut_key:
+            self.lut = scaleandshift_lut(self.scale, self.shift)
+            self.lut_key = key
+        return cv2.LUT(image, self.lut, dst=out)
     
     def calculateTransform(self, image, testframe=False):
         success, self.health, parameters = calculate_transform(image)
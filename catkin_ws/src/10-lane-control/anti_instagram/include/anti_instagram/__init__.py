@@ -8,3 +8,4 @@ from .AntiInstagram import *
 from .kmeans import *
 from .utils import *
 from .scale_and_shift import *
+from .continuous import *
@@ -0,0 +1,123 @@
+from .AntiInstagram import transform_from_clusters
+from .kmeans import CENTERS, CENTERS2
+import numpy as np
+
+__all__ = [
+    'IncrementalKMeans',
+    'ContinuousCalibration',
+]
+
+
+class IncrementalKMeans():
+    """
+        Mini-batch k-means, warm-started from the given centers.
+
+        Every call to partial_fit() moves each center towards the mean of
+        the samples assigned to it, with a step that depends on how many
+        samples the center has seen. The counts decay by the factor
+        "forgetting" at every batch, so that the centers keep following
+        slow changes (e.g. in the illumination) instead of freezing.
+    """
+
+    def __init__(self, init, forgetting):
+        self.centers = np.array(init, dtype='float64')
+        self.k = self.centers.shape[0]
+        self.forgetting = forgetting
+        self.counts = np.zeros(self.k)
+        # running averages over the batches
+        self.fractions = np.ones(self.k) / self.k
+        self.mean_sq_distance = None
+
+    def partial_fit(self, X):
+        """ X is a (n, 3) array of pixels. """
+        X = np.asarray(X, dtype='float64')
+        d2 = np.sum((X[:, np.newaxis, :] - self.centers[np.newaxis, :, :]) ** 2, axis=2)
+        labels = np.argmin(d2, axis=1)
+        n = X.shape[0]
+
+        batch_counts = np.bincount(labels, minlength=self.k)
+        for j in np.nonzero(batch_counts)[0]:
+            self.counts[j] += batch_counts[j]
+            eta = batch_counts[j] / self.counts[j]
+            mean_j = np.mean(X[labels == j, :], axis=0)
+            self.centers[j] += eta * (mean_j - self.centers[j])
+        self.counts *= self.forgetting
+
+        batch_sq_distance = np.mean(d2[np.arange(n), labels])
+        batch_fractions = batch_counts / float(n)
+        if self.mean_sq_distance is None:
+            self.mean_sq_distance = batch_sq_distance
+            self.fractions = batch_fractions
+        else:
+            a = 1.0 - self.forgetting
+            self.mean_sq_distance += a * (batch_sq_distance - self.mean_sq_distance)
+            self.fractions += a * (batch_fractions - self.fractions)
+
+
+class ContinuousCalibration():
+    """
+        Tracks the AntiInstagram transform over a stream of images.
+
+        Unlike calculate_transform(), which fits KMeans from scratch,
+        every call to update() only looks at nsamples random pixels of
+        the bottom 100 rows, and updates the 3-color and 4-color clusters
+        of the previous frames. The scale and shift are re-derived from
+        the clusters every "recompute_every" frames.
+
+        The cost per frame is therefore bounded and does not depend on
+        the size of the image.
+
+        The pixels are drawn with "rng", a numpy.random.RandomState
+        (by default, the global one of numpy.random).
+    """
+
+    # same region used by runKMeans()
+    nrows = 100
+
+    def __init__(self, nsamples=1000, recompute_every=30, forgetting=0.95, rng=None):
+        self.nsamples = nsamples
+        self.rng = rng if rng is not None else np.random
+        self.recompute_every = recompute_every
+        self.km3 = IncrementalKMeans(CENTERS, forgetting)
+        self.km4 = IncrementalKMeans(CENTERS2, forgetting)
+        self.nframes = 0
+
+        self.scale = [1.0, 1.0, 1.0]
+        self.shift = [0.0, 0.0, 0.0]
+        self.health = 0
+
+    def sample_pixels(self, image):
+        region = image[-self.nrows:, :, :]
+        H, W = region.shape[0:2]
+        i = self.rng.randint(0, H, self.nsamples)
+        j = self.rng.randint(0, W, self.nsamples)
+        return region[i, j, :], H * W
+
+    def update(self, image):
+        """
+            Updates the clusters with a new BGR image.
+
+            Returns True if the scale and shift were re-derived
+            successfully in this call.
+        """
+        X, npixels = self.sample_pixels(image)
+        self.km3.partial_fit(X)
+        self.km4.partial_fit(X)
+        self.nframes += 1
+
+        if self.nframes % self.recompute_every != 0:
+            return False
+
+        # KMeans.score() is the negative sum over all the pixels of the region
+        score3 = -self.km3.mean_sq_distance * npixels
+        score4 = -self.km4.mean_sq_distance * npixels
+        success, health, parameters = \
+            transform_from_clusters(self.km3.centers.copy(), self.km3.fractions, score3,
+                                    self.km4.centers.copy(), self.km4.fractions, score4)
+        if not success:
+            return False
+
+        self.health = health
+        self.scale = parameters['scale']
+        self.shift = parameters['shift']
+        return True
@@ -43,3 +43,22 @@ def scaleandshift1(img, scale, shift):
     img_shift = np.reshape(img_shift + np.array(shift), [h, w, 3])
 
     return img_shift
+
+def scaleandshift_lut(scale, shift):
+    """ 
+        Returns the (1, 256, 3) uint8 table for cv2.LUT that is equivalent
+        to cv2.convertScaleAbs(scaleandshift2(img, scale, shift)) for
+        uint8 images: the computation is done in float32 in the same way,
+        but only once for each of the 256 values.
+    """
+    assert len(scale) == 3, scale
+    assert len(shift) == 3, shift
+    
+    values = np.arange(256, dtype='float32')
+    lut = np.empty((1, 256, 3), dtype='uint8')
+    for i in range(3):
+        s = np.array(scale[i]).astype('float32')
+        p = np.array(shift[i]).astype('float32')
+        v = values * s + p
+        lut[0, :, i] = np.clip(np.rint(np.abs(v)), 0, 255)
+    return lut
@@ -3,6 +3,7 @@
 def jobs_comptests(context):  
     
     from . import iids_tests 
+    from . import continuous_test 
     
     from comptests.registrar import jobs_registrar_simple
     jobs_registrar_simple(context)
@@ -0,0 +1,63 @@
+import os
+import time
+
+from comptests.registrar import comptest, run_module_tests
+
+from anti_instagram import ContinuousCalibration, calculate_transform, logger
+from duckietown_utils.path_utils import get_ros_package_path
+import cv2
+import numpy as np
+
+
+def get_test_image():
+    fn = os.path.join(get_ros_package_path('anti_instagram'), 'tests', 'frame.jpg')
+    image = cv2.imread(fn)
+    return cv2.resize(image, (640, 480))
+
+
+@comptest
+def continuous_calibration_converges():
+    image = get_test_image()
+
+    t0 = time.time()
+    success, _, parameters = calculate_transform(image)
+    t_batch = time.time() - t0
+    assert success
+
+    nframes = 60
+    calibration = ContinuousCalibration(nsamples=1000, recompute_every=10,
+                                        rng=np.random.RandomState(0))
+    t0 = time.time()
+    for _ in range(nframes):
+        calibration.update(image)
+    t_frame = (time.time() - t0) / nframes
+
+    logger.info('calculate_transform: %.1f ms; continuous update: %.2f ms per frame' % 
+                (1000 * t_batch, 1000 * t_frame))
+    logger.info('batch:      scale %s shift %s' % (parameters['scale'], parameters['shift']))
+    logger.info('continuous: scale %s shift %s' % (calibration.scale, calibration.shift))
+
+    assert np.allclose(calibration.scale, parameters['scale'], atol=0.05)
+    assert np.allclose(calibration.shift, parameters['shift'], atol=5.0)
+
+
+@comptest
+def continuous_calibration_tracks_changes():
+    image = get_test_image()
+    calibration = ContinuousCalibration(nsamples=1000, recompute_every=10,
+                                        rng=np.random.RandomState(1))
+    for _ in range(30):
+        calibration.update(image)
+
+    # the illumination changes
+    darker = cv2.convertScaleAbs(image, alpha=0.8)
+    _, _, parameters = calculate_transform(darker)
+    for _ in range(100):
+        calibration.update(darker)
+
+    assert np.allclose(calibration.scale, parameters['scale'], atol=0.05)
+    assert np.allclose(calibration.shift, parameters['shift'], atol=5.0)
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -3,6 +3,7 @@ import rospy
 from sensor_msgs.msg import CompressedImage,Image  # @UnresolvedImport
 from duckietown_msgs.msg import AntiInstagramHealth, BoolStamped, AntiInstagramTransform  # @UnresolvedImport
 from anti_instagram.AntiInstagram import *
+from anti_instagram.continuous import ContinuousCalibration
 from duckietown_utils.jpg import image_cv_from_jpg
 from cv_bridge import CvBridge  # @UnresolvedImport
 from line_detector.timekeeper import TimeKeeper
@@ -15,6 +16,18 @@ class AntiInstagramNode():
         self.locked = False
         
         self.image_pub_switch = rospy.get_param("~publish_corrected_image",False)
+
+        # Continuous calibration: the transform is tracked on every
+        # "continuous_skip"-th image, instead of computed on a click.
+        self.continuous = rospy.get_param("~continuous", False)
+        self.continuous_skip = rospy.get_param("~continuous_skip", 1)
+        if self.continuous_skip < 1:
+            msg = 'Invalid value for ~continuous_skip: %r (must be >= 1).' % self.continuous_skip
+            raise ValueError(msg)
+        self.calibration = ContinuousCalibration(
+            nsamples=rospy.get_param("~continuous_samples", 1000),
+            recompute_every=rospy.get_param("~continuous_recompute_every", 30))
+        self.nimages = 0
         
         # Initialize publishers and subscribers
         self.pub_image = rospy.Publisher("~corrected_image", Image, queue_size=1)
@@ -42,11 +55,17 @@ class AntiInstagramNode():
         
         self.image_msg = None
         self.click_on = False
+        # False after the user turns the correction off with a click
+        self.correction_enabled = True
 
     def cbNewImage(self,image_msg):
         # memorize image
         self.image_msg = image_msg
         
+        self.nimages += 1
+        if self.continuous and self.nimages % self.continuous_skip == 0:
+            self.updateContinuous(image_msg)
+
         if self.image_pub_switch:
             tk = TimeKeeper(image_msg)
             cv_image = self.bridge.imgmsg_to_cv2(image_msg, "bgr8")
@@ -70,6 +89,7 @@ class AntiInstagramNode():
         # if we have seen an image:
         if self.image_msg is not None:
             self.click_on = not self.click_on
+            self.correction_enabled = self.click_on
             if self.click_on:
                 self.processImage(self.image_msg)
             else:
@@ -78,6 +98,21 @@ class AntiInstagramNode():
                 rospy.loginfo('ai: Color transform is turned OFF!')
 
 
+    def updateContinuous(self, msg):
+        try:
+            cv_image = image_cv_from_jpg(msg.data)
+        except ValueError as e:
+            rospy.loginfo('Anti_instagram cannot decode image: %s' % e)
+            return
+
+        # the statistics are kept up to date, but the transform is not
+        # published while the user has turned the correction off
+        if self.calibration.update(cv_image) and self.correction_enabled:
+            self.ai.scale = self.calibration.scale
+            self.ai.shift = self.calibration.shift
+            self.ai.health = self.calibration.health
+            self.publishTransform()
+
     def processImage(self,msg):
         '''
         Inputs:
@@ -106,6 +141,9 @@ class AntiInstagramNode():
         tk.completed('calculateTransform')
 
 
+        self.publishTransform()
+
+    def publishTransform(self):
         # if health is much below the threshold value, do not update the color correction and log it.
         if self.ai.health <= 0.001:
             # health is not good
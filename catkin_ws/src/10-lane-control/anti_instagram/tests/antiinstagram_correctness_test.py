@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 import unittest, rosunit
 from anti_instagram import (L1_image_distance, L2_image_distance, logger,
-    random_image, scaleandshift1, scaleandshift2, wrap_test_main)
+    random_image, scaleandshift1, scaleandshift2, wrap_test_main, AntiInstagram)
+import cv2
 import numpy as np
 
 class AntiInstagramCorrectnessTest(unittest.TestCase):
@@ -57,5 +58,20 @@ class AntiInstagramCorrectnessTest(unittest.TestCase):
         img2 = scaleandshift2(img, scale, shift)
         self.assert_L1_small(img1, img2)
 
+    def test_anti_instagram_lut(self):
+        logger.info('The lookup table gives exactly the same uint8 image')
+
+        img = random_image(480, 640)
+        ai = AntiInstagram()
+        # includes negative values and values above 255
+        for scale, shift in [([1.0, 1.0, 1.0], [0.0, 0.0, 0.0]),
+                             ([1.3, 0.7, 2.5], [-40.0, 12.5, -300.0]),
+                             (np.random.rand(3) * 2, np.random.randn(3) * 50)]:
+            ai.scale = scale
+            ai.shift = shift
+            expected = cv2.convertScaleAbs(scaleandshift2(img, scale, shift))
+            obtained = ai.applyTransformLUT(img)
+            self.assertTrue(np.array_equal(expected, obtained))
+
 if __name__ == '__main__':
     rosunit.unitrun('anti_instagram', 'antiinstagram_correctness_test', AntiInstagramCorrectnessTest)
\ No newline at end of file
@@ -24,6 +24,14 @@ class AntiInstagramPerformanceTest(unittest.TestCase):
                 #logger.info('algo: %d Shape: %s   -> %1.f ms' % (i, str(Params.shape), 1000*res))
                 # self.assertLess(res, 0.05)  # Calculate in less than 0.05
 
+        logger.info('Lookup table vs algorithm 2 followed by cv2.convertScaleAbs')
+        SASParams.algorithm = 2
+        for Params.shape in shapes:
+            res_float = self.applyTransformAndConvertOnRandomImg()
+            res_lut = self.applyTransformLUTOnRandomImg()
+            logger.info('Shape: %s   float+convert %.2f ms  lut %.2f ms' %
+                        (str(Params.shape), 1000 * res_float, 1000 * res_lut))
+
         for Params.shape in shapes:
             res = self.calcuateTransformOnRandomImg()
             #logger.info('Shape: %s   -> %1.f ms' % (str(Params.shape), 1000*res))
@@ -39,6 +47,23 @@ class AntiInstagramPerformanceTest(unittest.TestCase):
         #logger.info("Average Apply Transform Took: %.1f ms " % (t * 1000))
         return t
 
+    def applyTransformAndConvertOnRandomImg(self):
+        n = 50
+        tn = timeit.timeit(stmt='cv2.convertScaleAbs(ai.applyTransform(img))',
+                           setup='from __main__ import setup; import cv2; ai,img=setup()',
+                           number=n
+                           )
+        return tn / n
+
+    def applyTransformLUTOnRandomImg(self):
+        n = 50
+        # the first call builds the table, as it happens on the first frame
+        tn = timeit.timeit(stmt='ai.applyTransformLUT(img)',
+                           setup='from __main__ import setup; ai,img=setup()',
+                           number=n
+                           )
+        return tn / n
+
     def calcuateTransformOnRandomImg(self):
         n = 10
         tn = timeit.timeit(stmt='ai.calculateTransform(img,True)',
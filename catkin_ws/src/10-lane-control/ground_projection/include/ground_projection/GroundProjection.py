@@ -5,7 +5,7 @@ import rospy
 from sensor_msgs.msg import CameraInfo
 from geometry_msgs.msg import Point
 
-from duckietown_msgs.msg import (Pixel, Vector2D)
+from duckietown_msgs.msg import (Pixel, Vector2D, Segment, SegmentList)
 from image_geometry import PinholeCameraModel
 from duckietown_utils.path_utils import get_ros_package_path
 from duckietown_utils.yaml_wrap import (yaml_load_file, yaml_write_to_file)
@@ -25,6 +25,9 @@ class GroundProjection():
         self.Hinv = np.linalg.inv(self.H)
 
         self.pcm_ = PinholeCameraModel()
+        # undistortion maps used by rectify(), and the calibration they are for
+        self.rectify_maps = None
+        self.rectify_maps_key = None
 
         # Load checkerboard information
         self.board_ = self.load_board_info()
@@ -77,6 +80,64 @@ class GroundProjection():
         point.z = 0.0
         return point
 
+    def vectors2pixels(self, vectors):
+        '''Same as vector2pixel(), for a (N,2) array of normalized coordinates'''
+        vectors = np.asarray(vectors, dtype='float64').reshape(-1, 2)
+        cw = self.ci_.width
+        ch = self.ci_.height
+        u = np.clip(cw * vectors[:, 0], 0, cw - 1)
+        v = ch * vectors[:, 1]
+        # as in vector2pixel(), v is also set to 0 beyond the last row
+        v[(v < 0) | (v > ch - 1)] = 0
+        return np.column_stack((u, v))
+
+    def pixels2ground(self, pixels):
+        '''
+            Same as pixel2ground(), for a (N,2) array of pixels u,v.
+            Returns the (N,2) array of ground coordinates x,y.
+
+            All the points are rectified with one call of cv2.undistortPoints
+            and projected with one matrix product.
+        '''
+        uv_raw = np.asarray(pixels, dtype='float64').reshape(-1, 1, 2)
+        n = uv_raw.shape[0]
+        if n == 0:
+            return np.zeros((0, 2))
+        if not self.rectified_input:
+            # this is what PinholeCameraModel.rectifyPoint() does for one point
+            uv_raw = cv2.undistortPoints(uv_raw, self.pcm_.K, self.pcm_.D,
+                                         R=self.pcm_.R, P=self.pcm_.P)
+        uv_raw = np.hstack((uv_raw.reshape(n, 2), np.ones((n, 1))))
+        ground_points = np.dot(uv_raw, self.H.T)
+        return ground_points[:, 0:2] / ground_points[:, 2:3]
+
+    def vectors2ground(self, vectors):
+        return self.pixels2ground(self.vectors2pixels(vectors))
+
+    def segment_list2ground(self, seglist_msg):
+        '''
+            Projects both points of all segments of the SegmentList at once.
+
+            Returns a new SegmentList with the same header, where each
+            segment has the color and the ground points (the other fields
+            are left to their default values).
+        '''
+        seglist_out = SegmentList()
+        seglist_out.header = seglist_msg.header
+        segments = seglist_msg.segments
+        if not segments:
+            return seglist_out
+
+        vectors = [(p.x, p.y) for s in segments for p in s.pixels_normalized]
+        ground = self.vectors2ground(vectors).reshape(len(segments), 4).tolist()
+        seglist_out.segments = [
+            Segment(s.color,
+                    [Vector2D(), Vector2D()],
+                    Vector2D(),
+                    [Point(x1, y1, 0.0), Point(x2, y2, 0.0)])
+            for s, (x1, y1, x2, y2) in zip(segments, ground)]
+        return seglist_out
+
     def ground2pixel(self, point):
         ground_point = np.array([point.x, point.y, 1.0])
         image_point = np.dot(self.Hinv, ground_point)
@@ -92,13 +153,28 @@ class GroundProjection():
             pixel.u = image_point[0]
             pixel.v = image_point[1]
 
+    def get_rectify_maps(self):
+        '''
+            Returns the undistortion maps for the current camera model,
+            in the compact fixed-point format (CV_16SC2 + CV_16UC1).
+
+            They are computed only the first time, and again only if the
+            resolution or the intrinsics change.
+        '''
+        pcm = self.pcm_
+        key = (pcm.width, pcm.height,
+               tuple(np.asarray(pcm.K).flat), tuple(np.asarray(pcm.D).flat),
+               tuple(np.asarray(pcm.R).flat), tuple(np.asarray(pcm.P).flat))
+        if key != self.rectify_maps_key:
+            self.rectify_maps = cv2.initUndistortRectifyMap(pcm.K, pcm.D, pcm.R, pcm.P,
+                                                            (pcm.width, pcm.height), cv2.CV_16SC2)
+            self.rectify_maps_key = key
+        return self.rectify_maps
+
     def rectify(self, cv_image_raw):
         '''Undistort image'''
-        cv_image_rectified = np.zeros(np.shape(cv_image_raw))
-        mapx = np.ndarray(shape=(self.pcm_.height, self.pcm_.width, 1), dtype='float32')
-        mapy = np.ndarray(shape=(self.pcm_.height, self.pcm_.width, 1), dtype='float32')
-        mapx, mapy = cv2.initUndistortRectifyMap(self.pcm_.K, self.pcm_.D, self.pcm_.R, self.pcm_.P, (self.pcm_.width, self.pcm_.height), cv2.CV_32FC1, mapx, mapy)
-        return cv2.remap(cv_image_raw, mapx, mapy, cv2.INTER_CUBIC, cv_image_rectified)
+        map1, map2 = self.get_rectify_maps()
+        return cv2.remap(cv_image_raw, map1, map2, cv2.INTER_CUBIC)
 
     def estimate_homography(self,cv_image):
         '''Estimate ground projection using instrinsic camera calibration parameters'''
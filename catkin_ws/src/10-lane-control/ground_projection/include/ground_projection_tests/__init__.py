@@ -0,0 +1,9 @@
+
+
+def jobs_comptests(context):  
+    
+    from . import batch_projection 
+    from . import rectify_maps 
+    
+    from comptests.registrar import jobs_registrar_simple
+    jobs_registrar_simple(context)
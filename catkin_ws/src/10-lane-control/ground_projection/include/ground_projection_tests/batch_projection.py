@@ -0,0 +1,82 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+from duckietown_msgs.msg import Segment, SegmentList  # @UnresolvedImport
+from sensor_msgs.msg import CameraInfo  # @UnresolvedImport
+
+from duckietown_utils.path_utils import get_ros_package_path
+from duckietown_utils.yaml_wrap import yaml_load_file
+from ground_projection.GroundProjection import GroundProjection
+import numpy as np
+
+
+def get_camera_info():
+    """ The intrinsic calibration of one of the robots in the baseline config. """
+    fn = os.path.join(get_ros_package_path('duckietown'), 'config', 'baseline',
+                      'calibration', 'camera_intrinsic', 'milo.yaml')
+    calib_data = yaml_load_file(fn)
+    cam_info = CameraInfo()
+    cam_info.width = calib_data['image_width']
+    cam_info.height = calib_data['image_height']
+    cam_info.K = calib_data['camera_matrix']['data']
+    cam_info.D = calib_data['distortion_coefficients']['data']
+    cam_info.R = calib_data['rectification_matrix']['data']
+    cam_info.P = calib_data['projection_matrix']['data']
+    cam_info.distortion_model = calib_data['distortion_model']
+    return cam_info
+
+
+def get_ground_projection():
+    gp = GroundProjection('milo')
+    gp.initialize_pinhole_camera_model(get_camera_info())
+    return gp
+
+
+def random_segment_list(n):
+    seglist = SegmentList()
+    for _ in range(n):
+        s = Segment()
+        s.color = np.random.randint(0, 3)
+        for p in s.pixels_normalized:
+            # the detections are in the bottom part of the image
+            p.x = np.random.uniform(0, 1)
+            p.y = np.random.uniform(0.3, 1)
+        seglist.segments.append(s)
+    return seglist
+
+
+def segment_list2ground_loop(gp, seglist_msg):
+    """ The way the node used to do it, one point at a time. """
+    seglist_out = SegmentList()
+    seglist_out.header = seglist_msg.header
+    for received_segment in seglist_msg.segments:
+        new_segment = Segment()
+        new_segment.points[0] = gp.vector2ground(received_segment.pixels_normalized[0])
+        new_segment.points[1] = gp.vector2ground(received_segment.pixels_normalized[1])
+        new_segment.color = received_segment.color
+        seglist_out.segments.append(new_segment)
+    return seglist_out
+
+
+@comptest
+def batch_projection_same_as_loop():
+    gp = get_ground_projection()
+    seglist = random_segment_list(100)
+    # include the corner cases of vector2pixel()
+    seglist.segments[0].pixels_normalized[0].x = -0.1
+    seglist.segments[0].pixels_normalized[0].y = 1.0
+    seglist.segments[0].pixels_normalized[1].x = 1.0
+
+    expected = segment_list2ground_loop(gp, seglist)
+    obtained = gp.segment_list2ground(seglist)
+    assert len(expected.segments) == len(obtained.segments)
+    for a, b in zip(expected.segments, obtained.segments):
+        assert a.color == b.color
+        for pa, pb in zip(a.points, b.points):
+            assert np.allclose([pa.x, pa.y, pa.z], [pb.x, pb.y, pb.z]), (pa, pb)
+
+    assert len(gp.segment_list2ground(SegmentList()).segments) == 0
+
+
+if __name__ == '__main__':
+    run_module_tests()
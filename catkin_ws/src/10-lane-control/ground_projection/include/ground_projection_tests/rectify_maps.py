@@ -0,0 +1,51 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+import cv2
+
+from duckietown_utils.path_utils import get_ros_package_path
+from ground_projection_tests.batch_projection import get_ground_projection
+import numpy as np
+
+
+def get_test_frame():
+    """ A 640x480 frame, as it would arrive from the camera. """
+    fn = os.path.join(get_ros_package_path('anti_instagram'), 'tests', 'frame.jpg')
+    image_cv = cv2.imread(fn)
+    return cv2.resize(image_cv, (640, 480))
+
+
+def rectify_uncached(gp, cv_image_raw):
+    """ The way rectify() used to do it, computing the float maps every time. """
+    pcm = gp.pcm_
+    mapx, mapy = cv2.initUndistortRectifyMap(pcm.K, pcm.D, pcm.R, pcm.P,
+                                             (pcm.width, pcm.height), cv2.CV_32FC1)
+    return cv2.remap(cv_image_raw, mapx, mapy, cv2.INTER_CUBIC)
+
+
+@comptest
+def rectify_maps_cached():
+    gp = get_ground_projection()
+    image = get_test_frame()
+    a = gp.rectify(image)
+    maps = gp.rectify_maps
+    b = gp.rectify(image)
+    assert gp.rectify_maps is maps
+    assert np.array_equal(a, b)
+
+    # the fixed-point maps are accurate to 1/32 of pixel
+    expected = rectify_uncached(gp, image)
+    diff = np.mean(np.abs(expected.astype('float32') - a.astype('float32')))
+    assert diff < 2.0, diff
+
+    # changing the intrinsics invalidates the maps
+    camera_info = gp.ci_
+    camera_info.K = list(np.array(camera_info.K) * 1.01)
+    camera_info.K[8] = 1.0
+    gp.initialize_pinhole_camera_model(camera_info)
+    gp.rectify(image)
+    assert gp.rectify_maps is not maps
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+    Benchmark of GroundProjection.segment_list2ground(): prints the time
+    to project a SegmentList one point at a time, as the node used to do,
+    and in batch, for several numbers of segments.
+
+        $ rosrun ground_projection batch_projection_benchmark.py
+"""
+import time
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from ground_projection.GroundProjection import GroundProjection
+from ground_projection_tests.batch_projection import (get_ground_projection,
+                                                      random_segment_list,
+                                                      segment_list2ground_loop)
+
+
+def main():
+    gp = get_ground_projection()
+    s = 'Time to project a SegmentList on the ground:\n'
+    s += ' %6s | %10s | %10s\n' % ('N', 'loop', 'batch')
+    for n in [10, 50, 100, 200, 500, 1000, 2000]:
+        seglist = random_segment_list(n)
+        res = []
+        for f in [segment_list2ground_loop, GroundProjection.segment_list2ground]:
+            repeat = 10
+            t0 = time.time()
+            for _ in range(repeat):
+                f(gp, seglist)
+            res.append(1000 * (time.time() - t0) / repeat)
+        s += ' %6d | %7.2f ms | %7.2f ms\n' % (n, res[0], res[1])
+    logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+    Benchmark of the cached undistortion maps: prints the time to rectify
+    a 640x480 frame computing the float maps every time, as rectify() used
+    to do, and with the cached fixed-point maps.
+
+        $ rosrun ground_projection rectify_maps_benchmark.py
+"""
+import time
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from ground_projection.GroundProjection import GroundProjection
+from ground_projection_tests.batch_projection import get_ground_projection
+from ground_projection_tests.rectify_maps import get_test_frame, rectify_uncached
+
+
+def main():
+    gp = get_ground_projection()
+    image = get_test_frame()
+    n = 30
+    s = 'Rectification of %d frames of 640x480:\n' % n
+    for name, f in [('uncached float maps', rectify_uncached),
+                    ('cached fixed-point maps', GroundProjection.rectify)]:
+        t0 = time.time()
+        for _ in range(n):
+            f(gp, image)
+        T = time.time() - t0
+        s += ' %25s: %6.2f ms/frame  %6.1f fps\n' % (name, 1000 * T / n, n / T)
+    logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
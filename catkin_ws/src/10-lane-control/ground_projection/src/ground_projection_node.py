@@ -53,15 +53,9 @@ class GroundProjectionNode(object):
         return gp.rectify(cv_image)
 
     def lineseglist_cb(self,seglist_msg):
-        seglist_out = SegmentList()
-        seglist_out.header = seglist_msg.header
-        for received_segment in seglist_msg.segments:
-            new_segment = Segment()
-            new_segment.points[0] = self.gp.vector2ground(received_segment.pixels_normalized[0])
-            new_segment.points[1] = self.gp.vector2ground(received_segment.pixels_normalized[1])
-            new_segment.color = received_segment.color
-            # TODO what about normal and points
-            seglist_out.segments.append(new_segment)
+        # all the segments are projected at once
+        seglist_out = self.gp.segment_list2ground(seglist_msg)
+        # TODO what about normal and points
         self.pub_lineseglist_.publish(seglist_out)
 
     def get_ground_coordinate_cb(self,req):
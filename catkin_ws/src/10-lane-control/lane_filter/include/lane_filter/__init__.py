@@ -1 +1,2 @@
 from .lane_filter import *
+from .lane_filter_vectorized import *
@@ -0,0 +1,105 @@
+from duckietown_msgs.msg import Segment
+import numpy as np
+from .lane_filter import LaneFilterHistogram
+from scipy.ndimage.filters import gaussian_filter
+
+__all__ = [
+    'LaneFilterHistogramVectorized',
+]
+
+
+class LaneFilterHistogramVectorized(LaneFilterHistogram):
+    """
+        Same filter as LaneFilterHistogram, with the Python loops over
+        the cells and over the segments replaced by array operations.
+
+        The arithmetic and the order of the sums are the same, so the
+        beliefs are identical.
+    """
+
+    def predict(self, dt, v, w):
+        delta_t = dt
+        d_t = self.d + v*delta_t*np.sin(self.phi)
+        phi_t = self.phi + w*delta_t
+
+        # each cell moves its mass to the cell where (d_t, phi_t) falls
+        valid = ((self.belief > 0) &
+                 (d_t <= self.d_max) & (d_t >= self.d_min) &
+                 (phi_t >= self.phi_min) & (phi_t <= self.phi_max))
+        p_belief = self.accumulate(d_t[valid], phi_t[valid], self.belief[valid])
+
+        s_belief = np.zeros(self.belief.shape)
+        gaussian_filter(p_belief, self.cov_mask, output=s_belief, mode='constant')
+
+        if np.sum(s_belief) == 0:
+            return
+        self.belief = s_belief/np.sum(s_belief)
+
+    def accumulate(self, d, phi, weights):
+        """
+            Returns the histogram with the sum of the weights of the
+            points (d, phi) that fall in each cell. The points must be
+            inside the bounds.
+        """
+        nd, nphi = self.belief.shape
+        i = np.floor((d - self.d_min)/self.delta_d).astype('int64')
+        j = np.floor((phi - self.phi_min)/self.delta_phi).astype('int64')
+        # points exactly on the upper bound could be past the last cell
+        inside = (i < nd) & (j < nphi)
+        # bincount sums in the order of the points, like the loop did
+        counts = np.bincount(i[inside]*nphi + j[inside], weights=weights[inside],
+                             minlength=nd*nphi)
+        return counts.reshape((nd, nphi))
+
+    def generate_measurement_likelihood(self, segments):
+        d_i, phi_i = self.generateVotes(segments)
+        # if the vote lands outside of the histogram discard it
+        valid = ((d_i <= self.d_max) & (d_i >= self.d_min) &
+                 (phi_i >= self.phi_min) & (phi_i <= self.phi_max))
+        measurement_likelihood = self.accumulate(d_i[valid], phi_i[valid],
+                                                 np.ones(np.count_nonzero(valid)))
+        if np.linalg.norm(measurement_likelihood) == 0:
+            return None
+        measurement_likelihood = measurement_likelihood/np.sum(measurement_likelihood)
+        return measurement_likelihood
+
+    def generateVotes(self, segments):
+        """
+            Same as generateVote() for all the white and yellow segments
+            in front of the robot. Returns the arrays d_i, phi_i.
+        """
+        data = np.array([(s.color, s.points[0].x, s.points[0].y, s.points[1].x, s.points[1].y)
+                         for s in segments], dtype='float64').reshape(-1, 5)
+        color = data[:, 0]
+        # we don't care about RED ones for now, nor about segments behind us
+        keep = (((color == Segment.WHITE) | (color == Segment.YELLOW)) &
+                (data[:, 1] >= 0) & (data[:, 3] >= 0))
+        data = data[keep, :]
+        white = data[:, 0] == Segment.WHITE
+        p1x, p1y, p2x, p2y = data[:, 1], data[:, 2], data[:, 3], data[:, 4]
+
+        dx = p2x - p1x
+        dy = p2y - p1y
+        norm = np.sqrt(dx*dx + dy*dy)
+        t_x = dx/norm
+        t_y = dy/norm
+        n_x = -t_y
+        n_y = t_x
+        d1 = n_x*p1x + n_y*p1y
+        d2 = n_x*p2x + n_y*p2y
+        d_i = (d1+d2)/2
+        phi_i = np.arcsin(t_y)
+
+        # right lane is white: right edge if p1 is on the right
+        # left lane is yellow: left edge if p2 is on the right
+        white_right = white & (p1x > p2x)
+        white_left = white & ~(p1x > p2x)
+        yellow_left = ~white & (p2x > p1x)
+        yellow_right = ~white & ~(p2x > p1x)
+
+        d_i = np.where(white_right, d_i - self.linewidth_white, d_i)
+        d_i = np.where(white_left | yellow_right, -d_i, d_i)
+        phi_i = np.where(white_left | yellow_left, -phi_i, phi_i)
+        d_i = np.where(yellow_left, d_i - self.linewidth_yellow, d_i)
+        d_i = np.where(white, d_i - self.lanewidth/2, self.lanewidth/2 - d_i)
+        return d_i, phi_i
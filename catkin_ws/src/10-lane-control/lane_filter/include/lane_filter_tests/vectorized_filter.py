@@ -0,0 +1,77 @@
+from comptests.registrar import comptest, run_module_tests
+from duckietown_msgs.msg import Segment  # @UnresolvedImport
+
+from lane_filter import LaneFilterHistogram, LaneFilterHistogramVectorized
+import numpy as np
+
+# same as the baseline configuration of lane_filter_node
+configuration = dict(
+    mean_d_0=0,
+    mean_phi_0=0,
+    sigma_d_0=0.1,
+    sigma_phi_0=0.1,
+    delta_d=0.02,
+    delta_phi=0.1,
+    d_max=0.3,
+    d_min=-0.15,
+    phi_min=-1.5,
+    phi_max=1.5,
+    cov_v=0.5,
+    linewidth_white=0.05,
+    linewidth_yellow=0.025,
+    lanewidth=0.23,
+    min_max=0.1,
+    sigma_d_mask=1.0,
+    sigma_phi_mask=2.0,
+)
+
+
+def random_segments(n):
+    """ Segments on the ground, some of them red or behind the robot. """
+    segments = []
+    for _ in range(n):
+        s = Segment()
+        s.color = np.random.choice([Segment.WHITE, Segment.WHITE, Segment.YELLOW, Segment.RED])
+        s.points[0].x = np.random.uniform(-0.05, 0.5)
+        s.points[0].y = np.random.uniform(-0.3, 0.3)
+        s.points[1].x = s.points[0].x + np.random.uniform(-0.05, 0.05)
+        s.points[1].y = s.points[0].y + np.random.uniform(-0.05, 0.05)
+        segments.append(s)
+    return segments
+
+
+def run_filter(f, inputs):
+    """ Runs predict() and update() for each (dt, v, w, segments). """
+    beliefs = []
+    for dt, v, w, segments in inputs:
+        f.predict(dt=dt, v=v, w=w)
+        f.update(segments)
+        beliefs.append(f.belief.copy())
+    return beliefs
+
+
+def random_inputs(nsteps, nsegments):
+    inputs = []
+    for _ in range(nsteps):
+        dt = np.random.uniform(0.02, 0.1)
+        v = np.random.uniform(0, 0.4)
+        w = np.random.uniform(-2, 2)
+        inputs.append((dt, v, w, random_segments(nsegments)))
+    return inputs
+
+
+@comptest
+def vectorized_filter_same_beliefs():
+    inputs = random_inputs(nsteps=30, nsegments=50)
+    # also some steps without valid segments, and standing still
+    inputs.append((0.05, 0.0, 0.0, []))
+    inputs.append((0.05, 0.0, 0.0, random_segments(1)))
+
+    expected = run_filter(LaneFilterHistogram(configuration), inputs)
+    obtained = run_filter(LaneFilterHistogramVectorized(configuration), inputs)
+    for a, b in zip(expected, obtained):
+        assert np.array_equal(a, b), np.max(np.abs(a - b))
+
+
+if __name__ == '__main__':
+    run_module_tests()
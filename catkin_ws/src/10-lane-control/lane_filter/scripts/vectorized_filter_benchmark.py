@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+"""
+    Benchmark of LaneFilterHistogramVectorized: prints the time of
+    predict() and update() with the loops of LaneFilterHistogram and
+    with the vectorized filter, for several numbers of segments.
+
+        $ rosrun lane_filter vectorized_filter_benchmark.py
+"""
+import time
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from lane_filter import LaneFilterHistogram, LaneFilterHistogramVectorized
+from lane_filter_tests.vectorized_filter import configuration, random_inputs, run_filter
+
+
+def main():
+    s = 'Time for predict() + update():\n'
+    s += ' %6s | %10s | %10s\n' % ('N', 'loops', 'vectorized')
+    for n in [10, 50, 100, 200, 500]:
+        inputs = random_inputs(nsteps=10, nsegments=n)
+        res = []
+        for F in [LaneFilterHistogram, LaneFilterHistogramVectorized]:
+            f = F(configuration)
+            t0 = time.time()
+            run_filter(f, inputs)
+            res.append(1000 * (time.time() - t0) / len(inputs))
+        s += ' %6d | %7.2f ms | %7.2f ms\n' % (n, res[0], res[1])
+    logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
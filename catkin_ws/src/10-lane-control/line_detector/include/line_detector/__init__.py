@@ -1,2 +1,4 @@
 from .line_detector1 import *
 from .line_detector2 import *
+from .line_detector_fused import *
+from .frame_buffers import *
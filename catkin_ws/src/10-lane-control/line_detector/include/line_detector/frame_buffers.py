@@ -0,0 +1,106 @@
+import cv2
+
+from duckietown_utils.jpg import image_cv_from_jpg
+import numpy as np
+
+__all__ = [
+    'FrameBuffers',
+    'ImagePreprocessor',
+]
+
+
+class FrameBuffers():
+    """
+        A pool of preallocated images, indexed by name.
+
+        get() returns the same array as long as the shape and the dtype
+        requested do not change, so that after the first frame the
+        processing does not allocate anything.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        # number of arrays allocated so far
+        self.nallocations = 0
+
+    def get(self, name, shape, dtype='uint8'):
+        shape = tuple(shape)
+        b = self.buffers.get(name, None)
+        if b is None or b.shape != shape or b.dtype != np.dtype(dtype):
+            b = np.empty(shape, dtype)
+            self.buffers[name] = b
+            self.nallocations += 1
+        return b
+
+
+class ImagePreprocessor():
+    """
+        The first part of the line detector pipeline: JPG decoding,
+        resizing, cropping and color correction.
+
+        If use_buffers is True, all the intermediate images are kept
+        in a FrameBuffers pool and every stage writes into them.
+        Otherwise, every stage allocates a new image, as it used to.
+
+        The only allocation that is left in the first mode is the one
+        of cv2.imdecode, whose Python binding does not accept an output
+        array.
+    """
+
+    def __init__(self, use_buffers):
+        self.use_buffers = use_buffers
+        self.buffers = FrameBuffers()
+
+    def process(self, jpg_data, image_size, top_cutoff, ai):
+        """
+            Returns the corrected uint8 BGR image of shape
+            (image_size[0] - top_cutoff, image_size[1], 3).
+
+            Raises ValueError if the image cannot be decoded.
+        """
+        image_cv = self.decode(jpg_data)
+        image_cv = self.resize_and_crop(image_cv, image_size, top_cutoff)
+        return self.correct(image_cv, ai)
+
+    def decode(self, jpg_data):
+        """ Raises ValueError if the image cannot be decoded. """
+        if not self.use_buffers:
+            return image_cv_from_jpg(jpg_data)
+
+        # frombuffer does not copy the data, unlike fromstring
+        s = np.frombuffer(jpg_data, np.uint8)
+        image_cv = cv2.imdecode(s, cv2.IMREAD_COLOR)
+        if image_cv is None:
+            msg = 'Could not decode image (cv2.imdecode returned None). '
+            msg += 'This is usual a sign of data corruption.'
+            raise ValueError(msg)
+        return image_cv
+
+    def resize_and_crop(self, image_cv, image_size, top_cutoff):
+        H, W = image_size[0], image_size[1]
+        hei_original, wid_original = image_cv.shape[0:2]
+        if H != hei_original or W != wid_original:
+            if self.use_buffers:
+                resized = self.buffers.get('resized', (H, W, 3))
+                cv2.resize(image_cv, (W, H), dst=resized,
+                           interpolation=cv2.INTER_NEAREST)
+            else:
+                resized = cv2.resize(image_cv, (W, H),
+                                     interpolation=cv2.INTER_NEAREST)
+            image_cv = resized
+        # this is a view, not a copy
+        return image_cv[top_cutoff:, :, :]
+
+    def correct(self, image_cv, ai):
+        """ 
+            Applies the AntiInstagram transform and converts back to uint8. 
+            
+            Both are done at once by the lookup table of
+            AntiInstagram.applyTransformLUT(), without the float image.
+        """
+        if not self.use_buffers:
+            return ai.applyTransformLUT(image_cv)
+
+        corr = self.buffers.get('corrected', image_cv.shape)
+        ai.applyTransformLUT(image_cv, out=corr)
+        return corr
@@ -11,6 +11,11 @@ import copy
 class LineDetectorHSV(Configurable, LineDetectorInterface):
     """ LineDetectorHSV """
 
+    # If True, setImage() writes into the images of the previous frame
+    # (when the size did not change) instead of allocating new ones.
+    # Set it only if nobody keeps references to bgr, hsv or edges.
+    reuse_buffers = False
+
     def __init__(self, configuration):
         # Images to be processed
         self.bgr = np.empty(0)
@@ -57,8 +62,8 @@ class LineDetectorHSV(Configurable, LineDetectorInterface):
 
         return bw, edge_color
 
-    def _findEdge(self, gray):
-        edges = cv2.Canny(gray, self.canny_thresholds[0], self.canny_thresholds[1], apertureSize = 3)
+    def _findEdge(self, gray, edges=None):
+        edges = cv2.Canny(gray, self.canny_thresholds[0], self.canny_thresholds[1], edges=edges, apertureSize = 3)
         return edges
 
     def _HoughLine(self, edge):
@@ -129,6 +134,12 @@ class LineDetectorHSV(Configurable, LineDetectorInterface):
         return Detections(lines=lines, normals=normals, area=bw, centers=centers)
 
     def setImage(self, bgr):
+        if self.reuse_buffers and self.bgr.shape == bgr.shape:
+            np.copyto(self.bgr, bgr)
+            cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV, dst=self.hsv)
+            self._findEdge(self.bgr, edges=self.edges)
+            return
+
         self.bgr = np.copy(bgr)
         self.hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
         self.edges = self._findEdge(self.bgr)
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+
+import cv2
+
+import numpy as np
+
+from .line_detector1 import LineDetectorHSV
+from .line_detector_interface import Detections
+
+__all__ = [
+    'LineDetectorHSVFused',
+]
+
+
+class LineDetectorHSVFused(LineDetectorHSV):
+    """
+        Same parameters and same output as LineDetectorHSV, but all the
+        colors are computed together.
+
+        Each pixel is classified into all the color classes with a single
+        pass over the HSV image: every channel goes through a 256-entry
+        lookup table whose bits say which HSV ranges contain that value,
+        and the AND of the three channels gives the set of ranges
+        containing the pixel (up to 8 ranges). The per-color masks are then
+        dilated together as one multi-channel image, and only HoughLinesP
+        is run per color.
+    """
+
+    # Which of the HSV ranges make up each color class
+    color_ranges = OrderedDict([
+        ('white', [('hsv_white1', 'hsv_white2')]),
+        ('yellow', [('hsv_yellow1', 'hsv_yellow2')]),
+        ('red', [('hsv_red1', 'hsv_red2'), ('hsv_red3', 'hsv_red4')]),
+    ])
+
+    def __init__(self, configuration):
+        LineDetectorHSV.__init__(self, configuration)
+
+        self.colors = list(self.color_ranges)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                        (self.dilation_kernel_size, self.dilation_kernel_size))
+        self.hsv_luts, self.class_luts = self._buildTables()
+
+        # results for the current image, computed on demand
+        self.detections = None
+
+    def _buildTables(self):
+        """
+            Returns the pair (hsv_luts, class_luts) of lists of
+            256-entry uint8 tables for cv2.LUT.
+
+            Bit k of hsv_luts[c][v] is set if the value v of channel c is
+            inside the k-th HSV range.
+
+            class_luts[i] maps the combination of bits to the 0/255 mask
+            value of the i-th color.
+        """
+        ranges = []
+        range2color = []
+        for i, color in enumerate(self.colors):
+            for lower, upper in self.color_ranges[color]:
+                ranges.append((getattr(self, lower), getattr(self, upper)))
+                range2color.append(i)
+
+        if len(ranges) > 8:
+            msg = 'Cannot fit %d HSV ranges in 8 bits.' % len(ranges)
+            raise ValueError(msg)
+
+        values = np.arange(256)
+        hsv_luts = [np.zeros(256, 'uint8') for _ in range(3)]
+        for k, (lower, upper) in enumerate(ranges):
+            for c in range(3):
+                # same semantics as cv2.inRange: bounds are inclusive
+                inside = (values >= lower[c]) & (values <= upper[c])
+                hsv_luts[c][inside] |= (1 << k)
+
+        class_luts = [np.zeros(256, 'uint8') for _ in self.colors]
+        for k, i in enumerate(range2color):
+            bit_set = (values & (1 << k)) > 0
+            class_luts[i][bit_set] = 255
+
+        return hsv_luts, class_luts
+
+    def _classify(self):
+        """ Returns a (H, W, ncolors) image with the color masks. """
+        h, s, v = cv2.split(self.hsv)
+        lut_h, lut_s, lut_v = self.hsv_luts
+        label = cv2.bitwise_and(cv2.LUT(h, lut_h), cv2.LUT(s, lut_s))
+        label = cv2.bitwise_and(label, cv2.LUT(v, lut_v))
+        return cv2.merge([cv2.LUT(label, lut) for lut in self.class_luts])
+
+    def _dilateAndRefine(self, masks):
+        """
+            Dilates all the masks at once and intersects them with
+            the edges. Returns the lists of the single-channel results.
+        """
+        bw = cv2.dilate(masks, self.kernel)
+        edges = cv2.merge([self.edges] * len(self.colors))
+        edge_colors = cv2.bitwise_and(bw, edges)
+        return cv2.split(bw), cv2.split(edge_colors)
+
+    def detectLinesAll(self, colors):
+        if self.detections is None:
+            self.detections = self._detectAll()
+        return OrderedDict((color, self.detections[color]) for color in colors)
+
+    def _detectAll(self):
+        masks = self._classify()
+        bws, edge_colors = self._dilateAndRefine(masks)
+
+        detections = {}
+        for color, bw, edge_color in zip(self.colors, bws, edge_colors):
+            lines = self._HoughLine(edge_color)
+            centers, normals = self._findNormal(bw, lines)
+            detections[color] = Detections(lines=lines, normals=normals,
+                                           area=bw, centers=centers)
+        return detections
+
+    def detectLines(self, color):
+        if not color in self.color_ranges:
+            raise Exception('Error: Undefined color strings...')
+        return self.detectLinesAll([color])[color]
+
+    def setImage(self, bgr):
+        LineDetectorHSV.setImage(self, bgr)
+        self.detections = None
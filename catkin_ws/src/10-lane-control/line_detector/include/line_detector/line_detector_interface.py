@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 
 FAMILY_LINE_DETECTOR = 'line_detector'
 
@@ -18,4 +18,13 @@ class LineDetectorInterface():
     def detectLines(self, color):
         """ Returns a tuple of class Detections """
 
+    def detectLinesAll(self, colors):
+        """ 
+            Returns an OrderedDict color -> Detections.
+
+            The default calls detectLines() once per color; implementations
+            can override it to share the work among the colors.
+        """
+        return OrderedDict((color, self.detectLines(color)) for color in colors)
+
 
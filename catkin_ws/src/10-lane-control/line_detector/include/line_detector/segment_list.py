@@ -0,0 +1,77 @@
+from duckietown_msgs.msg import Segment, SegmentList, Vector2D  # @UnresolvedImport
+from geometry_msgs.msg import Point  # @UnresolvedImport
+
+import numpy as np
+
+__all__ = [
+    'color2segment_color',
+    'normalize_lines',
+    'segment_list_from_arrays',
+    'segment_list_from_detections',
+]
+
+color2segment_color = {
+    'white': Segment.WHITE,
+    'yellow': Segment.YELLOW,
+    'red': Segment.RED,
+}
+
+
+def normalize_lines(lines, top_cutoff, image_size):
+    """
+        Converts the (N,4) array of lines x1,y1,x2,y2 in pixels of the
+        cropped image to normalized coordinates in the full image.
+    """
+    arr_cutoff = np.array((0, top_cutoff, 0, top_cutoff))
+    arr_ratio = np.array((1./image_size[1], 1./image_size[0],
+                          1./image_size[1], 1./image_size[0]))
+    return (lines + arr_cutoff) * arr_ratio
+
+
+def segment_list_from_arrays(lines_normalized, normals, colors):
+    """
+        Creates a SegmentList from the (N,4) array of normalized lines,
+        the (N,2) array of normals and the (N,) array of Segment colors.
+
+        All the arithmetic is done on the arrays; the only per-segment
+        work left is the construction of the messages.
+    """
+    segment_list = SegmentList()
+    n = len(lines_normalized)
+    if n == 0:
+        return segment_list
+
+    data = np.hstack((lines_normalized, normals)).tolist()
+    colors = np.broadcast_to(colors, (n,)).tolist()
+
+    # all fields are passed positionally: it is much faster than
+    # setting them one by one after construction
+    segment_list.segments = [
+        Segment(color,
+                [Vector2D(x1, y1), Vector2D(x2, y2)],
+                Vector2D(norm_x, norm_y),
+                [Point(), Point()])
+        for (x1, y1, x2, y2, norm_x, norm_y), color in zip(data, colors)]
+    return segment_list
+
+
+def segment_list_from_detections(detections, top_cutoff, image_size):
+    """
+        Creates a SegmentList from an OrderedDict color -> Detections,
+        like the one returned by LineDetectorInterface.detectLinesAll().
+    """
+    lines = []
+    normals = []
+    colors = []
+    for color, d in detections.items():
+        if len(d.lines) > 0:
+            lines.append(d.lines)
+            normals.append(d.normals)
+            colors.append(np.repeat(color2segment_color[color], len(d.lines)))
+
+    if not lines:
+        return SegmentList()
+
+    lines_normalized = normalize_lines(np.vstack(lines), top_cutoff, image_size)
+    return segment_list_from_arrays(lines_normalized, np.vstack(normals),
+                                    np.concatenate(colors))
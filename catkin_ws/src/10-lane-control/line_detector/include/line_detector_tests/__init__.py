@@ -0,0 +1,10 @@
+
+
+def jobs_comptests(context):  
+    
+    from . import fused_detector 
+    from . import buffer_pool 
+    from . import segment_list 
+    
+    from comptests.registrar import jobs_registrar_simple
+    jobs_registrar_simple(context)
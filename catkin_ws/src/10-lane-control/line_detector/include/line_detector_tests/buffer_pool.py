@@ -0,0 +1,51 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+import cv2
+
+from anti_instagram import AntiInstagram
+from duckietown_utils.jpg import jpg_from_image_cv
+from duckietown_utils.path_utils import get_ros_package_path
+from line_detector import ImagePreprocessor
+import numpy as np
+
+
+image_size = (120, 160)
+top_cutoff = 40
+
+
+def get_test_jpg():
+    """ The test frame, as it would arrive from the camera. """
+    fn = os.path.join(get_ros_package_path('anti_instagram'), 'tests', 'frame.jpg')
+    image_cv = cv2.imread(fn)
+    image_cv = cv2.resize(image_cv, (640, 480))
+    return jpg_from_image_cv(image_cv)
+
+
+def get_ai():
+    ai = AntiInstagram()
+    ai.scale = [1.1, 0.9, 1.05]
+    ai.shift = [-5.0, 3.0, 0.5]
+    return ai
+
+
+@comptest
+def buffer_pool_same_result():
+    jpg_data = get_test_jpg()
+    ai = get_ai()
+    expected = ImagePreprocessor(use_buffers=False).process(jpg_data, image_size, top_cutoff, ai)
+    pool = ImagePreprocessor(use_buffers=True)
+    for _ in range(3):
+        obtained = pool.process(jpg_data, image_size, top_cutoff, ai)
+        assert np.array_equal(expected, obtained)
+
+    # only the decoded images are allocated after the first frame:
+    # the pool does not grow and the output is always the same array
+    n = pool.buffers.nallocations
+    obtained2 = pool.process(jpg_data, image_size, top_cutoff, ai)
+    assert pool.buffers.nallocations == n
+    assert obtained2 is obtained
+
+
+if __name__ == '__main__':
+    run_module_tests()
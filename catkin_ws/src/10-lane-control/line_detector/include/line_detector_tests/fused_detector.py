@@ -0,0 +1,60 @@
+import os
+
+from comptests.registrar import comptest, run_module_tests
+import cv2
+
+from duckietown_utils.jpg import image_cv_from_jpg_fn
+from duckietown_utils.path_utils import get_ros_package_path
+from line_detector import LineDetectorHSV, LineDetectorHSVFused
+import numpy as np
+
+
+colors = ['white', 'yellow', 'red']
+
+configuration = dict(
+    dilation_kernel_size=3,
+    canny_thresholds=[80, 200],
+    hough_threshold=2,
+    hough_min_line_length=3,
+    hough_max_line_gap=1,
+    hsv_white1=[0, 0, 150],
+    hsv_white2=[180, 60, 255],
+    hsv_yellow1=[25, 140, 100],
+    hsv_yellow2=[45, 255, 255],
+    hsv_red1=[0, 140, 100],
+    hsv_red2=[15, 255, 255],
+    hsv_red3=[165, 140, 100],
+    hsv_red4=[180, 255, 255],
+)
+
+
+def get_test_image(shape=(120, 160), top_cutoff=40):
+    """ Returns the test frame, resized and cropped like the node does. """
+    fn = os.path.join(get_ros_package_path('anti_instagram'), 'tests', 'frame.jpg')
+    image_cv = image_cv_from_jpg_fn(fn)
+    image_cv = cv2.resize(image_cv, (shape[1], shape[0]),
+                          interpolation=cv2.INTER_NEAREST)
+    return image_cv[top_cutoff:, :, :]
+
+
+@comptest
+def fused_same_as_separate():
+    bgr = get_test_image()
+    separate = LineDetectorHSV(configuration)
+    fused = LineDetectorHSVFused(configuration)
+
+    separate.setImage(bgr)
+    fused.setImage(bgr)
+    all_detections = fused.detectLinesAll(colors)
+    assert list(all_detections) == colors
+
+    for color in colors:
+        expected = separate.detectLines(color)
+        for obtained in [all_detections[color], fused.detectLines(color)]:
+            assert np.array_equal(expected.area, obtained.area), color
+            assert np.array_equal(expected.lines, obtained.lines), color
+            assert np.allclose(expected.normals, obtained.normals), color
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,52 @@
+from comptests.registrar import comptest, run_module_tests
+from duckietown_msgs.msg import Segment, SegmentList  # @UnresolvedImport
+
+from line_detector.segment_list import normalize_lines, segment_list_from_arrays
+import numpy as np
+
+
+def segment_list_loop(lines, normals, color, top_cutoff, image_size):
+    """ The way the node used to do it, one segment at a time. """
+    segment_list = SegmentList()
+    lines_normalized = normalize_lines(lines, top_cutoff, image_size)
+    for x1, y1, x2, y2, norm_x, norm_y in np.hstack((lines_normalized, normals)):
+        segment = Segment()
+        segment.color = color
+        segment.pixels_normalized[0].x = x1
+        segment.pixels_normalized[0].y = y1
+        segment.pixels_normalized[1].x = x2
+        segment.pixels_normalized[1].y = y2
+        segment.normal.x = norm_x
+        segment.normal.y = norm_y
+        segment_list.segments.append(segment)
+    return segment_list
+
+
+def segment_list_bulk(lines, normals, color, top_cutoff, image_size):
+    lines_normalized = normalize_lines(lines, top_cutoff, image_size)
+    return segment_list_from_arrays(lines_normalized, normals, color)
+
+
+def random_detections(n, image_size=(120, 160), top_cutoff=40):
+    H = image_size[0] - top_cutoff
+    W = image_size[1]
+    lines = np.random.randint(0, min(H, W), size=(n, 4)).astype('int32')
+    normals = np.random.randn(n, 2)
+    normals /= np.sqrt(np.sum(normals ** 2, axis=1, keepdims=True))
+    return lines, normals
+
+
+@comptest
+def segment_list_same_as_loop():
+    image_size = (120, 160)
+    top_cutoff = 40
+    lines, normals = random_detections(50, image_size, top_cutoff)
+    expected = segment_list_loop(lines, normals, Segment.YELLOW, top_cutoff, image_size)
+    obtained = segment_list_bulk(lines, normals, Segment.YELLOW, top_cutoff, image_size)
+    assert len(expected.segments) == len(obtained.segments)
+    for a, b in zip(expected.segments, obtained.segments):
+        assert a == b, (a, b)
+
+
+if __name__ == '__main__':
+    run_module_tests()
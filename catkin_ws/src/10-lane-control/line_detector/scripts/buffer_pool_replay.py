@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+    Benchmark of the buffer pool of the line detector: processes the
+    test frame at 30 fps, as the node would, with and without the pool,
+    and prints the latencies and the number of buffers allocated by the
+    pool after the first frame and at the end.
+
+        $ rosrun line_detector buffer_pool_replay.py
+"""
+import time
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from line_detector import ImagePreprocessor, LineDetectorHSV
+from line_detector_tests.buffer_pool import get_ai, get_test_jpg, image_size, top_cutoff
+from line_detector_tests.fused_detector import configuration
+import numpy as np
+
+
+def replay(use_buffers, jpg_data, nframes, fps):
+    """
+        Processes the same frame nframes times at the given rate, as the
+        node would do. Returns the list of latencies in seconds and the
+        number of pool allocations after the first frame and at the end.
+    """
+    ai = get_ai()
+    preprocessor = ImagePreprocessor(use_buffers=use_buffers)
+    detector = LineDetectorHSV(configuration)
+    detector.reuse_buffers = use_buffers
+
+    latencies = []
+    nallocations_first = None
+    period = 1.0 / fps
+    t_next = time.time()
+    for _ in range(nframes):
+        # wait for the next frame to "arrive"
+        delay = t_next - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        t_next += period
+
+        t0 = time.time()
+        image_cv_corr = preprocessor.process(jpg_data, image_size, top_cutoff, ai)
+        detector.setImage(image_cv_corr)
+        latencies.append(time.time() - t0)
+        if nallocations_first is None:
+            nallocations_first = preprocessor.buffers.nallocations
+
+    nallocations_end = preprocessor.buffers.nallocations
+    return latencies, nallocations_first, nallocations_end
+
+
+def main():
+    jpg_data = get_test_jpg()
+    nframes = 300
+    fps = 30.0
+
+    s = 'Replay of %d frames at %.0f fps:\n' % (nframes, fps)
+    for use_buffers in [False, True]:
+        latencies, nallocations_first, nallocations_end = \
+            replay(use_buffers, jpg_data, nframes, fps)
+        latencies_ms = 1000 * np.array(latencies)
+        s += (' buffer_pool = %5s: p50 %6.3f ms | p99 %6.3f ms | max %6.3f ms'
+              ' | pool allocations: %d after the first frame, %d at the end\n' %
+              (use_buffers, np.percentile(latencies_ms, 50), np.percentile(latencies_ms, 99),
+               np.max(latencies_ms), nallocations_first, nallocations_end))
+    logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
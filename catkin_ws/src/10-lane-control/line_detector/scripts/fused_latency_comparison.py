@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+    Benchmark of LineDetectorHSVFused: prints the latency of each phase
+    of the detection of the three colors, with the three separate calls
+    of LineDetectorHSV and with the fused detector, for several image
+    sizes.
+
+        $ rosrun line_detector fused_latency_comparison.py
+"""
+from collections import OrderedDict
+import time
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from line_detector import LineDetectorHSV, LineDetectorHSVFused
+from line_detector_tests.fused_detector import colors, configuration, get_test_image
+
+
+def time_phases(phases, n):
+    """
+        Runs the list of (name, function) n times, in order,
+        and returns an OrderedDict name -> average ms.
+    """
+    res = OrderedDict((name, 0.0) for name, _ in phases)
+    for _ in range(n):
+        for name, f in phases:
+            t0 = time.time()
+            f()
+            res[name] += time.time() - t0
+    for name in res:
+        res[name] = 1000.0 * res[name] / n
+    return res
+
+
+def separate_phases(detector):
+    """ The phases of the three-call path (LineDetectorHSV.detectLines). """
+    state = {}
+
+    def color_filter():
+        for color in colors:
+            state[color] = detector._colorFilter(color)
+
+    def hough():
+        for color in colors:
+            bw, edge_color = state[color]
+            state[color] = bw, detector._HoughLine(edge_color)
+
+    def normals():
+        for color in colors:
+            bw, lines = state[color]
+            detector._findNormal(bw, lines)
+
+    return [('color filter', color_filter),
+            ('hough', hough),
+            ('normals', normals)]
+
+
+def fused_phases(detector):
+    """ The phases of LineDetectorHSVFused.detectLinesAll. """
+    state = {}
+
+    def color_filter():
+        masks = detector._classify()
+        state['bws'], state['edge_colors'] = detector._dilateAndRefine(masks)
+
+    def hough():
+        state['lines'] = [detector._HoughLine(e) for e in state['edge_colors']]
+
+    def normals():
+        for bw, lines in zip(state['bws'], state['lines']):
+            detector._findNormal(bw, lines)
+
+    return [('color filter', color_filter),
+            ('hough', hough),
+            ('normals', normals)]
+
+
+def main():
+    n = 200
+    for shape in [(120, 160), (240, 320), (480, 640)]:
+        bgr = get_test_image(shape, top_cutoff=int(shape[0] / 3))
+
+        separate = LineDetectorHSV(configuration)
+        separate.setImage(bgr)
+        fused = LineDetectorHSVFused(configuration)
+        fused.setImage(bgr)
+
+        t_separate = time_phases(separate_phases(separate), n)
+        t_fused = time_phases(fused_phases(fused), n)
+
+        s = 'Latency per frame for shape %s:\n' % str(shape)
+        s += ' %15s | %10s | %10s\n' % ('phase', 'separate', 'fused')
+        for phase in t_separate:
+            s += ' %15s | %7.2f ms | %7.2f ms\n' % (phase, t_separate[phase],
+                                                  t_fused[phase])
+        s += ' %15s | %7.2f ms | %7.2f ms\n' % ('total', sum(t_separate.values()),
+                                              sum(t_fused.values()))
+        logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""
+    Benchmark of segment_list_from_arrays(): prints the time to build
+    a SegmentList one segment at a time, as the node used to do, and
+    in bulk, for several numbers of segments.
+
+        $ rosrun line_detector segment_list_benchmark.py
+"""
+import time
+
+from duckietown_msgs.msg import Segment  # @UnresolvedImport
+
+from duckietown_utils import logger
+from duckietown_utils.wrap_main import wrap_main
+from line_detector_tests.segment_list import (random_detections, segment_list_bulk,
+                                              segment_list_loop)
+
+
+def main():
+    image_size = (120, 160)
+    top_cutoff = 40
+    s = 'Time to build a SegmentList:\n'
+    s += ' %6s | %10s | %10s\n' % ('N', 'loop', 'bulk')
+    for n in [10, 50, 100, 200, 500, 1000, 2000]:
+        lines, normals = random_detections(n, image_size, top_cutoff)
+        res = []
+        for f in [segment_list_loop, segment_list_bulk]:
+            repeat = 20
+            t0 = time.time()
+            for _ in range(repeat):
+                f(lines, normals, Segment.WHITE, top_cutoff, image_size)
+            res.append(1000 * (time.time() - t0) / repeat)
+        s += ' %6d | %7.2f ms | %7.2f ms\n' % (n, res[0], res[1])
+    logger.info(s)
+
+
+if __name__ == '__main__':
+    wrap_main(main)
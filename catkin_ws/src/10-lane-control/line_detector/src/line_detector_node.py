@@ -4,17 +4,19 @@ from cv_bridge import CvBridge, CvBridgeError
 from duckietown_msgs.msg import (AntiInstagramTransform, BoolStamped, Segment,
     SegmentList, Vector2D)
 from duckietown_utils.instantiate_utils import instantiate
-from duckietown_utils.jpg import image_cv_from_jpg
+from duckietown_utils.worker_pool import OVERFLOW_LATEST_ONLY, WorkerPool
 from geometry_msgs.msg import Point
 from sensor_msgs.msg import CompressedImage, Image
 from visualization_msgs.msg import Marker
 
+from line_detector.frame_buffers import ImagePreprocessor
 from line_detector.timekeeper import TimeKeeper
 import cv2
 import rospy
 import threading
 import time
 from line_detector.line_detector_plot import color_segment, drawLines
+from line_detector.segment_list import segment_list_from_detections
 import numpy as np
 
 
@@ -39,6 +41,24 @@ class LineDetectorNode(object):
         # color correction
         self.ai = AntiInstagram()
 
+        # If true, the intermediate images are allocated once and reused
+        self.buffer_pool = rospy.get_param('~buffer_pool', False)
+        self.preprocessor = ImagePreprocessor(use_buffers=self.buffer_pool)
+
+        # 'threaded': a new thread for every image, dropped if busy;
+        # 'pool': one worker thread with a bounded queue.
+        # (The detector is not thread-safe, so there is only one worker.)
+        self.process = rospy.get_param('~process', 'threaded')
+        if self.process == 'pool':
+            self.pool = WorkerPool(name='image', nworkers=1,
+                                   queue_size=rospy.get_param('~pool_backlog', 1),
+                                   overflow=rospy.get_param('~pool_overflow', OVERFLOW_LATEST_ONLY),
+                                   on_drop=lambda _job: self.stats.skipped())
+        elif self.process == 'threaded':
+            self.pool = None
+        else:
+            raise ValueError('Invalid value for ~process: %r' % self.process)
+
         # these will be added if it becomes verbose
         self.pub_edge = None
         self.pub_colorSegment = None
@@ -79,6 +99,8 @@ class LineDetectorNode(object):
             self.loginfo('new detector config: %s' % str(c))
 
             self.detector = instantiate(c[0], c[1])
+            if self.buffer_pool:
+                self.detector.reuse_buffers = True
 #             self.detector_config = c
 
         if self.verbose and self.pub_edge is None:
@@ -94,6 +116,11 @@ class LineDetectorNode(object):
 
         if not self.active:
             return 
+
+        if self.pool is not None:
+            self.pool.submit(lambda: self.processImagePool(image_msg))
+            return
+
         # Start a daemon thread to process the image
         thread = threading.Thread(target=self.processImage,args=(image_msg,))
         thread.setDaemon(True)
@@ -129,12 +156,18 @@ class LineDetectorNode(object):
             # Release the thread lock
             self.thread_lock.release()
 
+    def processImagePool(self, image_msg):
+        with self.thread_lock:
+            self.processImage_(image_msg)
+
     def processImage_(self, image_msg):
 
         self.stats.processed()
 
         if self.intermittent_log_now():
             self.intermittent_log(self.stats.info())
+            if self.pool is not None:
+                self.intermittent_log(self.pool.get_stats())
             self.stats.reset()
 
         tk = TimeKeeper(image_msg)
@@ -143,7 +176,7 @@ class LineDetectorNode(object):
 
         # Decode from compressed image with OpenCV
         try:
-            image_cv = image_cv_from_jpg(image_msg.data)
+            image_cv = self.preprocessor.decode(image_msg.data)
         except ValueError as e:
             self.loginfo('Could not decode image: %s' % e)
             return
@@ -151,19 +184,13 @@ class LineDetectorNode(object):
         tk.completed('decoded')
 
         # Resize and crop image
-        hei_original, wid_original = image_cv.shape[0:2]
-
-        if self.image_size[0] != hei_original or self.image_size[1] != wid_original:
-            # image_cv = cv2.GaussianBlur(image_cv, (5,5), 2)
-            image_cv = cv2.resize(image_cv, (self.image_size[1], self.image_size[0]),
-                                   interpolation=cv2.INTER_NEAREST)
-        image_cv = image_cv[self.top_cutoff:,:,:]
+        # image_cv = cv2.GaussianBlur(image_cv, (5,5), 2)
+        image_cv = self.preprocessor.resize_and_crop(image_cv, self.image_size, self.top_cutoff)
 
         tk.completed('resized')
 
         # apply color correction: AntiInstagram
-        image_cv_corr = self.ai.applyTransform(image_cv)
-        image_cv_corr = cv2.convertScaleAbs(image_cv_corr)
+        image_cv_corr = self.preprocessor.correct(image_cv, self.ai)
 
         tk.completed('corrected')
 
@@ -172,29 +199,17 @@ class LineDetectorNode(object):
 
         # Detect lines and normals
 
-        white = self.detector.detectLines('white')
-        yellow = self.detector.detectLines('yellow')
-        red = self.detector.detectLines('red')
+        detections = self.detector.detectLinesAll(['white', 'yellow', 'red'])
+        white = detections['white']
+        yellow = detections['yellow']
+        red = detections['red']
 
         tk.completed('detected')
      
-        # SegmentList constructor
-        segmentList = SegmentList()
+        # Convert to normalized pixel coordinates, and build the segmentList
+        segmentList = segment_list_from_detections(detections, self.top_cutoff, self.image_size)
         segmentList.header.stamp = image_msg.header.stamp
         
-        # Convert to normalized pixel coordinates, and add segments to segmentList
-        arr_cutoff = np.array((0, self.top_cutoff, 0, self.top_cutoff))
-        arr_ratio = np.array((1./self.image_size[1], 1./self.image_size[0], 1./self.image_size[1], 1./self.image_size[0]))
-        if len(white.lines) > 0:
-            lines_normalized_white = ((white.lines + arr_cutoff) * arr_ratio)
-            segmentList.segments.extend(self.toSegmentMsg(lines_normalized_white, white.normals, Segment.WHITE))
-        if len(yellow.lines) > 0:
-            lines_normalized_yellow = ((yellow.lines + arr_cutoff) * arr_ratio)
-            segmentList.segments.extend(self.toSegmentMsg(lines_normalized_yellow, yellow.normals, Segment.YELLOW))
-        if len(red.lines) > 0:
-            lines_normalized_red = ((red.lines + arr_cutoff) * arr_ratio)
-            segmentList.segments.extend(self.toSegmentMsg(lines_normalized_red, red.normals, Segment.RED))
-        
         self.intermittent_log('# segments: white %3d yellow %3d red %3d' % (len(white.lines),
                 len(yellow.lines), len(red.lines)))
         
@@ -238,22 +253,6 @@ class LineDetectorNode(object):
 
     def onShutdown(self):
         self.loginfo("Shutdown.")
-            
-    def toSegmentMsg(self,  lines, normals, color):
-        
-        segmentMsgList = []
-        for x1,y1,x2,y2,norm_x,norm_y in np.hstack((lines,normals)):
-            segment = Segment()
-            segment.color = color
-            segment.pixels_normalized[0].x = x1
-            segment.pixels_normalized[0].y = y1
-            segment.pixels_normalized[1].x = x2
-            segment.pixels_normalized[1].y = y2
-            segment.normal.x = norm_x
-            segment.normal.y = norm_y
-             
-            segmentMsgList.append(segment)
-        return segmentMsgList
 
 class Stats():
     def __init__(self):
@@ -72,8 +72,8 @@ class LineDetectorNode2(EasyNode):
 
         with context.phase('correcting'):
             # apply color correction: AntiInstagram
-            image_cv_corr = self.ai.applyTransform(image_cv)
-            image_cv_corr = cv2.convertScaleAbs(image_cv_corr)
+            # same as applyTransform() followed by cv2.convertScaleAbs()
+            image_cv_corr = self.ai.applyTransformLUT(image_cv)
  
         with context.phase('detection'):
             # Set the image to be detected
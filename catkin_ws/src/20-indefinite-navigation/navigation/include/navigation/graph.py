@@ -36,6 +36,10 @@ class Graph(object):
     def __contains__(self, node):
         return node in self._nodes
 
+    def nodes(self):
+        """Returns the nodes, sorted."""
+        return sorted(self._nodes)
+
     def add_node(self, node):
         """Adds a node to the graph."""
         self._nodes.add(node)
@@ -73,6 +77,18 @@ class Graph(object):
         return self._edges.get(node, set())        
 
     def draw(self, script_dir, highlight_edges=None, show_weights=None, map_name = 'duckietown', highlight_nodes = None):
+        g = self._create_digraph(highlight_edges, show_weights, highlight_nodes)
+        #script_dir = os.path.dirname(__file__)
+        map_path = script_dir + '/maps/'
+        g.format = 'png'
+        g.render(filename=map_name, directory=map_path, view=False, cleanup=True)
+
+    def layout(self, show_weights=None):
+        """Returns the layout of the drawing without highlights, in the graphviz "plain" format."""
+        g = self._create_digraph(None, show_weights, None)
+        return g.pipe(format='plain')
+
+    def _create_digraph(self, highlight_edges, show_weights, highlight_nodes):
         if highlight_nodes:        
             start_node = highlight_nodes[0]
             target_node = highlight_nodes[1]        
@@ -113,10 +129,6 @@ class Graph(object):
                     p = '1.5'
                     
                 g.edge(self.node_label_fn(src_node), self.node_label_fn(e.target), taillabel=t , color = c, penwidth = p)
-        
-        #script_dir = os.path.dirname(__file__)
-        map_path = script_dir + '/maps/'
-        g.format = 'png'
-        g.render(filename=map_name, directory=map_path, view=False, cleanup=True)
+        return g
         
       
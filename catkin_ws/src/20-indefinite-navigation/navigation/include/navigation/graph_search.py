@@ -25,26 +25,40 @@ class GraphSearchProblem(object):
 
 	def best_first_search(self, f):
 		"""Returns a solution path."""
-		q = PriorityQueue(f=f)
+		q = HeapPriorityQueue(f=f)
 		q.append(SearchNode(self.start))
-		expanded = set([self.start])
+		expanded = set()
 		while q:
 			search_node = q.pop()
 			if self.test_goal(search_node.state):
 				return Path(search_node)
-			expanded.add(search_node)
+			expanded.add(search_node.state)
 			for child in self.expand_node(search_node):
-				if (child not in q) and (child not in expanded):
-				    q.append(child)
-				elif child in q:
-				    #look for a node in q with the same state as child, but different parent and cost.
-				    previous_search_node = q[child]
-				    if child.cost < previous_search_node.cost:
-				        del q[previous_search_node]
-				        q.append(child)
+				if child.state in expanded:
+					continue
+				#look for a node in q with the same state as child, but different parent and cost.
+				previous_search_node = q[child]
+				if previous_search_node is None or child.cost < previous_search_node.cost:
+					q.append(child)
 		# If we get to here, no solution has been found.
 		return None
 
+	def shortest_path_tree(self):
+		"""Returns a dict state -> SearchNode, with the shortest path from start to each reachable state."""
+		q = HeapPriorityQueue(f=lambda search_node: search_node.cost)
+		q.append(SearchNode(self.start))
+		tree = dict()
+		while q:
+			search_node = q.pop()
+			tree[search_node.state] = search_node
+			for child in self.expand_node(search_node):
+				if child.state in tree:
+					continue
+				previous_search_node = q[child]
+				if previous_search_node is None or child.cost < previous_search_node.cost:
+					q.append(child)
+		return tree
+
 	def eucl_dist(self,a, b):
 		"""Returns the euclidean distance between a and b."""
 		return np.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2)
@@ -0,0 +1,150 @@
+import shlex
+import threading
+
+import cv2
+import numpy as np
+
+# graphviz leaves this margin around the drawing (pad = 4 points)
+PAD_INCHES = 4.0 / 72
+
+# Colors (BGR) of the highlights as they appear in the published image,
+# where the graphviz render is inverted.
+PATH_COLOR = (0, 0, 255)
+START_COLOR = (255, 255, 0)
+TARGET_COLOR = (0, 255, 0)
+
+
+def parse_plain(text):
+    """Parses the graphviz "plain" output. Returns (width, height), a dict
+    node -> (x, y, width, height) and a dict (tail, head) -> control points
+    of the edge, in inches with the origin at the bottom left."""
+    size = None
+    nodes = dict()
+    edges = dict()
+    for line in text.splitlines():
+        tokens = shlex.split(line)
+        if not tokens:
+            continue
+        if tokens[0] == 'graph':
+            size = (float(tokens[2]), float(tokens[3]))
+        elif tokens[0] == 'node':
+            nodes[tokens[1]] = tuple(float(_) for _ in tokens[2:6])
+        elif tokens[0] == 'edge':
+            n = int(tokens[3])
+            xy = [float(_) for _ in tokens[4:4 + 2 * n]]
+            edges[(tokens[1], tokens[2])] = zip(xy[0::2], xy[1::2])
+    return size, nodes, edges
+
+
+def prep_map_image(cv_image, map_img):
+    """Makes the published image from the graphviz render: the first 955
+    rows of the inverted render, blended with the picture of the map and
+    scaled by 0.9."""
+    map_crop = map_img[16:556, 29:408, :]
+    map_resize = cv2.resize(map_crop, (cv_image.shape[1], 955), interpolation=cv2.INTER_AREA)
+    cv_image = cv_image[0:955, :, :]
+    cv_image = 255 - cv_image
+    overlay = cv2.addWeighted(cv_image, 0.65, map_resize, 0.35, 0)
+    overlay = cv2.resize(overlay, (0, 0), fx=0.9, fy=0.9, interpolation=cv2.INTER_AREA)
+    # brighter, saturating at 255 (overlay *= 1.4 fails on uint8 images)
+    return cv2.convertScaleAbs(overlay, alpha=1.4)
+
+
+def bezier_points(control_points, samples=8):
+    """Samples the spline given by 3k+1 control points (k cubic Bezier curves)."""
+    points = [control_points[0]]
+    t = np.linspace(0, 1, samples + 1)[1:, np.newaxis]
+    for i in range(0, len(control_points) - 3, 3):
+        p0, p1, p2, p3 = [np.array(_) for _ in control_points[i:i + 4]]
+        curve = ((1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1 +
+                 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3)
+        points.extend(map(tuple, curve))
+    return points
+
+
+class CachedMapRenderer(object):
+    """Renders the map with graphviz only once. The path of a request is
+    drawn over a copy of the cached image, using the layout computed by
+    graphviz for the same drawing.
+
+    prep_image is the function that makes the published image from the
+    graphviz render; it must only crop rows at the bottom and scale."""
+
+    def __init__(self, graph, script_dir, map_name, prep_image):
+        self.graph = graph
+        graph.draw(script_dir, highlight_edges=None, map_name=map_name)
+        cv_image = cv2.imread(script_dir + '/maps/' + map_name + '.png', cv2.IMREAD_COLOR)
+        self.base_image = prep_image(cv_image)
+
+        (width, height), self.nodes, self.edges = parse_plain(graph.layout())
+        rows, cols = cv_image.shape[:2]
+        # from inches to pixels of the render, then to pixels of the published image
+        scale = float(self.base_image.shape[1]) / cols
+        self.sx = scale * cols / (width + 2 * PAD_INCHES)
+        self.sy = scale * rows / (height + 2 * PAD_INCHES)
+        self.height = height
+
+    def to_pixels(self, points):
+        return np.array([[(x + PAD_INCHES) * self.sx, (self.height - y + PAD_INCHES) * self.sy]
+                         for x, y in points], dtype='int32')
+
+    def render(self, path=None, source=None, target=None):
+        """Returns the cached image, with the path and its end nodes highlighted."""
+        image = self.base_image.copy()
+        label = self.graph.node_label_fn
+        if path is not None:
+            for a, b in path.edges():
+                key = (label(a), label(b))
+                if key in self.edges:
+                    points = self.to_pixels(bezier_points(self.edges[key]))
+                    cv2.polylines(image, [points], False, PATH_COLOR, 3)
+        for node, color in [(source, START_COLOR), (target, TARGET_COLOR)]:
+            if node is None or not label(node) in self.nodes:
+                continue
+            x, y, w, _ = self.nodes[label(node)]
+            center = tuple(self.to_pixels([(x, y)])[0])
+            radius = max(int(w / 2 * self.sx), 5)
+            cv2.circle(image, center, radius, color, 3)
+        return image
+
+
+class LatestRequestWorker(object):
+    """Calls f(*request) in a thread for the requests given to put().
+    The requests that arrive while f is running replace each other: only
+    the latest one is processed next. If f raises an exception, it is
+    given to on_error."""
+
+    def __init__(self, f, on_error):
+        self.f = f
+        self.on_error = on_error
+        self.condition = threading.Condition()
+        self.request = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self._loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, *request):
+        with self.condition:
+            self.request = request
+            self.condition.notify()
+
+    def stop(self):
+        """Waits for the request being processed; the pending one is dropped."""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _loop(self):
+        while True:
+            with self.condition:
+                while self.request is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                request, self.request = self.request, None
+            try:
+                self.f(*request)
+            except Exception as e:
+                self.on_error(e)
@@ -0,0 +1,35 @@
+from search_classes import Path
+from graph_search import GraphSearchProblem
+
+
+class RoutingTable(object):
+	"""Shortest paths between all the pairs of nodes of a graph that does not change.
+
+	For each source node, the shortest path tree is computed once (Dijkstra);
+	a query is then a lookup, plus following the parents to build the Path.
+	The paths have the same cost as the ones found by A*."""
+
+	def __init__(self, graph):
+		self.graph = graph
+		# source -> (target -> SearchNode)
+		self.trees = dict()
+		problem = GraphSearchProblem(graph, None, None)
+		for source in graph.nodes():
+			problem.start = source
+			self.trees[source] = problem.shortest_path_tree()
+
+	def get_path(self, source, target):
+		"""Returns the Path from source to target, or None if there is none."""
+		search_node = self.trees.get(source, {}).get(target)
+		if search_node is None:
+			return None
+		return Path(search_node)
+
+	def next_hop(self, source, target):
+		"""Returns the (node, action) that follows source on the way to target, or None."""
+		search_node = self.trees.get(source, {}).get(target)
+		if search_node is None or search_node.parent is None:
+			return None
+		while search_node.parent.parent is not None:
+			search_node = search_node.parent
+		return search_node.state, search_node.action
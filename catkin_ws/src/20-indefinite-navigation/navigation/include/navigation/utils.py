@@ -18,6 +18,8 @@ http://www.norvig.com/license.html
 """
 
 import bisect
+import heapq
+import itertools
 
 
 def test_ok():
@@ -103,3 +105,41 @@ class PriorityQueue(Queue):
                 self.A.pop(i)
                 return
 
+class HeapPriorityQueue(Queue):
+    """Same as PriorityQueue (order=min), but append and pop are O(log n) and
+    membership, lookup and delete are O(1): the items are kept in a binary
+    heap, and a dict maps each item to its entry in the heap. A deleted item
+    stays in the heap, marked as removed, until it reaches the top."""
+    REMOVED = object()
+
+    def __init__(self, f=lambda x: x):
+        self.f = f
+        self.heap = []
+        self.entries = {}
+        # ties are broken by insertion order, as with bisect.insort
+        self.counter = itertools.count()
+    def append(self, item):
+        if item in self.entries:
+            del self[item]
+        entry = [self.f(item), next(self.counter), item]
+        self.entries[item] = entry
+        heapq.heappush(self.heap, entry)
+    def __len__(self):
+        return len(self.entries)
+    def pop(self):
+        while self.heap:
+            _, _, item = heapq.heappop(self.heap)
+            if item is not self.REMOVED:
+                del self.entries[item]
+                return item
+        raise IndexError('pop from an empty priority queue')
+    def __contains__(self, item):
+        return item in self.entries
+    def __getitem__(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry[2]
+    def __delitem__(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[2] = self.REMOVED
@@ -0,0 +1,10 @@
+
+
+def jobs_comptests(context):  
+    
+    from . import map_rendering_test 
+    from . import priority_queue_test 
+    from . import routing_test 
+    
+    from comptests.registrar import jobs_registrar_simple
+    jobs_registrar_simple(context)
@@ -0,0 +1,213 @@
+from distutils.spawn import find_executable
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from comptests.registrar import comptest, run_module_tests
+import cv2
+import numpy as np
+
+from navigation.graph import Graph
+from navigation.map_rendering import (CachedMapRenderer, LatestRequestWorker, PAD_INCHES,
+                                      PATH_COLOR, bezier_points, parse_plain, prep_map_image)
+from navigation.search_classes import Path, SearchNode
+
+
+# "plain" output of graphviz for a graph 5.5 x 14 inches, with two nodes
+# and a spline of 4 control points from (1, 13) to (4, 1)
+plain = """graph 1 5.5 14
+node "1" 1 13 0.3 0.3 1 solid circle black lightgrey
+node 2 4 1 0.3 0.3 2 solid circle black lightgrey
+edge 1 2 4 1 13 2 9 3 5 4 1 solid black
+stop
+"""
+
+# graphviz renders at 72 dpi, with the pad around the drawing
+DPI = 72
+
+
+class PlainGraph(Graph):
+    """ A Graph with the render and the layout that graphviz would give for plain. """
+
+    def draw(self, script_dir, highlight_edges=None, show_weights=None,
+             map_name='duckietown', highlight_nodes=None):
+        rows = int(round((14 + 2 * PAD_INCHES) * DPI))
+        cols = int(round((5.5 + 2 * PAD_INCHES) * DPI))
+        render = np.zeros((rows, cols, 3), 'uint8')
+        cv2.imwrite(os.path.join(script_dir, 'maps', map_name + '.png'), render)
+
+    def layout(self):
+        return plain
+
+
+@comptest
+def map_rendering_parse_plain():
+    text = plain + 'node "a b" 2 3 0.5 0.25 "a b" solid circle black lightgrey\n'
+    text += 'edge "a b" 2 4 2 3 2.5 2.5 3 2 4 1 solid black\n'
+    size, nodes, edges = parse_plain(text)
+    assert size == (5.5, 14)
+    # the quotes are removed
+    assert sorted(nodes) == ['1', '2', 'a b']
+    assert nodes['1'] == (1, 13, 0.3, 0.3)
+    assert nodes['a b'] == (2, 3, 0.5, 0.25)
+    assert edges[('1', '2')] == [(1, 13), (2, 9), (3, 5), (4, 1)]
+    assert edges[('a b', '2')] == [(2, 3), (2.5, 2.5), (3, 2), (4, 1)]
+
+
+@comptest
+def map_rendering_bezier_points():
+    # 3k + 1 control points: k = 2 cubic curves
+    control_points = [(0, 0), (1, 2), (2, 2), (3, 0), (4, -2), (5, -2), (6, 0)]
+    points = bezier_points(control_points, samples=8)
+    assert len(points) == 1 + 2 * 8
+    assert np.allclose(points[0], control_points[0])
+    assert np.allclose(points[-1], control_points[-1])
+    # the curves join at the 4th control point
+    assert np.allclose(points[8], control_points[3])
+    # a straight segment stays straight
+    line = bezier_points([(0, 0), (1, 1), (2, 2), (3, 3)], samples=3)
+    assert np.allclose(line, [(0, 0), (1, 1), (2, 2), (3, 3)])
+
+
+def get_renderer(script_dir):
+    os.mkdir(os.path.join(script_dir, 'maps'))
+    map_img = np.full((600, 450, 3), 100, 'uint8')
+    graph = PlainGraph()
+    graph.add_edge('1', '2')
+    graph.set_node_positions({'1': (1, 13), '2': (4, 1)})
+    return CachedMapRenderer(graph, script_dir, 'test', lambda _: prep_map_image(_, map_img))
+
+
+@comptest
+def map_rendering_to_pixels():
+    script_dir = tempfile.mkdtemp()
+    try:
+        renderer = get_renderer(script_dir)
+    finally:
+        shutil.rmtree(script_dir)
+    # the published image is the first 955 rows of the render, scaled by 0.9
+    cols = int(round((5.5 + 2 * PAD_INCHES) * DPI))
+    assert renderer.base_image.shape[:2] == (int(round(955 * 0.9)), int(round(cols * 0.9)))
+
+    def expected(x, y):
+        # the pad on each side, and y from the top
+        return (x + PAD_INCHES) * DPI * 0.9, (14 - y + PAD_INCHES) * DPI * 0.9
+
+    points = [(0, 14), (1, 13), (4, 1), (5.5, 3)]
+    obtained = renderer.to_pixels(points)
+    for (x, y), (u, v) in zip(points, obtained):
+        eu, ev = expected(x, y)
+        assert abs(u - eu) <= 1 and abs(v - ev) <= 1, ((x, y), (u, v), (eu, ev))
+
+
+@comptest
+def map_rendering_render():
+    script_dir = tempfile.mkdtemp()
+    try:
+        renderer = get_renderer(script_dir)
+    finally:
+        shutil.rmtree(script_dir)
+    path = Path(SearchNode('2', SearchNode('1'), cost=1.0))
+    image = renderer.render(path, '1', '2')
+    # the base image is not modified
+    assert not np.array_equal(image, renderer.base_image)
+    assert np.array_equal(renderer.render(), renderer.base_image)
+    # the middle of the edge is drawn with the color of the path
+    u, v = renderer.to_pixels([bezier_points([(1, 13), (2, 9), (3, 5), (4, 1)], samples=2)[1]])[0]
+    assert tuple(image[v, u]) == PATH_COLOR, image[v, u]
+
+
+def map_rendering_graphviz():
+    """ The path is drawn over the edges of the graphviz render. """
+    graph = Graph()
+    # the odd nodes are drawn as circles, the even ones are invisible
+    graph.add_edge('1', '2')
+    graph.add_edge('2', '3')
+    graph.add_edge('3', '5')
+    graph.add_edge('5', '1')
+    graph.set_node_positions({'1': (0, 0), '2': (3, 0.5), '3': (4, 3), '5': (1, 4)})
+
+    def prep_image(cv_image):
+        return cv2.resize(cv_image, (0, 0), fx=0.9, fy=0.9, interpolation=cv2.INTER_AREA)
+
+    script_dir = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(script_dir, 'maps'))
+        renderer = CachedMapRenderer(graph, script_dir, 'test', prep_image)
+    finally:
+        shutil.rmtree(script_dir)
+
+    base = renderer.base_image
+    # what graphviz drew in black on white, within 4 pixels
+    drawn = (cv2.cvtColor(base, cv2.COLOR_BGR2GRAY) < 128).astype('uint8')
+    near_drawn = cv2.dilate(drawn, np.ones((9, 9), 'uint8')) > 0
+
+    path = Path(SearchNode('5', SearchNode('3', SearchNode('2', SearchNode('1')))))
+    image = renderer.render(path)
+    overlay = np.any(image != base, axis=2)
+    # the three edges of the path were drawn...
+    assert np.sum(overlay) > 100, np.sum(overlay)
+    # ...over the edges of the render
+    outside = np.sum(overlay & ~near_drawn)
+    assert outside == 0, '%d of %d pixels of the path are not on an edge' % (outside, np.sum(overlay))
+
+
+# registered only where graphviz is installed, so that it is never
+# reported as passed without having rendered anything
+if find_executable('neato') is not None:
+    map_rendering_graphviz = comptest(map_rendering_graphviz)
+
+
+@comptest
+def map_rendering_latest_request():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def f(i):
+        calls.append(i)
+        started.set()
+        release.wait()
+
+    worker = LatestRequestWorker(f, on_error=None)
+    worker.put(1)
+    started.wait(5)
+    assert started.is_set()
+    # while the first one is drawn, only the latest request is kept
+    for i in [2, 3, 4]:
+        worker.put(i)
+    release.set()
+    t0 = time.time()
+    while len(calls) < 2 and time.time() - t0 < 5:
+        time.sleep(0.01)
+    worker.stop()
+    assert calls == [1, 4], calls
+
+
+@comptest
+def map_rendering_latest_request_errors():
+    errors = []
+    done = threading.Event()
+
+    def f(i):
+        if i == 1:
+            raise ValueError(i)
+        done.set()
+
+    worker = LatestRequestWorker(f, on_error=errors.append)
+    worker.put(1)
+    t0 = time.time()
+    while not errors and time.time() - t0 < 5:
+        time.sleep(0.01)
+    assert len(errors) == 1 and isinstance(errors[0], ValueError), errors
+    # the worker goes on after an error
+    worker.put(2)
+    done.wait(5)
+    assert done.is_set()
+    worker.stop()
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,70 @@
+from comptests.registrar import comptest, run_module_tests
+
+from navigation.search_classes import SearchNode
+from navigation.utils import HeapPriorityQueue
+
+
+def by_cost(search_node):
+    return search_node.cost
+
+
+@comptest
+def heap_priority_queue_order():
+    q = HeapPriorityQueue(f=by_cost)
+    for state, cost in [('a', 3), ('b', 1), ('c', 2), ('d', 1), ('e', 3)]:
+        q.append(SearchNode(state, cost=cost))
+    assert len(q) == 5
+    # the ties pop in insertion order, as with PriorityQueue
+    popped = [q.pop().state for _ in range(5)]
+    assert popped == ['b', 'd', 'c', 'a', 'e'], popped
+    assert not q
+    try:
+        q.pop()
+    except IndexError:
+        pass
+    else:
+        raise Exception('pop() from an empty queue should fail')
+
+
+@comptest
+def heap_priority_queue_replace():
+    q = HeapPriorityQueue(f=by_cost)
+    q.append(SearchNode('a', cost=5))
+    q.append(SearchNode('b', cost=3))
+    # the same state again replaces the previous entry
+    q.append(SearchNode('a', cost=1))
+    assert len(q) == 2
+    assert q[SearchNode('a')].cost == 1
+    assert q.pop().cost == 1
+    assert q.pop().state == 'b'
+    assert not q
+
+    # even with a higher cost
+    q.append(SearchNode('a', cost=1))
+    q.append(SearchNode('b', cost=3))
+    q.append(SearchNode('a', cost=5))
+    assert [q.pop().state for _ in range(2)] == ['b', 'a']
+
+
+@comptest
+def heap_priority_queue_delete():
+    q = HeapPriorityQueue(f=by_cost)
+    for state, cost in [('a', 1), ('b', 2), ('c', 3)]:
+        q.append(SearchNode(state, cost=cost))
+    del q[SearchNode('a')]
+    assert len(q) == 2
+    assert not SearchNode('a') in q
+    assert q[SearchNode('a')] is None
+    # deleting what is not there does nothing
+    del q[SearchNode('x')]
+    assert len(q) == 2
+    # the deleted entry is skipped
+    assert q.pop().state == 'b'
+    q.append(SearchNode('a', cost=0))
+    assert q.pop().state == 'a'
+    assert q.pop().state == 'c'
+    assert len(q) == 0
+
+
+if __name__ == '__main__':
+    run_module_tests()
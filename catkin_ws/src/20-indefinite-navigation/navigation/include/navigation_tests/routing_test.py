@@ -0,0 +1,128 @@
+import random
+
+from comptests.registrar import comptest, run_module_tests
+import numpy as np
+
+from navigation.generate_duckietown_map import graph_creator
+from navigation.graph import Graph
+from navigation.graph_search import GraphSearchProblem
+from navigation.routing_table import RoutingTable
+
+
+def dijkstra(graph, source):
+    """ The plain O(n^2) version: returns a dict node -> distance from source. """
+    distance = {source: 0.0}
+    done = set()
+    while True:
+        todo = [n for n in distance if not n in done]
+        if not todo:
+            return distance
+        n = min(todo, key=lambda _: distance[_])
+        done.add(n)
+        for edge in graph.node_edges(n):
+            d = distance[n] + edge.weight
+            if not edge.target in distance or d < distance[edge.target]:
+                distance[edge.target] = d
+
+
+def random_graph(seed, nnodes=25, nedges=60):
+    """ A random directed graph; the weights are at least the distance
+        between the nodes, so that the heuristic of A* is admissible. """
+    r = random.Random(seed)
+    nodes = ['n%d' % i for i in range(nnodes)]
+    positions = dict((n, (r.uniform(0, 10), r.uniform(0, 10))) for n in nodes)
+    graph = Graph()
+    for n in nodes:
+        graph.add_node(n)
+    for i in range(nedges):
+        a, b = r.sample(nodes, 2)
+        (xa, ya), (xb, yb) = positions[a], positions[b]
+        weight = np.hypot(xa - xb, ya - yb) * r.uniform(1.0, 2.0)
+        graph.add_edge(a, b, weight, action='e%d' % i)
+    graph.set_node_positions(positions)
+    return graph
+
+
+def get_duckietown_graph():
+    return graph_creator().build_graph_from_csv(csv_filename='tiles_226')
+
+
+def check_path(graph, path, source, target, cost):
+    """ Checks that the path goes from source to target along edges of
+        the graph, with the given cost. """
+    assert path.path[0] == source and path.path[-1] == target, path
+    assert len(path.actions) == len(path.path) - 1
+    total = 0.0
+    for (a, b), action in zip(path.edges(), path.actions):
+        edges = [e for e in graph.node_edges(a) if e.target == b and e.action == action]
+        assert edges, (a, b, action)
+        total += min(e.weight for e in edges)
+    assert np.allclose(total, cost), (total, cost)
+    assert np.allclose(path.cost, cost), (path.cost, cost)
+
+
+def check_same_as_dijkstra(graph):
+    """ Compares A* and the routing table with Dijkstra for all the pairs;
+        returns the number of pairs with no path. """
+    table = RoutingTable(graph)
+    problem = GraphSearchProblem(graph, None, None)
+    nunreachable = 0
+    for source in graph.nodes():
+        distance = dijkstra(graph, source)
+        for target in graph.nodes():
+            problem.start, problem.goal = source, target
+            found = problem.astar_search()
+            path = table.get_path(source, target)
+            if not target in distance:
+                nunreachable += 1
+                assert found is None and path is None, (source, target)
+                assert table.next_hop(source, target) is None
+                continue
+            check_path(graph, found, source, target, distance[target])
+            check_path(graph, path, source, target, distance[target])
+            if source == target:
+                assert table.next_hop(source, target) is None
+            else:
+                expected = (path.path[1], path.actions[0])
+                assert table.next_hop(source, target) == expected, (source, target)
+    return nunreachable
+
+
+@comptest
+def routing_random_graphs():
+    nunreachable = 0
+    for seed in range(10):
+        nunreachable += check_same_as_dijkstra(random_graph(seed))
+    # there are some pairs with no path
+    assert nunreachable > 0
+
+
+@comptest
+def routing_duckietown_map():
+    graph = get_duckietown_graph()
+    assert len(graph.nodes()) == 56
+    check_same_as_dijkstra(graph)
+
+
+@comptest
+def routing_unreachable():
+    graph = Graph()
+    graph.add_edge('a', 'b', 1.0, action='ab')
+    graph.add_node('c')
+    graph.set_node_positions({'a': (0, 0), 'b': (1, 0), 'c': (2, 0)})
+    table = RoutingTable(graph)
+    problem = GraphSearchProblem(graph, 'b', 'a')
+    assert problem.astar_search() is None
+    assert table.get_path('b', 'a') is None
+    assert table.next_hop('b', 'a') is None
+    assert table.get_path('a', 'c') is None
+    assert table.next_hop('a', 'c') is None
+    # nodes that are not in the graph
+    assert table.get_path('x', 'a') is None
+    assert table.next_hop('a', 'x') is None
+    assert table.get_path('a', 'b').actions == ['ab']
+    assert table.next_hop('a', 'b') == ('b', 'ab')
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -5,7 +5,7 @@ from catkin_pkg.python_setup import generate_distutils_setup
 
 # fetch values from package.xml
 setup_args = generate_distutils_setup(
-    packages=['navigation','rqt_navigation'],
+    packages=['navigation','navigation_tests','rqt_navigation'],
     package_dir={'': 'include'},
     requires=['std_msgs', 'rospy']
 )
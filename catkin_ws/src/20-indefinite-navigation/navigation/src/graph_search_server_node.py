@@ -3,6 +3,8 @@
 import rospy, sys, os, cv2, pickle
 from navigation.graph import Graph
 from navigation.graph_search import GraphSearchProblem
+from navigation.map_rendering import CachedMapRenderer, LatestRequestWorker, prep_map_image
+from navigation.routing_table import RoutingTable
 from sensor_msgs.msg import Image
 from cv_bridge import CvBridge, CvBridgeError
 from navigation.srv import *
@@ -24,36 +26,77 @@ class graph_search_server():
         gc = graph_creator()
         self.duckietown_graph = gc.build_graph_from_csv(csv_filename=self.map_name)
         self.duckietown_problem = GraphSearchProblem(self.duckietown_graph, None, None)
+
+        # The map does not change: optionally precompute all the paths
+        self.routing_table = None
+        if rospy.get_param('~routing_table', False):
+            t0 = rospy.get_time()
+            self.routing_table = RoutingTable(self.duckietown_graph)
+            print "Routing table computed in %.3f s." % (rospy.get_time() - t0)
     
         print "Map loaded successfully!\n"
 
         self.image_pub = rospy.Publisher("~map_graph",Image, queue_size = 1, latch=True)
         self.bridge = CvBridge()
 
+        # 'redraw': graphviz draws the whole map for each request
+        # 'cached': graphviz draws the map once, the path is drawn over it
+        self.render_mode = rospy.get_param('~render_mode', 'redraw')
+        if not self.render_mode in ['redraw', 'cached']:
+            msg = 'Invalid render_mode %r.' % self.render_mode
+            raise ValueError(msg)
+
         # Send graph through publisher
-        self.duckietown_graph.draw(self.script_dir, highlight_edges=None, map_name = self.map_name)
-        cv_image = cv2.imread(self.map_path + '.png', cv2.IMREAD_COLOR)
-        overlay = self.prepImage(cv_image)
+        if self.render_mode == 'cached':
+            self.renderer = CachedMapRenderer(self.duckietown_graph, self.script_dir, self.map_name, self.prepImage)
+            overlay = self.renderer.render()
+        else:
+            self.duckietown_graph.draw(self.script_dir, highlight_edges=None, map_name = self.map_name)
+            cv_image = cv2.imread(self.map_path + '.png', cv2.IMREAD_COLOR)
+            overlay = self.prepImage(cv_image)
         self.image_pub.publish(self.bridge.cv2_to_imgmsg(overlay, "bgr8"))
 
+        # The image is made in another thread, so that the service does
+        # not wait for it. Only the last request is drawn.
+        self.render_worker = LatestRequestWorker(self.publishImage, self.onRenderError)
+
     def handle_graph_search(self,req):
         # Checking if nodes exists
         if (req.source_node not in self.duckietown_graph) or (req.target_node not in self.duckietown_graph):
             print "Source or target node do not exist."
-            self.publishImage(req, [])
+            self.requestImage(req, None)
             return GraphSearchResponse([])
 
-        # Running A*
-        self.duckietown_problem.start = req.source_node
-        self.duckietown_problem.goal = req.target_node
-        path = self.duckietown_problem.astar_search()
+        if self.routing_table is not None:
+            path = self.routing_table.get_path(req.source_node, req.target_node)
+        else:
+            # Running A*
+            self.duckietown_problem.start = req.source_node
+            self.duckietown_problem.goal = req.target_node
+            path = self.duckietown_problem.astar_search()
 
         # Publish graph solution
-        self.publishImage(req, path)
+        self.requestImage(req, path)
 
+        if path is None:
+            print "No path from %s to %s." % (req.source_node, req.target_node)
+            return GraphSearchResponse([])
         return GraphSearchResponse(path.actions)        
 
+    def requestImage(self, req, path):
+        self.render_worker.put(req, path)
+
+    def onRenderError(self, e):
+        rospy.logerr('Could not publish the map: %s' % e)
+
     def publishImage(self, req, path):
+        if self.render_mode == 'cached':
+            if path:
+                overlay = self.renderer.render(path, req.source_node, req.target_node)
+            else:
+                overlay = self.renderer.render()
+            self.image_pub.publish(self.bridge.cv2_to_imgmsg(overlay, "bgr8"))
+            return
         if path:
             self.duckietown_graph.draw(self.script_dir, highlight_edges=path.edges(), map_name = self.map_name, highlight_nodes = [req.source_node, req.target_node])
         else:
@@ -64,14 +107,7 @@ class graph_search_server():
 
     def prepImage(self, cv_image):
         map_img = cv2.imread(self.map_img, cv2.IMREAD_COLOR)
-        map_crop = map_img[16:556,29:408,:]
-        map_resize = cv2.resize(map_crop,(cv_image.shape[1],955),interpolation=cv2.INTER_AREA)
-        cv_image = cv_image[0:955,:,:]
-        cv_image = 255 - cv_image                                                                                                                                                                            
-        overlay = cv2.addWeighted(cv_image,0.65,map_resize,0.35,0)                                                                                                                                             
-        overlay = cv2.resize(overlay,(0,0),fx=0.9,fy=0.9,interpolation=cv2.INTER_AREA) 
-        overlay *= 1.4
-        return overlay
+        return prep_map_image(cv_image, map_img)
 
 if __name__ == "__main__":
     rospy.init_node('graph_search_server_node')
@@ -1,6 +1,7 @@
 import numpy as np
 
 from api import LEDDetector
+from capture import LEDCapture, block_reduce_mean
 from duckietown_msgs.msg import Vector2D, LEDDetection, LEDDetectionArray, LEDDetectionDebugInfo
 from sensor_msgs.msg import CompressedImage
 from led_detection import logger
@@ -45,33 +46,14 @@ class LEDDetector():
         self.plotfinal = plotfinal
         self.publisher = publisher
         self.debug_msg = LEDDetectionDebugInfo()
-        pass
+        # first image, for the plots
+        self.rgb0 = None
 
     # ~~~~~~~~~~~~~~~~~~~ Downsample ~~~~~~~~~~~~~~~~~~~~~~~~
 
     def downsample(self, channel, cell_width=20, cell_height=20):
-        W = channel.shape[2]
-        H = channel.shape[1]
-
         print('Pre-downsampling shape: {0}'.format(channel[0].shape))
-
-        # determine top-left offset to center the grid
-        ncells_x = int(floor(1.0*W/cell_width))
-        ncells_y = int(floor(1.0*H/cell_height))
-        rest_x = W%cell_width
-        rest_y = H%cell_height
-
-        N = channel.shape[0]
-        cell_values = np.zeros((N,ncells_y, ncells_x))
-
-        # Compute values
-        for i in range(ncells_y):
-            for j in range(ncells_x):
-                tly = ceil(.5*rest_y)+i*cell_height
-                tlx = ceil(.5*rest_x)+j*cell_width
-                cell_values[:, i, j] = np.mean(channel[:,tly:tly+cell_height, tlx:tlx+cell_width], axis=tuple([1, 2]))
-
-        return (cell_values, [ceil(.5*rest_y), ceil(.5*rest_x)])
+        return block_reduce_mean(channel, cell_width, cell_height)
 
     # ~~~~~~~~~~~~~~~~~~~ Find local maxima ~~~~~~~~~~~~~~~~~~~~
 
@@ -121,36 +103,36 @@ class LEDDetector():
         if n == 0:
             raise ValueError('No images provided')
 
-        timestamps = images['timestamp']
-        rgb = images['rgb']
-        H, W, _ = rgb[0].shape
+        capture = LEDCapture(n, cell_size, crop_rect_norm)
+        for i in range(n):
+            capture.add(images['timestamp'][i], images['rgb'][i])
+        self.rgb0 = images['rgb'][0]
+
+        return self.detect_led_capture(capture, frequencies_to_detect)
+
+    def detect_led_capture(self, capture, frequencies_to_detect):
+        """ Same as detect_led(), for the frames in a LEDCapture. """
+        n = capture.num()
+        if n == 0:
+            raise ValueError('No images provided')
 
         if not isinstance(frequencies_to_detect, list):
             raise ValueError(frequencies_to_detect)
 
         if(self.publisher is not None):
-            self.debug_msg.cell_size = cell_size
-            self.debug_msg.crop_rect_norm = crop_rect_norm
+            self.debug_msg.cell_size = [capture.cell_width, capture.cell_height]
+            self.debug_msg.crop_rect_norm = capture.crop_rect_norm
         self.republish()
 
-        # Crop + Greyscale
-        tlx = floor(1.0*W*crop_rect_norm[0])
-        tly = floor(1.0*H*crop_rect_norm[1])
-        brx = ceil(1.0*W*crop_rect_norm[2])
-        bry = ceil(1.0*H*crop_rect_norm[3])
-        croppedshape = [images['rgb'].shape[0], bry-tly, brx-tlx] 
-        channel = np.zeros(croppedshape)
-        for i in range(n):
-            channel[i,:,:] = cv2.cvtColor(images['rgb'][i,tly:bry,tlx:brx,:], cv2.COLOR_BGR2GRAY)
-
-        print('expected shape {0}'.format(croppedshape))
-        print('channel.shape {0}'.format(channel.shape))
+        (cell_vals, timestamps) = capture.get_cells()
+        H, W = capture.H, capture.W
+        tlx, tly = capture.tlx, capture.tly
+        crop_offset = capture.crop_offset
 
-        cell_width = cell_size[0]
-        cell_height = cell_size[1]
+        cell_width = capture.cell_width
+        cell_height = capture.cell_height
         var_threshold = 100
 
-        (cell_vals, crop_offset) = self.downsample(channel, cell_width, cell_height)
         candidates_mask = self.get_candidate_cells(cell_vals, var_threshold)
 
         candidate_cells = [(i,j) for (i,j) in np.ndindex(candidates_mask.shape) if candidates_mask[i,j]]
@@ -207,8 +189,8 @@ class LEDDetector():
                 ax2.plot(f,y_f)
                 plt.show()
                 
-        if(self.ploteverything):
-            plt.imshow(rgb[0])
+        if(self.ploteverything and self.rgb0 is not None):
+            plt.imshow(self.rgb0)
             ax = plt.gca()
 
 
@@ -236,4 +218,5 @@ class LEDDetector():
         return result
 
     def republish(self):
+        if self.publisher is not None:
             self.publisher.publish(self.debug_msg)
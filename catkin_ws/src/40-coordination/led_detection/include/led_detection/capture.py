@@ -0,0 +1,122 @@
+from math import floor, ceil
+
+import cv2
+import numpy as np
+
+__all__ = [
+    'LEDCapture',
+    'block_reduce_mean',
+    'gray_from_rgb',
+    'gray_from_bgr',
+]
+
+
+def gray_from_rgb(rgb):
+    """
+        The luminance used for the detection: 0.114 R + 0.587 G + 0.299 B.
+
+        This is what the detector has always computed, by applying
+        COLOR_BGR2GRAY to the RGB frames of the logs, and var_threshold
+        is tuned for it; the frames decoded on the robot must be converted
+        in the same way, with gray_from_bgr().
+    """
+    return cv2.cvtColor(rgb, cv2.COLOR_BGR2GRAY)
+
+
+def gray_from_bgr(bgr):
+    """ Same as gray_from_rgb(), for a BGR image (e.g. from cv2.imdecode). """
+    return cv2.cvtColor(bgr, cv2.COLOR_RGB2GRAY)
+
+
+def block_reduce_mean(channel, cell_width, cell_height):
+    """
+        Averages the values in cells of cell_width x cell_height pixels.
+
+        channel: array of shape (..., H, W)
+
+        The grid is centered in the image; returns the array of shape
+        (..., ncells_y, ncells_x) and the offset [y, x] of the grid.
+    """
+    H, W = channel.shape[-2:]
+    ncells_x = W // cell_width
+    ncells_y = H // cell_height
+    off_y = int(ceil(.5 * (H % cell_height)))
+    off_x = int(ceil(.5 * (W % cell_width)))
+    grid = channel[..., off_y:off_y + ncells_y * cell_height,
+                        off_x:off_x + ncells_x * cell_width]
+    shape = grid.shape[:-2] + (ncells_y, cell_height, ncells_x, cell_width)
+    cell_values = grid.reshape(shape).mean(axis=(-3, -1))
+    return cell_values, [off_y, off_x]
+
+
+class LEDCapture():
+    """
+        The last nframes frames, reduced to the cells used for the
+        detection: each frame is cropped, converted to grayscale and
+        averaged in cells as soon as it is added, and written into a
+        preallocated (nframes, ncells_y, ncells_x) ring buffer. The
+        memory used does not depend on the duration of the capture.
+
+        The geometry is decided by the first frame.
+    """
+
+    def __init__(self, nframes, cell_size, crop_rect_norm=[0, 0, 1.0, 1.0]):
+        self.nframes = nframes
+        self.cell_width = cell_size[0]
+        self.cell_height = cell_size[1]
+        self.crop_rect_norm = crop_rect_norm
+        self.cells = None
+        self.timestamps = np.zeros(nframes)
+        self.reset()
+
+    def reset(self):
+        # number of frames added since the last reset
+        self.n = 0
+
+    def _init_geometry(self, H, W):
+        self.H = H
+        self.W = W
+        r = self.crop_rect_norm
+        self.tlx = int(floor(1.0 * W * r[0]))
+        self.tly = int(floor(1.0 * H * r[1]))
+        self.brx = int(ceil(1.0 * W * r[2]))
+        self.bry = int(ceil(1.0 * H * r[3]))
+        cropped = np.zeros((self.bry - self.tly, self.brx - self.tlx))
+        cell_values, self.crop_offset = block_reduce_mean(cropped, self.cell_width, self.cell_height)
+        self.cells = np.zeros((self.nframes,) + cell_values.shape)
+
+    def add(self, timestamp, image):
+        """ image: grayscale (H, W), or RGB (H, W, 3) converted with gray_from_rgb() """
+        H, W = image.shape[:2]
+        if self.cells is None:
+            self._init_geometry(H, W)
+        elif (H, W) != (self.H, self.W):
+            msg = 'Frame of shape %s, expected %s.' % ((H, W), (self.H, self.W))
+            raise ValueError(msg)
+
+        cropped = image[self.tly:self.bry, self.tlx:self.brx]
+        if len(cropped.shape) == 3:
+            cropped = gray_from_rgb(cropped)
+        i = self.n % self.nframes
+        self.cells[i], _ = block_reduce_mean(cropped, self.cell_width, self.cell_height)
+        self.timestamps[i] = timestamp
+        self.n += 1
+
+    def num(self):
+        """ Returns the number of frames in the buffer. """
+        return min(self.n, self.nframes)
+
+    def is_full(self):
+        return self.n >= self.nframes
+
+    def get_cells(self):
+        """
+            Returns the cell values of the frames, in the order in which
+            they were added, and their timestamps: an array of shape
+            (n, ncells_y, ncells_x) and an array of shape (n,).
+        """
+        if self.n <= self.nframes:
+            return self.cells[:self.n], self.timestamps[:self.n]
+        i = self.n % self.nframes
+        order = np.r_[i:self.nframes, 0:i]
+        return self.cells[order], self.timestamps[order]
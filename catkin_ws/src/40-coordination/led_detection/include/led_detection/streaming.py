@@ -0,0 +1,136 @@
+import numpy as np
+
+from capture import LEDCapture
+from duckietown_msgs.msg import Vector2D, LEDDetection, LEDDetectionArray
+from scipy.ndimage.filters import maximum_filter
+import rospy
+
+__all__ = ['StreamingLEDDetector']
+
+
+class StreamingLEDDetector():
+    """
+        Detects the LEDs continuously, as the frames arrive.
+
+        The frames are reduced to cells by a LEDCapture, which keeps the
+        last nframes (the window). For each cell we keep the sums of
+        the values and of their squares in the window, and for each
+        of the frequencies to detect the DFT coefficient
+
+            S_f = sum_t x(t) exp(-2 pi i f t)
+
+        using the actual timestamps of the frames. When a frame is added,
+        its term is added and the term of the frame that leaves the
+        window is subtracted, so each frame costs O(ncells * nfrequencies)
+        instead of an FFT of every candidate after the capture. The sums
+        are recomputed from the window every time the ring buffer wraps,
+        so that the rounding errors do not accumulate.
+
+        A cell is a detection if its variance is a local maximum above
+        var_threshold, and if the fraction of its variance explained by
+        the best of the frequencies (the confidence) is at least
+        min_confidence. A square wave gives 8/pi^2 = 0.81.
+    """
+
+    def __init__(self, frequencies_to_detect, nframes, cell_size, crop_rect_norm=[0, 0, 1.0, 1.0],
+                 var_threshold=100, min_confidence=0.5):
+        self.frequencies = np.array(frequencies_to_detect, dtype='float')
+        self.capture = LEDCapture(nframes, cell_size, crop_rect_norm)
+        self.var_threshold = var_threshold
+        self.min_confidence = min_confidence
+        self.reset()
+
+    def reset(self):
+        self.capture.reset()
+        self.t0 = None
+        self.sum_x = None
+
+    def _phasors(self, timestamps):
+        """ exp(-2 pi i f t) for each frequency (rows) and timestamp (columns) """
+        t = np.asarray(timestamps, dtype='float') - self.t0
+        return np.exp(-2j * np.pi * np.outer(self.frequencies, t))
+
+    def _recompute(self):
+        cells, timestamps = self.capture.get_cells()
+        self.sum_x = cells.sum(axis=0)
+        self.sum_x2 = (cells ** 2).sum(axis=0)
+        phasors = self._phasors(timestamps)
+        # (nfrequencies, ncells_y, ncells_x)
+        self.S = np.tensordot(phasors, cells, axes=(1, 0))
+        self.E = phasors.sum(axis=1)
+
+    def add(self, timestamp, image):
+        """ Adds a frame (grayscale or RGB, see LEDCapture.add). """
+        capture = self.capture
+        if self.t0 is None:
+            self.t0 = timestamp
+        i = capture.n % capture.nframes
+        if capture.is_full():
+            old_x = capture.cells[i].copy()
+            old_t = capture.timestamps[i]
+        capture.add(timestamp, image)
+
+        if self.sum_x is None or i == 0:
+            self._recompute()
+            return
+
+        x = capture.cells[i]
+        p = self._phasors([timestamp])[:, 0]
+        self.sum_x += x
+        self.sum_x2 += x ** 2
+        self.S += p[:, np.newaxis, np.newaxis] * x
+        self.E += p
+        if capture.n > capture.nframes:
+            p_old = self._phasors([old_t])[:, 0]
+            self.sum_x -= old_x
+            self.sum_x2 -= old_x ** 2
+            self.S -= p_old[:, np.newaxis, np.newaxis] * old_x
+            self.E -= p_old
+
+    def is_ready(self):
+        """ True if the window is full. """
+        return self.capture.is_full()
+
+    def get_confidence(self):
+        """
+            Returns the variance of each cell (ncells_y, ncells_x), and
+            for each frequency the fraction of the variance at that
+            frequency (nfrequencies, ncells_y, ncells_x).
+        """
+        n = self.capture.num()
+        mean = self.sum_x / n
+        variance = np.maximum(self.sum_x2 / n - mean ** 2, 0)
+        # DFT of the signal minus its mean
+        S0 = self.S - self.E[:, np.newaxis, np.newaxis] * mean
+        amplitude = 2.0 / n * np.abs(S0)
+        # power of a sinusoid = amplitude^2 / 2
+        power = amplitude ** 2 / 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.where(variance > 0, power / variance, 0)
+        return variance, np.minimum(confidence, 1.0)
+
+    def get_detections(self):
+        """ Returns a LEDDetectionArray; empty if the window is not full yet. """
+        result = LEDDetectionArray()
+        if not self.is_ready():
+            return result
+
+        capture = self.capture
+        variance, confidence = self.get_confidence()
+        peaks = maximum_filter(variance, 5) == variance
+        candidates = peaks & (variance > self.var_threshold)
+
+        _, timestamps = capture.get_cells()
+        t1 = rospy.Time.from_sec(timestamps[0])
+        t2 = rospy.Time.from_sec(timestamps[-1])
+        for (i, j) in zip(*np.nonzero(candidates)):
+            k = np.argmax(confidence[:, i, j])
+            if confidence[k, i, j] < self.min_confidence:
+                continue
+            x = (0.5 + j) * capture.cell_width + capture.crop_offset[1] + capture.tlx
+            y = (0.5 + i) * capture.cell_height + capture.crop_offset[0] + capture.tly
+            pixels_normalized = Vector2D(1.0 * x / capture.W, 1.0 * y / capture.H)
+            result.detections.append(LEDDetection(t1, t2, pixels_normalized,
+                                                  self.frequencies[k], '', confidence[k, i, j],
+                                                  [], [], [], []))
+        return result
@@ -0,0 +1,9 @@
+
+
+def jobs_comptests(context):  
+    
+    from . import capture_test 
+    from . import streaming_test 
+    
+    from comptests.registrar import jobs_registrar_simple
+    jobs_registrar_simple(context)
@@ -0,0 +1,95 @@
+from math import ceil, floor
+
+from comptests.registrar import comptest, run_module_tests
+
+from led_detection.capture import LEDCapture, block_reduce_mean, gray_from_rgb, gray_from_bgr
+import numpy as np
+
+
+def downsample_loop(channel, cell_width, cell_height):
+    """ The double loop that LEDDetector.downsample() used before block_reduce_mean(). """
+    W = channel.shape[2]
+    H = channel.shape[1]
+    ncells_x = int(floor(1.0*W/cell_width))
+    ncells_y = int(floor(1.0*H/cell_height))
+    rest_x = W%cell_width
+    rest_y = H%cell_height
+    N = channel.shape[0]
+    cell_values = np.zeros((N,ncells_y, ncells_x))
+    for i in range(ncells_y):
+        for j in range(ncells_x):
+            tly = int(ceil(.5*rest_y))+i*cell_height
+            tlx = int(ceil(.5*rest_x))+j*cell_width
+            cell_values[:, i, j] = np.mean(channel[:,tly:tly+cell_height, tlx:tlx+cell_width], axis=tuple([1, 2]))
+    return (cell_values, [ceil(.5*rest_y), ceil(.5*rest_x)])
+
+
+@comptest
+def block_reduce_mean_same_as_loop():
+    np.random.seed(0)
+    # H % cell_height and W % cell_width are 0, even and odd
+    for shape, cell_width, cell_height in [((4, 40, 60), 10, 20),
+                                           ((4, 47, 65), 10, 20),
+                                           ((3, 48, 66), 20, 10),
+                                           ((2, 31, 29), 7, 5)]:
+        channel = np.random.rand(*shape) * 255
+        expected, expected_offset = downsample_loop(channel, cell_width, cell_height)
+        values, offset = block_reduce_mean(channel, cell_width, cell_height)
+        assert values.shape == expected.shape, (values.shape, expected.shape)
+        assert np.allclose(values, expected)
+        assert offset == expected_offset, (offset, expected_offset)
+
+
+@comptest
+def gray_same_on_both_paths():
+    np.random.seed(1)
+    rgb = (np.random.rand(20, 30, 3) * 255).astype('uint8')
+    bgr = rgb[:, :, ::-1].copy()
+    assert np.all(gray_from_rgb(rgb) == gray_from_bgr(bgr))
+    # the weights that var_threshold is tuned for
+    red = np.zeros((1, 1, 3), 'uint8')
+    red[:, :, 0] = 255
+    assert abs(int(gray_from_rgb(red)[0, 0]) - 0.114 * 255) <= 1
+
+
+def get_frame(k, H=48, W=64):
+    return np.ones((H, W), 'uint8') * k
+
+
+@comptest
+def capture_rgb_same_as_gray():
+    np.random.seed(2)
+    rgb = (np.random.rand(48, 64, 3) * 255).astype('uint8')
+    a = LEDCapture(2, [8, 8], [0.1, 0.2, 0.9, 1.0])
+    b = LEDCapture(2, [8, 8], [0.1, 0.2, 0.9, 1.0])
+    a.add(0, rgb)
+    b.add(0, gray_from_rgb(rgb))
+    assert np.all(a.get_cells()[0] == b.get_cells()[0])
+
+
+@comptest
+def capture_ring_order():
+    nframes = 5
+    capture = LEDCapture(nframes, [8, 8])
+    for k in range(3):
+        capture.add(float(k), get_frame(k))
+    cells, timestamps = capture.get_cells()
+    assert capture.num() == 3 and not capture.is_full()
+    assert list(timestamps) == [0, 1, 2]
+    assert list(cells[:, 0, 0]) == [0, 1, 2]
+
+    # after the ring wraps, the oldest frame comes first
+    for n in range(3, 13):
+        capture.add(float(n), get_frame(n))
+        cells, timestamps = capture.get_cells()
+        expected = list(range(max(0, n + 1 - nframes), n + 1))
+        assert list(timestamps) == expected, (timestamps, expected)
+        assert list(cells[:, 0, 0]) == expected
+    assert capture.is_full() and capture.num() == nframes
+
+    capture.reset()
+    assert capture.num() == 0
+
+
+if __name__ == '__main__':
+    run_module_tests()
@@ -0,0 +1,75 @@
+import copy
+
+from comptests.registrar import comptest, run_module_tests
+
+from led_detection.streaming import StreamingLEDDetector
+import numpy as np
+
+H, W = 48, 64
+CELL = 8
+FPS = 30.0
+# (cell row, cell column) -> frequency of the blinking LED
+LEDS = {(1, 2): 4.0, (4, 6): 7.8}
+FREQUENCIES = [2.4, 4.0, 5.7, 7.8]
+
+
+def synthetic_video(nframes, seed=0):
+    """ Yields (timestamp, gray frame): LEDs blinking as square waves on a noisy background. """
+    rng = np.random.RandomState(seed)
+    for k in range(nframes):
+        t = 1000.0 + k / FPS + rng.uniform(-0.002, 0.002)
+        frame = 50 + rng.normal(0, 2, (H, W))
+        for (i, j), f in LEDS.items():
+            if np.sin(2 * np.pi * f * t) > 0:
+                frame[i * CELL:(i + 1) * CELL, j * CELL:(j + 1) * CELL] = 200
+        yield t, np.clip(frame, 0, 255).astype('uint8')
+
+
+def get_detector(nframes):
+    return StreamingLEDDetector(FREQUENCIES, nframes, [CELL, CELL])
+
+
+@comptest
+def streaming_sums_same_as_recompute():
+    """ The sums updated frame by frame are the same as the ones computed from the window. """
+    nframes = 20
+    detector = get_detector(nframes)
+    # before the window is full, at every wrap, and in between
+    for n, (t, frame) in enumerate(synthetic_video(int(3.5 * nframes))):
+        detector.add(t, frame)
+        assert detector.is_ready() == (n + 1 >= nframes)
+        expected = copy.deepcopy(detector)
+        expected._recompute()
+        for name in ['sum_x', 'sum_x2', 'S', 'E']:
+            a = getattr(detector, name)
+            b = getattr(expected, name)
+            assert np.allclose(a, b, rtol=0, atol=1e-9 * max(1, np.abs(b).max())), (n, name)
+            if n % nframes == 0:
+                # recomputed when the ring wraps, so that the errors do not accumulate
+                assert np.all(a == b), (n, name)
+
+
+@comptest
+def streaming_detects_leds():
+    nframes = 60
+    detector = get_detector(nframes)
+    video = list(synthetic_video(3 * nframes + 7))
+    for t, frame in video[:nframes - 1]:
+        detector.add(t, frame)
+    assert not detector.is_ready()
+    assert len(detector.get_detections().detections) == 0
+
+    for t, frame in video[nframes - 1:]:
+        detector.add(t, frame)
+    detections = detector.get_detections().detections
+    found = {}
+    for d in detections:
+        j = int(d.pixels_normalized.x * W / CELL)
+        i = int(d.pixels_normalized.y * H / CELL)
+        found[(i, j)] = d.frequency
+        assert d.confidence > 0.7, d.confidence
+    assert found == LEDS, found
+
+
+if __name__ == '__main__':
+    run_module_tests()
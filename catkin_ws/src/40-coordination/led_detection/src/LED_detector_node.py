@@ -2,10 +2,12 @@
 import rospy
 import time
 from led_detection.LEDDetector import LEDDetector
+from led_detection.capture import LEDCapture, gray_from_bgr
+from led_detection.streaming import StreamingLEDDetector
 from std_msgs.msg import Byte
 from duckietown_msgs.msg import Vector2D, LEDDetection, LEDDetectionArray, LEDDetectionDebugInfo, BoolStamped
 from sensor_msgs.msg import CompressedImage
-from duckietown_utils.bag_logs import numpy_from_ros_compressed
+from duckietown_utils.jpg import image_cv_from_jpg
 import numpy as np
 
 class LEDDetectorNode(object):
@@ -17,7 +19,6 @@ class LEDDetectorNode(object):
         self.tinit = None
         self.trigger = False
         self.node_state = 0
-        self.data = []
         
         self.node_name = rospy.get_name()
         self.pub_detections = rospy.Publisher("~raw_led_detection",LEDDetectionArray,queue_size=1)
@@ -30,8 +31,23 @@ class LEDDetectorNode(object):
         self.cell_size = rospy.get_param("~cell_size")
         self.continuous = rospy.get_param('~continuous', True) # Detect continuously as long as active
                                                                # [INTERACTIVE MODE] set to False for manual trigger
+        self.fps = rospy.get_param('~fps', 30) # expected frame rate: the capture stops after capture_time*fps frames
         self.frequencies = self.protocol['frequencies'].values()
 
+        nframes = int(round(self.capture_time * self.fps))
+        self.capture = LEDCapture(nframes, self.cell_size, self.crop_rect_normalized)
+
+        # Streaming mode: detect continuously on the last capture_time seconds,
+        # publishing the detections at most every publish_interval seconds
+        self.streaming = rospy.get_param('~streaming', False)
+        self.publish_interval = rospy.get_param('~publish_interval', 0.2)
+        self.last_published = 0
+        if self.streaming:
+            min_confidence = rospy.get_param('~min_confidence', 0.5)
+            self.streaming_detector = StreamingLEDDetector(self.frequencies, nframes, self.cell_size,
+                                                           self.crop_rect_normalized,
+                                                           min_confidence=min_confidence)
+
         rospy.loginfo('[%s] Config: \n\t crop_rect_normalized: %s, \n\t capture_time: %s, \n\t cell_size: %s'%(self.node_name, self.crop_rect_normalized, self.capture_time, self.cell_size))
 
         if not self.veh_name:
@@ -58,13 +74,17 @@ class LEDDetectorNode(object):
         if not self.active:
             return
 
+        if self.streaming:
+            self.camera_callback_streaming(msg)
+            return
+
         float_time = msg.header.stamp.to_sec()
         debug_msg = LEDDetectionDebugInfo()
 
         if self.trigger:
             rospy.loginfo('[%s] GOT TRIGGER! Starting...')
             self.trigger = False
-            self.data = []
+            self.capture.reset()
             self.capture_finished = False
             rospy.loginfo('[%s] Start capturing frames'%self.node_name)
             self.first_timestamp = msg.header.stamp.to_sec()
@@ -79,15 +99,17 @@ class LEDDetectorNode(object):
             rel_time = float_time - self.first_timestamp
 
             # Capturing
-            if rel_time < self.capture_time:
+            if rel_time < self.capture_time and not self.capture.is_full():
                 self.node_state = 1
-                rgb = numpy_from_ros_compressed(msg)
+                # only the luminance is used, the same as for the logs
+                gray = gray_from_bgr(image_cv_from_jpg(msg.data))
                 rospy.loginfo('[%s] Capturing frame %s' %(self.node_name, rel_time))
-                self.data.append({'timestamp': float_time, 'rgb': rgb[:,:,:]})
+                self.capture.add(float_time, gray)
                 debug_msg.capture_progress = 100.0*rel_time/self.capture_time
 
-            # Start processing
-            elif not self.capture_finished and self.first_timestamp > 0:
+            # Start processing as soon as the capture window is complete
+            if (rel_time >= self.capture_time or self.capture.is_full()) and \
+                    not self.capture_finished and self.first_timestamp > 0:
                 rospy.loginfo('[%s] Relative Time %s, processing' %(self.node_name, rel_time))
                 self.node_state = 2
                 self.capture_finished = True
@@ -99,27 +121,33 @@ class LEDDetectorNode(object):
 
         self.send_state(debug_msg) # TODO move heartbeat to dedicated thread
 
+    def camera_callback_streaming(self, msg):
+        float_time = msg.header.stamp.to_sec()
+        if self.trigger:
+            # (re)activated: do not use the frames from before
+            self.trigger = False
+            self.streaming_detector.reset()
+
+        gray = gray_from_bgr(image_cv_from_jpg(msg.data))
+        self.streaming_detector.add(float_time, gray)
+
+        if self.streaming_detector.is_ready():
+            self.node_state = 2
+            if float_time - self.last_published >= self.publish_interval:
+                self.last_published = float_time
+                self.pub_detections.publish(self.streaming_detector.get_detections())
+        else:
+            self.node_state = 1
+        self.send_state(LEDDetectionDebugInfo())
+
     def trigger_callback(self, msg):
         self.trigger = True
 
     def process_and_publish(self):
         # TODO add check timestamps for dropped frames
-        H, W, _ = self.data[0]['rgb'].shape
-        n = len(self.data)
-        dtype = [
-            ('timestamp', 'float'),
-            ('rgb', 'uint8', (H, W, 3)),
-        ]
-        images = np.zeros((n,), dtype=dtype)
-        for i, v in enumerate(self.data):
-            images[i]['timestamp'] = v['timestamp']
-            images[i]['rgb'][:] = v['rgb']
-        
         det = LEDDetector(False, False, False, self.pub_debug)
-        rgb0 = self.data[0]['rgb']
-        #mask = np.ones(dtype='bool', shape=rgb0.shape)
         tic = time.time()
-        result = det.detect_led(images, self.frequencies, self.cell_size, self.crop_rect_normalized)
+        result = det.detect_led_capture(self.capture, self.frequencies)
         self.pub_detections.publish(result)
 
         toc = time.time()-tic
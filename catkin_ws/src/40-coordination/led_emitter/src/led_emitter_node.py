@@ -40,13 +40,15 @@ class LEDEmitter(object):
     def cycleTimer(self,event):
         if not self.active:
             return
-        if self.is_on:
-            for i in range(5):
-                self.led.setRGB(i, [0, 0, 0])
+        # only the channels that changed are written, in one go
+        with self.led.batch():
+            if self.is_on:
+                for i in range(5):
+                    self.led.setRGB(i, [0, 0, 0])
                 self.is_on = False
-        else:
-            for i in range(5):
-                self.led.setRGB(i, self.pattern[i])
+            else:
+                for i in range(5):
+                    self.led.setRGB(i, self.pattern[i])
                 self.is_on = True
 
     def changePattern(self, msg):
@@ -1,3 +1,4 @@
 from .rgb_led import RGB_LED
+from .pca9685 import *
 from .duckietown_lights import *
 from .fancy_scripts import *
\ No newline at end of file
@@ -0,0 +1,167 @@
+__all__ = [
+    'ShadowPWM',
+    'CountingI2C',
+    'compare_i2c_traffic',
+]
+
+# Registers and bits of the PCA9685 (see Adafruit_PWM_Servo_Driver)
+MODE1 = 0x00
+LED0_ON_L = 0x06
+MODE1_AI = 0x20  # register auto-increment
+# SMBus block writes carry at most 32 data bytes
+MAX_BLOCK_BYTES = 32
+
+
+class ShadowPWM():
+    """
+        Writes the LEDn_ON/LEDn_OFF registers of a PCA9685 through an
+        Adafruit_I2C-like object (write8, writeList, readU8).
+
+        setPWM() only updates a copy of the registers; the channels whose
+        value changed are written by flush(), with the auto-increment
+        block writes: the channels between the first and the last changed
+        one go in a single transaction (up to 8 channels, 32 bytes).
+        The unchanged channels are not written at all.
+
+        With buffered=False every setPWM() is written at once, register
+        by register, like PWM.setPWM().
+    """
+
+    def __init__(self, i2c, nchannels=16, buffered=True):
+        self.i2c = i2c
+        self.nchannels = nchannels
+        self.buffered = buffered
+        # channel -> (on, off) last written; None if unknown
+        self.written = [None] * nchannels
+        # channel -> (on, off) to write
+        self.pending = {}
+        if buffered:
+            mode1 = i2c.readU8(MODE1)
+            if mode1 < 0:
+                mode1 = 0
+            i2c.write8(MODE1, mode1 | MODE1_AI)
+
+    def setPWM(self, channel, on, off):
+        if not 0 <= channel < self.nchannels:
+            msg = 'Invalid channel %r.' % channel
+            raise ValueError(msg)
+        value = (on, off)
+        if not self.buffered:
+            self._write_single(channel, value)
+            return
+        if self.written[channel] == value:
+            self.pending.pop(channel, None)
+        else:
+            self.pending[channel] = value
+
+    def _write_single(self, channel, value):
+        on, off = value
+        reg = LED0_ON_L + 4 * channel
+        for i, byte in enumerate(_channel_bytes(on, off)):
+            self.i2c.write8(reg + i, byte)
+        self.written[channel] = value
+
+    def invalidate(self):
+        """ Forgets the values written: the next flush() writes all the channels set. """
+        for channel, value in enumerate(self.written):
+            if value is not None and not channel in self.pending:
+                self.pending[channel] = value
+        self.written = [None] * self.nchannels
+
+    def flush(self):
+        """ Writes the channels that changed; returns the number of transactions. """
+        channels = sorted(self.pending)
+        max_channels = MAX_BLOCK_BYTES // 4
+        ntransactions = 0
+        while channels:
+            first = last = channels.pop(0)
+            # a block can only span the channels whose value is known
+            while (channels and channels[0] < first + max_channels and
+                   all(self.written[c] is not None for c in range(last + 1, channels[0]))):
+                last = channels.pop(0)
+            data = []
+            for channel in range(first, last + 1):
+                if channel in self.pending:
+                    value = self.pending[channel]
+                else:
+                    # unchanged, rewritten to keep the block contiguous
+                    value = self.written[channel]
+                data.extend(_channel_bytes(*value))
+            res = self.i2c.writeList(LED0_ON_L + 4 * first, data)
+            ntransactions += 1
+            if res is not None and res < 0:
+                # error already reported by Adafruit_I2C; retry next time
+                continue
+            for channel in range(first, last + 1):
+                if channel in self.pending:
+                    self.written[channel] = self.pending.pop(channel)
+        return ntransactions
+
+
+def _channel_bytes(on, off):
+    return [on & 0xFF, on >> 8, off & 0xFF, off >> 8]
+
+
+class CountingI2C():
+    """
+        Stand-in for Adafruit_I2C that keeps the registers in memory
+        and counts the transactions and the bytes sent (register address
+        plus data, not counting the device address).
+    """
+
+    def __init__(self, address=0x40):
+        self.address = address
+        self.debug = False
+        self.registers = [0] * 256
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.transactions = 0
+        self.bytes = 0
+
+    def _count(self, nbytes):
+        self.transactions += 1
+        self.bytes += nbytes
+
+    def write8(self, reg, value):
+        self.registers[reg] = value & 0xFF
+        self._count(2)
+
+    def writeList(self, reg, data):
+        if len(data) > MAX_BLOCK_BYTES:
+            msg = 'Block of %d bytes; SMBus allows %d.' % (len(data), MAX_BLOCK_BYTES)
+            raise ValueError(msg)
+        auto_increment = self.registers[MODE1] & MODE1_AI
+        for i, value in enumerate(data):
+            r = reg + i if auto_increment else reg
+            self.registers[r] = value & 0xFF
+        self._count(1 + len(data))
+
+    def readU8(self, reg):
+        self._count(1)
+        return self.registers[reg]
+
+    def get_pwm(self, channel):
+        """ Returns (on, off) as stored in the registers. """
+        r = self.registers[LED0_ON_L + 4 * channel: LED0_ON_L + 4 * channel + 4]
+        return r[0] | (r[1] << 8), r[2] | (r[3] << 8)
+
+
+def compare_i2c_traffic(sequence, buffered):
+    """
+        Replays a sequence of frames, each a list of 5 colors as given to
+        RGB_LED.setRGB(), on a CountingI2C; returns a dict with the
+        transactions and bytes per frame.
+    """
+    from .rgb_led import RGB_LED
+    i2c = CountingI2C()
+    led = RGB_LED(i2c=i2c, buffered=buffered)
+    i2c.reset_counts()
+    for colors in sequence:
+        with led.batch():
+            for i, color in enumerate(colors):
+                led.setRGB(i, color)
+    n = len(sequence)
+    return dict(transactions=i2c.transactions, bytes=i2c.bytes,
+                transactions_per_frame=1.0 * i2c.transactions / n,
+                bytes_per_frame=1.0 * i2c.bytes / n)
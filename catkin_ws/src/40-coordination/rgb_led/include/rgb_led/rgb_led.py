@@ -11,6 +11,10 @@
 
 
 # from math import fabs, floor
+from contextlib import contextmanager
+
+from .pca9685 import ShadowPWM
+
 
 class RGB_LED():
 #
@@ -24,14 +28,49 @@ class RGB_LED():
     OFFSET_GREEN = 1
     OFFSET_BLUE  = 2
 
-    def __init__(self, debug=False):
-        from Adafruit_PWM_Servo_Driver import PWM  # @UnresolvedImport
-        self.pwm = PWM(address=0x40, debug=debug)
+    def __init__(self, debug=False, i2c=None, buffered=True):
+        """
+            The writes go through a ShadowPWM: each call to setRGB()
+            writes only the channels that changed, in one block write,
+            or nothing at all inside batch().
+
+            i2c: an Adafruit_I2C-like object (e.g. CountingI2C) to
+            use instead of the PCA9685 at 0x40.
+        """
+        if i2c is None:
+            from Adafruit_PWM_Servo_Driver import PWM  # @UnresolvedImport
+            self.pwm = PWM(address=0x40, debug=debug)
+            i2c = self.pwm.i2c
+        self.shadow = ShadowPWM(i2c, buffered=buffered)
+        self.batching = False
+        self.setAllOff()
+
+    def setAllOff(self):
         for i in range(15):
-            self.pwm.setPWM(i, 0, 4095)
+            self.shadow.setPWM(i, 0, 4095)
+        self.flush()
+
+    def flush(self):
+        """ Writes the channels that changed. """
+        self.shadow.flush()
+
+    @contextmanager
+    def batch(self):
+        """ The changes made inside the block are written once, at the end. """
+        if self.batching:
+            yield
+            return
+        self.batching = True
+        try:
+            yield
+        finally:
+            self.batching = False
+            self.flush()
 
     def setLEDBrightness(self, led, offset, brightness):
-        self.pwm.setPWM(3 * led + offset, brightness << 4, 4095)
+        self.shadow.setPWM(3 * led + offset, brightness << 4, 4095)
+        if not self.batching:
+            self.flush()
 
     def setRGBint24(self, led, color):
         r = color >> 16 & 0xFF
@@ -40,14 +79,15 @@ class RGB_LED():
         self.setRGBvint8(led, [r, g, b])
         
     def setRGBvint8(self, led, color):
-        self.setLEDBrightness(led, self.OFFSET_RED  , color[0])
-        self.setLEDBrightness(led, self.OFFSET_GREEN, color[1])
-        self.setLEDBrightness(led, self.OFFSET_BLUE , color[2])
+        with self.batch():
+            self.setLEDBrightness(led, self.OFFSET_RED  , color[0])
+            self.setLEDBrightness(led, self.OFFSET_GREEN, color[1])
+            self.setLEDBrightness(led, self.OFFSET_BLUE , color[2])
 
     def setRGB(self, led, color):
         self.setRGBvint8(led, map(lambda f: int(f * 255), color))
 
     def __del__(self):
-        for i in range(15):
-            self.pwm.setPWM(i, 0, 4095)
-        del self.pwm
+        self.setAllOff()
+        if hasattr(self, 'pwm'):
+            del self.pwm
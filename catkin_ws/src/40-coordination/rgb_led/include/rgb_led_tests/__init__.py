@@ -0,0 +1,8 @@
+
+
+def jobs_comptests(context):  
+    
+    from . import shadow_pwm_test 
+    
+    from comptests.registrar import jobs_registrar_simple
+    jobs_registrar_simple(context)
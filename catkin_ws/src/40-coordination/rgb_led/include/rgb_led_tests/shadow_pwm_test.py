@@ -0,0 +1,121 @@
+import random
+
+from comptests.registrar import comptest, run_module_tests
+
+from rgb_led import RGB_LED, ShadowPWM, CountingI2C
+from rgb_led.pca9685 import LED0_ON_L
+
+# what the registers contain before anything is written
+UNKNOWN = 0xAB
+
+
+class FlakyI2C(CountingI2C):
+    """ A bus on which some block writes fail, as Adafruit_I2C reports them (-1). """
+
+    def __init__(self, seed):
+        CountingI2C.__init__(self)
+        self.random = random.Random(seed)
+
+    def writeList(self, reg, data):
+        if self.random.random() < 0.3:
+            self._count(1 + len(data))
+            return -1
+        return CountingI2C.writeList(self, reg, data)
+
+
+def get_bus(i2c):
+    for channel in range(16):
+        for i in range(4):
+            i2c.registers[LED0_ON_L + 4 * channel + i] = UNKNOWN
+    return i2c
+
+
+def check_registers(i2c, expected):
+    for channel in range(16):
+        if channel in expected:
+            assert i2c.get_pwm(channel) == expected[channel], (channel, i2c.get_pwm(channel), expected[channel])
+        else:
+            # never set: never written
+            r = i2c.registers[LED0_ON_L + 4 * channel: LED0_ON_L + 4 * channel + 4]
+            assert r == [UNKNOWN] * 4, (channel, r)
+
+
+@comptest
+def shadow_pwm_random_batches():
+    rng = random.Random(0)
+    i2c = get_bus(CountingI2C())
+    shadow = ShadowPWM(i2c)
+    expected = {}
+    # channel 9 is never set, so the blocks cannot span it
+    channels = [c for c in range(16) if c != 9]
+    for _ in range(2000):
+        for _ in range(rng.randint(0, 10)):
+            channel = rng.choice(channels)
+            value = (rng.choice([0, 16, 4080]), rng.choice([0, 4095]))
+            shadow.setPWM(channel, *value)
+            expected[channel] = value
+        shadow.flush()
+        assert not shadow.pending
+        check_registers(i2c, expected)
+
+
+@comptest
+def shadow_pwm_failed_writes_are_retried():
+    rng = random.Random(1)
+    i2c = get_bus(FlakyI2C(seed=2))
+    shadow = ShadowPWM(i2c)
+    expected = {}
+    for _ in range(500):
+        for _ in range(rng.randint(0, 10)):
+            channel = rng.randint(0, 15)
+            value = (rng.randint(0, 4095), 4095)
+            shadow.setPWM(channel, *value)
+            expected[channel] = value
+        shadow.flush()
+    for _ in range(100):
+        if not shadow.pending:
+            break
+        shadow.flush()
+    assert not shadow.pending
+    check_registers(i2c, expected)
+
+
+@comptest
+def shadow_pwm_transactions():
+    i2c = CountingI2C()
+    shadow = ShadowPWM(i2c)
+    for channel in range(16):
+        shadow.setPWM(channel, 0, 4095)
+    # 8 channels (32 bytes) per block write
+    assert shadow.flush() == 2
+    # nothing changed
+    for channel in range(16):
+        shadow.setPWM(channel, 0, 4095)
+    assert shadow.flush() == 0
+    # one block from the first to the last changed channel
+    shadow.setPWM(1, 16, 4095)
+    shadow.setPWM(4, 16, 4095)
+    i2c.reset_counts()
+    assert shadow.flush() == 1
+    assert i2c.transactions == 1 and i2c.bytes == 1 + 4 * 4
+
+
+@comptest
+def rgb_led_batch():
+    i2c = CountingI2C()
+    led = RGB_LED(i2c=i2c)
+    i2c.reset_counts()
+    with led.batch():
+        for i in range(5):
+            led.setRGB(i, [1, 0, 0])
+    assert i2c.transactions == 2
+    for i in range(5):
+        assert i2c.get_pwm(3 * i) == (255 << 4, 4095)
+        assert i2c.get_pwm(3 * i + 1) == (0, 4095)
+    i2c.reset_counts()
+    led.setRGB(2, [1, 0, 0])
+    assert i2c.transactions == 0
+
+
+if __name__ == '__main__':
+    run_module_tests()